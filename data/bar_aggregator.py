@@ -0,0 +1,230 @@
+# datafetch/bar_aggregator.py
+
+import os
+import logging
+import numpy as np
+from enum import Enum
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from data.message_decoder import AggTrade
+
+# Ortam Değişkenlerini Yükleme
+load_dotenv()
+
+# Ortam Değişkenleri
+# tür:eşik listesi; time eşiği milisaniye, tick işlem sayısı, volume baz varlık, dollar kote varlık miktarıdır
+BAR_SPECS = os.getenv("BAR_SPECS", "time:60000,tick:1000,dollar:5000000")
+BAR_HISTORY = int(os.getenv("BAR_HISTORY", 10000))
+# Zaman çubukları, sınırdan bu kadar sonra işlem gelmese de kapatılır (gecikmeli işlemlere pay)
+BAR_CLOSE_GRACE_MS = int(os.getenv("BAR_CLOSE_GRACE_MS", 250))
+
+# Log yapılandırması
+logger = logging.getLogger("BarAggregator")
+
+class BarKind(Enum):
+    TIME = "time"
+    TICK = "tick"
+    VOLUME = "volume"
+    DOLLAR = "dollar"
+
+class BarSpec:
+    __slots__ = ("kind", "threshold", "name")
+
+    def __init__(self, kind: BarKind, threshold: float):
+        if threshold <= 0:
+            raise ValueError(f"Çubuk eşiği pozitif olmalı: {kind.value}:{threshold}")
+        self.kind = kind
+        self.threshold = threshold
+        self.name = f"{kind.value}:{threshold:g}"
+
+def parse_bar_specs(text: str) -> List[BarSpec]:
+    """"time:60000,tick:1000" biçimindeki tanımları çözer"""
+    specs = []
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        kind, threshold = item.split(":")
+        specs.append(BarSpec(BarKind(kind), float(threshold)))
+    return specs
+
+class Bar:
+    """Kapanmış çubuk; zamanlar ms, hacim baz varlık, quote_volume kote varlık cinsindendir"""
+    __slots__ = ("exchange", "symbol", "spec", "open_time", "close_time", "open", "high", "low", "close",
+                 "volume", "quote_volume", "buy_volume", "trades", "first_trade_id", "last_trade_id")
+
+    def __init__(self, exchange: str, symbol: str, spec: str, open_time: int, close_time: int, open: float,
+                 high: float, low: float, close: float, volume: float, quote_volume: float, buy_volume: float,
+                 trades: int, first_trade_id: int, last_trade_id: int):
+        self.exchange = exchange
+        self.symbol = symbol
+        self.spec = spec
+        self.open_time = open_time
+        self.close_time = close_time
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.quote_volume = quote_volume
+        self.buy_volume = buy_volume
+        self.trades = trades
+        self.first_trade_id = first_trade_id
+        self.last_trade_id = last_trade_id
+
+# ================================
+# 🔁 Sabit Boyutlu Çubuk Geçmişi
+# ================================
+
+BAR_DTYPE = np.dtype([
+    ("open_time", "i8"), ("close_time", "i8"), ("open", "f8"), ("high", "f8"), ("low", "f8"), ("close", "f8"),
+    ("volume", "f8"), ("quote_volume", "f8"), ("buy_volume", "f8"), ("trades", "i8"),
+])
+
+class BarRing:
+    """Son `capacity` çubuğu önceden ayrılmış yapılandırılmış dizide tutar; ekleme O(1)"""
+    def __init__(self, capacity: int = BAR_HISTORY):
+        self.data = np.zeros(capacity, dtype=BAR_DTYPE)
+        self.capacity = capacity
+        self.count = 0
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def append(self, bar: Bar):
+        self.data[self.count % self.capacity] = (
+            bar.open_time, bar.close_time, bar.open, bar.high, bar.low, bar.close,
+            bar.volume, bar.quote_volume, bar.buy_volume, bar.trades,
+        )
+        self.count += 1
+
+    def latest(self, n: Optional[int] = None) -> np.ndarray:
+        """Son n çubuk, eskiden yeniye; halka sarılmadıysa kopyasız görünüm döner"""
+        size = len(self)
+        n = size if n is None else min(n, size)
+        end = self.count % self.capacity
+        if end == 0:
+            return self.data[self.capacity - n:]
+        if end >= n:
+            return self.data[end - n:end]
+        return np.concatenate((self.data[end - n:], self.data[:end]))
+
+# ================================
+# 🧱 Artımlı Çubuk Oluşturucu
+# ================================
+
+class _BarBuilder:
+    """Tek (borsa, sembol, tanım) için açık çubuğun durumu; her işlem sabit sayıda işlemle güncellenir"""
+    __slots__ = ("exchange", "symbol", "spec", "bucket", "open_time", "last_time", "open", "high", "low", "close",
+                 "volume", "quote_volume", "buy_volume", "trades", "first_trade_id", "last_trade_id")
+
+    def __init__(self, exchange: str, symbol: str, spec: BarSpec):
+        self.exchange = exchange
+        self.symbol = symbol
+        self.spec = spec
+        self.trades = 0
+        self.bucket = None
+
+    def add(self, trade: AggTrade) -> Optional[Bar]:
+        """İşlemi ekler; işlemle kapanan çubuğu (varsa) döndürür"""
+        closed = None
+        if self.spec.kind == BarKind.TIME:
+            bucket = trade.trade_time // int(self.spec.threshold)
+            if self.trades and bucket > self.bucket:
+                closed = self._close()
+            if not self.trades:
+                # Sınırdan sonra kapatılmış çubuğa gecikmeyle gelen işlem, açık olan yeni çubuğa yazılır
+                self.bucket = max(bucket, self.bucket) if self.bucket is not None else bucket
+
+        price, quantity = trade.price, trade.quantity
+        if not self.trades:
+            self.open_time = trade.trade_time
+            self.open = self.high = self.low = price
+            self.volume = self.quote_volume = self.buy_volume = 0.0
+            self.first_trade_id = trade.first_trade_id
+        elif price > self.high:
+            self.high = price
+        elif price < self.low:
+            self.low = price
+        self.close = price
+        self.volume += quantity
+        self.quote_volume += price * quantity
+        if not trade.is_buyer_maker:
+            self.buy_volume += quantity
+        self.trades += trade.last_trade_id - trade.first_trade_id + 1
+        self.last_trade_id = trade.last_trade_id
+        self.last_time = trade.trade_time
+
+        kind = self.spec.kind
+        if (
+            (kind == BarKind.TICK and self.trades >= self.spec.threshold)
+            or (kind == BarKind.VOLUME and self.volume >= self.spec.threshold)
+            or (kind == BarKind.DOLLAR and self.quote_volume >= self.spec.threshold)
+        ):
+            return self._close()
+        return closed
+
+    def expire(self, now_ms: int) -> Optional[Bar]:
+        """Zaman çubuğunun süresi dolduysa işlem beklemeden kapatır"""
+        if self.spec.kind != BarKind.TIME or not self.trades:
+            return None
+        if now_ms >= (self.bucket + 1) * int(self.spec.threshold) + BAR_CLOSE_GRACE_MS:
+            return self._close()
+        return None
+
+    def _close(self) -> Bar:
+        if self.spec.kind == BarKind.TIME:
+            interval = int(self.spec.threshold)
+            open_time, close_time = self.bucket * interval, (self.bucket + 1) * interval - 1
+            self.bucket += 1
+        else:
+            open_time, close_time = self.open_time, self.last_time
+        bar = Bar(self.exchange, self.symbol, self.spec.name, open_time, close_time, self.open, self.high, self.low,
+                  self.close, self.volume, self.quote_volume, self.buy_volume, self.trades, self.first_trade_id,
+                  self.last_trade_id)
+        self.trades = 0
+        return bar
+
+# ================================
+# 📊 İşlem Çubuğu Toplayıcı
+# ================================
+
+class BarAggregator:
+    """
+    aggTrade akışından zaman, işlem sayısı, hacim ve dolar çubuklarını artımlı olarak üretir.
+    Kapanan çubuklar döndürülür ve (borsa, sembol, tanım) başına sabit boyutlu geçmişe yazılır;
+    aynı sembolün farklı borsalardaki işlemleri ayrı çubuklara girer.
+    """
+    def __init__(self, specs: Optional[List[BarSpec]] = None, history: int = BAR_HISTORY):
+        self.specs = specs if specs is not None else parse_bar_specs(BAR_SPECS)
+        self.history = history
+        self._builders: Dict[Tuple[str, str], List[_BarBuilder]] = {}
+        self.rings: Dict[Tuple[str, str, str], BarRing] = {}
+
+    def update(self, exchange: str, trade: AggTrade) -> List[Bar]:
+        key = (exchange, trade.symbol)
+        builders = self._builders.get(key)
+        if builders is None:
+            builders = self._builders[key] = [_BarBuilder(exchange, trade.symbol, spec) for spec in self.specs]
+            for spec in self.specs:
+                self.rings[(exchange, trade.symbol, spec.name)] = BarRing(self.history)
+        closed = []
+        for builder in builders:
+            bar = builder.add(trade)
+            if bar is not None:
+                self.rings[(bar.exchange, bar.symbol, bar.spec)].append(bar)
+                closed.append(bar)
+        return closed
+
+    def close_expired(self, now_ms: int) -> List[Bar]:
+        """Süresi dolan zaman çubuklarını kapatır; periyodik olarak çağrılmalıdır"""
+        closed = []
+        for builders in self._builders.values():
+            for builder in builders:
+                bar = builder.expire(now_ms)
+                if bar is not None:
+                    self.rings[(bar.exchange, bar.symbol, bar.spec)].append(bar)
+                    closed.append(bar)
+        return closed
+
+    def bars(self, exchange: str, symbol: str, spec: str, n: Optional[int] = None) -> np.ndarray:
+        """Borsadaki sembolün kapanmış son n çubuğu"""
+        ring = self.rings.get((exchange, symbol, spec))
+        return ring.latest(n) if ring is not None else np.zeros(0, dtype=BAR_DTYPE)
@@ -0,0 +1,270 @@
+# datafetch/download_scheduler.py
+
+import os
+import json
+import time
+import asyncio
+import logging
+from enum import Enum
+from pathlib import Path
+from concurrent.futures import Executor
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from dotenv import load_dotenv
+
+# Ortam Değişkenlerini Yükleme
+load_dotenv()
+
+# Ortam Değişkenleri
+DOWNLOAD_WORKERS = int(os.getenv("DOWNLOAD_WORKERS", 16))
+TRANSFORM_WORKERS = int(os.getenv("TRANSFORM_WORKERS", os.cpu_count() or 4))
+WRITE_WORKERS = int(os.getenv("WRITE_WORKERS", 4))
+PROGRESS_LOG_INTERVAL = float(os.getenv("PROGRESS_LOG_INTERVAL", 10))
+
+# Log yapılandırması
+logger = logging.getLogger("DownloadScheduler")
+
+class JobStatus(Enum):
+    DONE = "done"
+    FAILED = "failed"
+
+# ================================
+# 📒 Kalıcı İş Manifesti
+# ================================
+
+class JobManifest:
+    """
+    İndirme işlerinin durumunu JSON-lines dosyasında tutar.
+    Her iş sonucu dosyaya tek satır olarak eklenir; yarıda kesilen bir çalıştırma
+    bir sonraki açılışta kaldığı yerden devam eder.
+    """
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.entries: Dict[str, dict] = {}
+        self._load()
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        line_count = 0
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line_count += 1
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Çökme sırasında yarım yazılmış son satır
+                    continue
+                self.entries[entry["key"]] = entry
+        if line_count > 2 * len(self.entries) + 1000:
+            self._compact()
+
+    def _compact(self):
+        """Her iş için yalnızca son kaydı bırakarak manifesti yeniden yazar"""
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(entry) + '\n')
+        os.replace(tmp_path, self.path)
+
+    def is_done(self, key: str) -> bool:
+        entry = self.entries.get(key)
+        return entry is not None and entry["status"] == JobStatus.DONE.value
+
+    def record(self, key: str, status: JobStatus, **fields: Any):
+        # Hash sözlükleri kayıtlar arasında korunur; kısmi yeniden indirmelerde
+        # DONE kaydı eski hash'lerle birleştirilir, FAILED kaydı verilen sözlüğü aynen yazar
+        for name, value in self.entries.get(key, {}).items():
+            if not isinstance(value, dict):
+                continue
+            if name not in fields:
+                fields[name] = value
+            elif status == JobStatus.DONE:
+                fields[name] = {**value, **fields[name]}
+        entry = {"key": key, "status": status.value, "ts": time.time(), **fields}
+        self.entries[key] = entry
+        self._file.write(json.dumps(entry) + '\n')
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+# ================================
+# 📈 İlerleme Sayaçları
+# ================================
+
+class SchedulerStats:
+    def __init__(self):
+        self.queued = 0
+        self.done = 0
+        self.skipped = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.bytes = 0
+        self.started = time.monotonic()
+
+    @property
+    def elapsed(self) -> float:
+        return max(time.monotonic() - self.started, 1e-9)
+
+    def summary(self) -> str:
+        finished = self.done + self.failed
+        return (
+            f"{finished}/{self.queued} iş bitti (tamam={self.done}, hata={self.failed}, "
+            f"atlandı={self.skipped}, aktif={self.in_flight}) | "
+            f"{finished / self.elapsed:.1f} iş/s | {self.bytes / self.elapsed / 1e6:.2f} MB/s"
+        )
+
+# ================================
+# ⚙️ Sınırlı Aşamalı Boru Hattı
+# ================================
+
+class DownloadScheduler:
+    """
+    İndirme işlerini üç aşamalı bir boru hattında yürütür:
+    ağ (async işçiler) → dönüştürme (süreç havuzu) → yazma (async işçiler).
+
+    Aşamalar sınırlı kuyruklarla bağlıdır; dönüştürme yavaşladığında ağ
+    işçileri yalnızca kuyruk dolunca bekler, bellekte sınırlı sayıda arşiv tutulur.
+
+    - `fetch(job)` (indirilen_bayt, yük, manifest_alanları) döndürür; yük None ise
+      iş tamamdır, dönüş değeri None ise iş başarısızdır.
+    - `transform(yük)` süreç havuzunda çalışır, bu yüzden modül seviyesinde olmalıdır.
+    - `write(job, sonuç)` dönüştürülmüş çıktıyı diske yazar ve isteğe bağlı olarak
+      manifeste eklenecek alanları döndürür.
+    """
+    def __init__(
+        self,
+        fetch: Callable[[Any], Awaitable[Optional[Tuple[int, Any, dict]]]],
+        manifest: JobManifest,
+        transform: Optional[Callable[[Any], Any]] = None,
+        write: Optional[Callable[[Any, Any], Awaitable[Optional[dict]]]] = None,
+        workers: int = DOWNLOAD_WORKERS,
+        transform_workers: int = TRANSFORM_WORKERS,
+        write_workers: int = WRITE_WORKERS,
+        executor: Optional[Executor] = None,
+        progress_interval: float = PROGRESS_LOG_INTERVAL
+    ):
+        self.fetch = fetch
+        self.transform = transform
+        self.write = write
+        self.manifest = manifest
+        self.workers = workers
+        self.transform_workers = transform_workers
+        self.write_workers = write_workers
+        self.executor = executor
+        self.progress_interval = progress_interval
+        self.stats = SchedulerStats()
+
+    async def run(self, jobs: Iterable[Any]) -> SchedulerStats:
+        self.stats = SchedulerStats()
+        job_queue: asyncio.Queue = asyncio.Queue(maxsize=self.workers * 2)
+        transform_queue: asyncio.Queue = asyncio.Queue(maxsize=self.transform_workers * 2)
+        write_queue: asyncio.Queue = asyncio.Queue(maxsize=self.transform_workers * 2)
+
+        fetchers = [asyncio.create_task(self._fetch_worker(job_queue, transform_queue)) for _ in range(self.workers)]
+        transformers = [asyncio.create_task(self._transform_worker(transform_queue, write_queue))
+                        for _ in range(self.transform_workers)]
+        writers = [asyncio.create_task(self._write_worker(write_queue)) for _ in range(self.write_workers)]
+        reporter = asyncio.create_task(self._report_progress())
+
+        try:
+            for job in jobs:
+                if self.manifest.is_done(job.key):
+                    self.stats.skipped += 1
+                    continue
+                self.stats.queued += 1
+                await job_queue.put(job)
+            # Her aşama bittiğinde bir sonrakine durma sinyali gönderilir
+            await self._drain(job_queue, fetchers)
+            await self._drain(transform_queue, transformers)
+            await self._drain(write_queue, writers)
+        finally:
+            reporter.cancel()
+            for task in fetchers + transformers + writers:
+                task.cancel()
+
+        logger.info(f"İndirme tamamlandı: {self.stats.summary()}")
+        return self.stats
+
+    async def _drain(self, queue: asyncio.Queue, tasks: List[asyncio.Task]):
+        for _ in tasks:
+            await queue.put(None)
+        await asyncio.gather(*tasks)
+
+    async def _fetch_worker(self, job_queue: asyncio.Queue, transform_queue: asyncio.Queue):
+        while True:
+            job = await job_queue.get()
+            if job is None:
+                return
+
+            self.stats.in_flight += 1
+            started = time.monotonic()
+            try:
+                result = await self.fetch(job)
+            except Exception as e:
+                logger.error(f"{job.key} indirmesi beklenmeyen hata ile sonlandı: {str(e)}")
+                result = None
+
+            if result is None:
+                self._finish(job, started, None)
+                continue
+            size, payload, fields = result
+            if payload is None:
+                self._finish(job, started, size, fields)
+            elif self.transform is not None:
+                await transform_queue.put((job, started, size, fields, payload))
+            else:
+                await self._write(job, started, size, fields, payload)
+
+    async def _transform_worker(self, transform_queue: asyncio.Queue, write_queue: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await transform_queue.get()
+            if item is None:
+                return
+
+            job, started, size, fields, payload = item
+            try:
+                output = await loop.run_in_executor(self.executor, self.transform, payload)
+            except Exception as e:
+                logger.error(f"{job.key} dönüştürmesi başarısız: {str(e)}")
+                self._finish(job, started, None)
+                continue
+            await write_queue.put((job, started, size, fields, output))
+
+    async def _write_worker(self, write_queue: asyncio.Queue):
+        while True:
+            item = await write_queue.get()
+            if item is None:
+                return
+            await self._write(*item)
+
+    async def _write(self, job: Any, started: float, size: int, fields: dict, output: Any):
+        try:
+            if self.write is not None:
+                fields = {**fields, **(await self.write(job, output) or {})}
+        except Exception as e:
+            logger.error(f"{job.key} yazılamadı: {str(e)}")
+            self._finish(job, started, None)
+            return
+        self._finish(job, started, size, fields)
+
+    def _finish(self, job: Any, started: float, size: Optional[int], fields: Optional[dict] = None):
+        self.stats.in_flight -= 1
+        elapsed = time.monotonic() - started
+        if size is None:
+            self.stats.failed += 1
+            self.manifest.record(job.key, JobStatus.FAILED, seconds=round(elapsed, 3))
+        else:
+            self.stats.done += 1
+            self.stats.bytes += size
+            self.manifest.record(job.key, JobStatus.DONE, bytes=size, seconds=round(elapsed, 3), **(fields or {}))
+            logger.debug(f"{job.key}: {size} bayt, {elapsed:.2f} s ({size / max(elapsed, 1e-9) / 1e6:.2f} MB/s)")
+
+    async def _report_progress(self):
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            logger.info(f"İlerleme: {self.stats.summary()}")
@@ -0,0 +1,54 @@
+# datafetch/gap_backfill.py
+
+import os
+import logging
+import aiohttp
+from typing import Any, AsyncIterator, Dict
+from aiolimiter import AsyncLimiter
+from dotenv import load_dotenv
+from utils.error_handler import retry
+
+# Ortam Değişkenlerini Yükleme
+load_dotenv()
+
+# Ortam Değişkenleri
+BINANCE_FUTURES_API = os.getenv("BINANCE_FUTURES_API", "https://fapi.binance.com")
+GAP_BACKFILL_PAGE_SIZE = int(os.getenv("GAP_BACKFILL_PAGE_SIZE", 1000))
+GAP_BACKFILL_MAX_REQUESTS = int(os.getenv("GAP_BACKFILL_MAX_REQUESTS", 50))
+
+# Log yapılandırması
+logger = logging.getLogger("GapBackfill")
+
+# ================================
+# 🩹 Kesinti Boşluğu Doldurma
+# ================================
+
+class BinanceGapFiller:
+    """
+    Websocket kesintisinde kaçırılan aggTrade mesajlarını REST'ten çeker. Sonuçlar
+    websocket yük biçimine çevrilir; böylece canlı mesajlarla aynı yoldan işlenir.
+    """
+    def __init__(self, session: aiohttp.ClientSession, limiter: AsyncLimiter,
+                 base_url: str = BINANCE_FUTURES_API):
+        self.session = session
+        self.limiter = limiter
+        self.base_url = base_url
+
+    async def agg_trades(self, symbol: str, from_id: int) -> AsyncIterator[Dict[str, Any]]:
+        """`from_id` dahil sonraki tüm birleşik işlemleri sırayla döndürür"""
+        for _ in range(GAP_BACKFILL_MAX_REQUESTS):
+            params = {"symbol": symbol, "fromId": from_id, "limit": GAP_BACKFILL_PAGE_SIZE}
+            rows = await retry(lambda: self._get("/fapi/v1/aggTrades", params))
+            for row in rows:
+                yield {"e": "aggTrade", "E": row["T"], "s": symbol, **row}
+            if len(rows) < GAP_BACKFILL_PAGE_SIZE:
+                return
+            from_id = rows[-1]["a"] + 1
+        logger.warning(f"{symbol} boşluğu {GAP_BACKFILL_MAX_REQUESTS} istekte kapanmadı; "
+                       f"{from_id} kimliğinden itibaren canlı akışa kadar olan işlemler eksik kalacak")
+
+    async def _get(self, path: str, params: dict) -> Any:
+        async with self.limiter:
+            async with self.session.get(f"{self.base_url}{path}", params=params) as response:
+                response.raise_for_status()
+                return await response.json()
@@ -5,10 +5,13 @@ import asyncio
 import aiohttp
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from pathlib import Path
 from enum import Enum, auto
-from typing import List, Optional
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import multiprocessing
+from dataclasses import dataclass
 from aiolimiter import AsyncLimiter
 import logging
 import hashlib
@@ -16,10 +19,15 @@ import zipfile
 import io
 import pyarrow.parquet as pq
 import pyarrow as pa
-from cryptography.hazmat.primitives.ciphers.aead import AESGCM
-import gzip
+import pyarrow.csv as pv
+import pyarrow.compute as pc
 from dotenv import load_dotenv
-from utils.error_handler import handle_errors, retry, DataFetchError, NetworkError, RetryLimitExceeded
+from utils.error_handler import handle_errors, retry, DataFetchError, NetworkError, RetryLimitExceeded, ValidationError
+from data.download_scheduler import DownloadScheduler, JobManifest, JobStatus, DOWNLOAD_WORKERS, TRANSFORM_WORKERS
+from data.kline_resampler import resample_klines, INTERVAL_DURATIONS
+from storage.database_handler import PartitionCatalog, PartitionRecord
+from storage.file_manager import StorageCodec, COMPRESSION_LEVEL
+from storage.dataset_reader import DatasetReader
 
 # Ortam Değişkenlerini Yükleme
 load_dotenv()
@@ -31,6 +39,16 @@ HISTORICAL_DATA_PATH = os.getenv("HISTORICAL_DATA_PATH", "data/historical")
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 ENV_MODE = os.getenv("ENV_MODE", "development")
 NODE_ID = os.getenv("NODE_ID", "default-node")
+DERIVE_HIGHER_INTERVALS = os.getenv("DERIVE_HIGHER_INTERVALS", "true").lower() == "true"
+VERIFY_PARTITIONS = os.getenv("VERIFY_PARTITIONS", "false").lower() == "true"
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", 8))
+BINANCE_FUTURES_API = os.getenv("BINANCE_FUTURES_API", "https://fapi.binance.com")
+# /fapi/v1/klines tek istekte en fazla bu kadar bar döndürür
+REST_KLINES_LIMIT = 1500
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+PARTITION_SUFFIX = ".parquet.zst"
+# Kodek öncesi gzip(AES-GCM(parquet)) bölümleri; okunmaya devam eder
+LEGACY_PARTITION_SUFFIX = ".parquet.gz"
 
 # Log Yapılandırması
 logging.basicConfig(
@@ -68,103 +86,409 @@ class TimeInterval(Enum):
     DAILY = "daily"
     MONTHLY = "monthly"
 
+# Binance kline CSV şeması
+KLINE_CSV_TYPES = {
+    'open_time': pa.int64(),
+    'open': pa.float64(),
+    'high': pa.float64(),
+    'low': pa.float64(),
+    'close': pa.float64(),
+    'volume': pa.float64(),
+    'close_time': pa.int64(),
+    'quote_volume': pa.float64(),
+    'count': pa.int64(),
+    'taker_buy_volume': pa.float64(),
+    'taker_buy_quote_volume': pa.float64(),
+    'ignore': pa.int64(),
+}
+KLINE_COLUMNS = list(KLINE_CSV_TYPES)
+MS_PER_DAY = 86_400_000
+
+# 1m barlarından tek bir günün içinde türetilebilen intervaller
+INTRADAY_DERIVED_INTERVALS = [
+    KlineInterval._5M, KlineInterval._15M, KlineInterval._1H, KlineInterval._4H, KlineInterval._1D
+]
+
+@dataclass(frozen=True)
+class DownloadJob:
+    symbol: Symbol
+    data_type: DataType
+    interval: KlineInterval
+    date: datetime
+    period: TimeInterval = TimeInterval.DAILY
+
+    @property
+    def key(self) -> str:
+        date_format = '%Y-%m' if self.period == TimeInterval.MONTHLY else '%Y-%m-%d'
+        return f"{self.symbol.value}/{self.data_type.value}/{self.interval.value}/{self.date.strftime(date_format)}"
+
 # Ana Veri Çekici Sınıf
 class HistoricalDataFetcher:
     BASE_URL = "https://data.binance.vision/data/futures/um"
     RETRY_DELAY = 2
     MAX_RETRIES = 5
 
-    def __init__(self, symbol: Symbol, data_dir: str = HISTORICAL_DATA_PATH):
+    def __init__(self, symbol: Symbol, data_dir: str = HISTORICAL_DATA_PATH,
+                 catalog: Optional[PartitionCatalog] = None,
+                 session: Optional[aiohttp.ClientSession] = None,
+                 limiter: Optional[AsyncLimiter] = None,
+                 hash_pool: Optional[ThreadPoolExecutor] = None):
         self.symbol = symbol
-        self.data_dir = Path(data_dir) / symbol.value
+        self.root_dir = Path(data_dir)
+        self.data_dir = self.root_dir / symbol.value
         self.data_dir.mkdir(parents=True, exist_ok=True)
-        self.session = aiohttp.ClientSession()
-        self.limiter = AsyncLimiter(API_RATE_LIMIT, 1)
-        self.cipher = AESGCM(ENCRYPTION_KEY.encode())
+        # Çoklu sembol indirmesinde oturum ve hız limiti paylaşılır
+        self._owns_session = session is None
+        self.session = session if session is not None else aiohttp.ClientSession()
+        self.limiter = limiter if limiter is not None else AsyncLimiter(API_RATE_LIMIT, 1)
+        # İndirme hash'leri varsayılan yürütücüyü (diğer to_thread işleri) doldurmaz
+        self._owns_hash_pool = hash_pool is None
+        self.hash_pool = hash_pool if hash_pool is not None else ThreadPoolExecutor(max_workers=HASH_WORKERS)
+        self.codec = StorageCodec(ENCRYPTION_KEY)
+        self.catalog = catalog if catalog is not None else PartitionCatalog()
+        self.reader = DatasetReader(self.root_dir, self.catalog, self.codec)
+        self._known_dirs = set()
 
     @handle_errors
-    async def fetch_all_data(self, start_date: datetime, end_date: Optional[datetime] = None):
-        """Tüm veri türlerini ve intervalleri indir"""
-        end_date = end_date or datetime.utcnow()
-        date_ranges = self._generate_date_ranges(start_date, end_date)
+    async def fetch_all_data(self, start_date: datetime, end_date: Optional[datetime] = None,
+                             workers: int = DOWNLOAD_WORKERS, derive_intervals: bool = DERIVE_HIGHER_INTERVALS,
+                             verify: bool = VERIFY_PARTITIONS):
+        """
+        Tüm veri türlerini ve intervalleri sınırlı bir işçi havuzuyla indir.
+        `derive_intervals` açıkken yalnızca 1m indirilir, üst intervaller yerelde üretilir.
+        `verify` açıkken katalogdaki hash'lerle uyuşmayan bölümler yeniden indirilir.
+        """
+        return await _run_backfill([self], start_date, end_date, workers, derive_intervals, verify)
 
-        tasks = []
+    def _generate_jobs(self, start_date: datetime, end_date: datetime,
+                       derive_intervals: bool = False) -> Iterator[DownloadJob]:
+        """İndirme işlerini tembel olarak üretir"""
+        intervals = [KlineInterval._1M] if derive_intervals else list(KlineInterval)
         for data_type in DataType:
-            for interval in KlineInterval:
-                for date in date_ranges:
-                    tasks.append(
-                        self.fetch_kline_data(data_type, interval, date)
-                    )
+            for interval in intervals:
+                for period, date in self._plan_periods(start_date, end_date):
+                    yield DownloadJob(self.symbol, data_type, interval, date, period)
 
-        await asyncio.gather(*tasks)
+    def _plan_periods(self, start: datetime, end: datetime) -> Iterator[Tuple[TimeInterval, datetime]]:
+        """Kapanmış aylar için aylık, içinde bulunulan ay için günlük arşivleri planlar"""
+        current_month = _month_start(datetime.utcnow())
+        month = _month_start(start)
+        while month <= end:
+            next_month = _month_start(month + timedelta(days=32))
+            if next_month <= current_month:
+                yield TimeInterval.MONTHLY, month
+            else:
+                last_day = min(next_month - timedelta(days=1), end)
+                for day in self._generate_date_ranges(max(month, start), last_day):
+                    yield TimeInterval.DAILY, day
+            month = next_month
 
-    @handle_errors
-    async def fetch_kline_data(self, data_type: DataType, interval: KlineInterval, date: datetime):
-        """Kline verisini indirme ve işleme"""
-        url = self._build_url(data_type, interval, date)
-        local_path = self._get_local_path(data_type, interval, date)
+    async def _download_job(self, job: DownloadJob) -> Optional[Tuple[int, Optional[tuple], dict]]:
+        """Ağ aşaması: eksik günleri kapsayan arşivleri indirir ve doğrular"""
+        days = self._days_in_period(job.date, job.period)
+        missing_days = [day for day in days if not self._has_partition(job.data_type, job.interval, day)]
+        if not missing_days:
+            logger.info(f"{job.key} ({job.period.value}) zaten mevcut, atlanıyor.")
+            return 0, None, {}
+
+        archives = await self._download_archives(job, missing_days)
+        if archives is None:
+            return None
+        contents = [content for _, content, _ in archives]
+        checksums = {filename: digest for filename, _, digest in archives}
+        return sum(map(len, contents)), (contents, [day.date() for day in missing_days]), {"archives": checksums}
+
+    async def _download_archives(self, job: DownloadJob,
+                                 missing_days: List[datetime]) -> Optional[List[Tuple[str, bytes, str]]]:
+        url = self._build_url(job.data_type, job.interval, job.date, job.period)
+        result = await self._download_verified(url)
+        if result:
+            return [(url.rsplit('/', 1)[-1], *result)]
+        if job.period != TimeInterval.MONTHLY:
+            return None
+
+        # Aylık arşiv ay bittikten birkaç gün sonra yayınlanır
+        logger.info(f"{url} henüz yayınlanmamış, günlük arşivlere dönülüyor.")
+        archives = []
+        for day in missing_days:
+            daily_url = self._build_url(job.data_type, job.interval, day)
+            result = await self._download_verified(daily_url)
+            if not result:
+                return None
+            archives.append((daily_url.rsplit('/', 1)[-1], *result))
+        return archives
+
+    async def _write_partitions(self, job: DownloadJob, partitions: Dict[date, "EncodedPartition"]) -> dict:
+        """Yazma aşaması: kodlanmış günlük dosyaları diske aktarır, kataloğa işler ve hash'lerini döndürür"""
+        records = []
+        for day, partition in partitions.items():
+            day = datetime.combine(day, datetime.min.time())
+            local_path = self._get_local_path(job.data_type, job.interval, day)
+            self._ensure_dir(local_path.parent)
+            digest = await asyncio.to_thread(_write_atomic, local_path, partition.data)
+            records.append(self._partition_record(job.data_type, job.interval, day, partition, digest))
+            logger.info(f"Veri başarıyla kaydedildi: {local_path}")
+        self.catalog.upsert_many(records)
+        return {"partitions": {record.day.isoformat(): record.sha256 for record in records}}
 
-        if local_path.exists():
-            logger.info(f"{local_path} zaten mevcut, atlanıyor.")
+    def verify_partitions(self, manifest: JobManifest) -> int:
+        """
+        Katalogdaki hash'lerle uyuşmayan veya eksik bölümleri siler, katalogdan çıkarır ve
+        indirme işlerini başarısız olarak işaretler; aynı çalıştırmada yeniden indirilirler.
+        """
+        records = [record for record in self.catalog.all_partitions() if record.symbol == self.symbol.value]
+        # Sıkıştırılmış aylık dosyalar birden çok günü kapsar; her dosya bir kez hash'lenir
+        paths = sorted({record.path for record in records})
+        with ThreadPoolExecutor(max_workers=HASH_WORKERS) as pool:
+            actual_hashes = dict(zip(paths, pool.map(_file_sha256, map(Path, paths))))
+
+        corrupted = 0
+        for record in records:
+            if actual_hashes[record.path] == record.sha256:
+                continue
+            logger.warning(f"{record.path} bozuk veya eksik, yeniden indirilecek.")
+            Path(record.path).unlink(missing_ok=True)
+            self.catalog.remove(record.symbol, record.data_type, record.interval, record.day)
+            corrupted += 1
+            # Bölüm aylık veya günlük bir işten gelmiş olabilir
+            day = datetime.combine(record.day, datetime.min.time())
+            for period in TimeInterval:
+                key = DownloadJob(
+                    self.symbol, DataType(record.data_type), KlineInterval(record.interval), day, period
+                ).key
+                if manifest.is_done(key):
+                    partitions = dict(manifest.entries[key].get("partitions", {}))
+                    partitions.pop(record.day.isoformat(), None)
+                    manifest.record(key, JobStatus.FAILED, reason="checksum", partitions=partitions)
+        logger.info(f"{len(records)} bölüm doğrulandı, {corrupted} bozuk bölüm bulundu.")
+        return corrupted
+
+    def rebuild_catalog(self):
+        """Katalogda kaydı olmayan mevcut bölümleri bir kez okuyup kataloğa ekler"""
+        paths = sorted(
+            path for suffix in (PARTITION_SUFFIX, LEGACY_PARTITION_SUFFIX)
+            for path in self.data_dir.glob(f"*/*/*{suffix}")
+        )
+        if not paths:
             return
+        logger.info(f"{self.symbol.value} için {len(paths)} bölüm kataloğa ekleniyor...")
+        with ThreadPoolExecutor(max_workers=HASH_WORKERS) as pool:
+            records = list(pool.map(self._scan_partition, paths))
+        self.catalog.upsert_many(record for file_records in records for record in file_records)
+
+    def _scan_partition(self, path: Path) -> List[PartitionRecord]:
+        """Günlük dosya için tek, sıkıştırılmış aylık dosya için her gün için bir kayıt üretir"""
+        try:
+            data_type, interval = DataType(path.parent.parent.name), KlineInterval(path.parent.name)
+            with open(path, 'rb') as f:
+                data = f.read()
+            table = self.reader.read_blob(data)
+        except Exception as e:
+            logger.warning(f"{path} kataloğa eklenemedi: {str(e)}")
+            return []
+
+        digest = hashlib.sha256(data).hexdigest()
+        if len(path.name.split('.')[0]) == len('YYYY-MM'):
+            return [
+                self._partition_record(data_type, interval, day, _describe_partition(day_table, data), digest, path)
+                for day, day_table in _split_by_day(table)
+            ]
+        day = datetime.strptime(path.name.split('.')[0], '%Y-%m-%d')
+        return [self._partition_record(data_type, interval, day, _describe_partition(table, data), digest)]
+
+    def _partition_record(self, data_type: DataType, interval: KlineInterval, day: datetime,
+                          partition: "EncodedPartition", digest: str, path: Optional[Path] = None) -> PartitionRecord:
+        path = path or self._get_local_path(data_type, interval, day)
+        return PartitionRecord(
+            symbol=self.symbol.value, data_type=data_type.value, interval=interval.value, day=day.date(),
+            path=str(path), rows=partition.rows,
+            start_ms=partition.start_ms, end_ms=partition.end_ms, sha256=digest, bytes=len(partition.data)
+        )
+
+    def _has_partition(self, data_type: DataType, interval: KlineInterval, day: datetime) -> bool:
+        return self.catalog.has(self.symbol.value, data_type.value, interval.value, day.date())
+
+    def _ensure_dir(self, path: Path):
+        if path not in self._known_dirs:
+            path.mkdir(parents=True, exist_ok=True)
+            self._known_dirs.add(path)
+
+    @handle_errors
+    async def fetch_kline_data(self, data_type: DataType, interval: KlineInterval, date: datetime,
+                               period: TimeInterval = TimeInterval.DAILY) -> Optional[int]:
+        """Tek bir kline arşivini boru hattı dışında indirip işler; indirilen bayt sayısını döndürür"""
+        job = DownloadJob(self.symbol, data_type, interval, date, period)
+        result = await self._download_job(job)
+        if result is None:
+            return None
 
-        for attempt in range(self.MAX_RETRIES):
+        size, payload, _ = result
+        if payload is not None:
+            partitions = await asyncio.to_thread(_transform_archives, payload, self.codec)
+            await self._write_partitions(job, partitions)
+        return size
+
+    async def _download_verified(self, url: str) -> Optional[Tuple[bytes, str]]:
+        """Arşivi Binance'in yayınladığı .CHECKSUM dosyasındaki SHA-256 ile doğrulayarak indirir"""
+        checksum = await self._download(f"{url}.CHECKSUM")
+        expected_sha256 = checksum[0].decode().split()[0] if checksum else None
+        if expected_sha256 is None:
+            logger.warning(f"{url} için CHECKSUM bulunamadı, doğrulama yapılmayacak.")
+        return await self._download(url, expected_sha256)
+
+    async def _download(self, url: str, expected_sha256: Optional[str] = None) -> Optional[Tuple[bytes, str]]:
+        async with self.limiter:
+            logger.info(f"{url} indiriliyor...")
             try:
-                async with self.limiter:
-                    logger.info(f"{url} indiriliyor...")
-                    content = await retry(lambda: self._download_with_retry(url), retries=self.MAX_RETRIES)
-
-                    if content:
-                        df = self._process_kline_content(content, data_type, interval)
-                        self._save_to_parquet(df, local_path)
-                        logger.info(f"Veri başarıyla kaydedildi: {local_path}")
-                    return
+                return await retry(lambda: self._download_with_retry(url, expected_sha256), retries=self.MAX_RETRIES)
             except RetryLimitExceeded:
                 logger.error(f"{url} {self.MAX_RETRIES} denemede başarısız oldu.")
-                break
+                return None
 
-    async def _download_with_retry(self, url: str) -> Optional[bytes]:
-        """Retry mekanizmalı dosya indirme"""
+    async def _download_with_retry(self, url: str, expected_sha256: Optional[str] = None) -> Optional[Tuple[bytes, str]]:
+        """Retry mekanizmalı dosya indirme; SHA-256 parçalar geldikçe iş parçacığı havuzunda hesaplanır"""
+        loop = asyncio.get_running_loop()
+        hasher = hashlib.sha256()
+        chunks = []
+        pending = None
         async with self.session.get(url) as response:
+            if response.status == 404:
+                # Yayınlanmamış dosya: tekrar denemenin anlamı yok
+                logger.warning(f"{url} bulunamadı.")
+                return None
             response.raise_for_status()
-            return await response.read()
+            async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                chunks.append(chunk)
+                # Bir önceki parçanın hash'i biterken sıradaki parça ağdan okunur
+                if pending is not None:
+                    await pending
+                pending = loop.run_in_executor(self.hash_pool, hasher.update, chunk)
+            if pending is not None:
+                await pending
 
-    def _build_url(self, data_type: DataType, interval: KlineInterval, date: datetime) -> str:
-        filename = f"{self.symbol.value}-{data_type.value}-{interval.value}-{date.strftime('%Y-%m-%d')}.zip"
-        return f"{self.BASE_URL}/{TimeInterval.DAILY.value}/{data_type.value}/{filename}"
+        digest = hasher.hexdigest()
+        if expected_sha256 and digest != expected_sha256:
+            raise ValidationError(f"{url} checksum uyuşmuyor: {digest} != {expected_sha256}")
+        return b''.join(chunks), digest
+
+    def _build_url(self, data_type: DataType, interval: KlineInterval, date: datetime,
+                   period: TimeInterval = TimeInterval.DAILY) -> str:
+        date_format = '%Y-%m' if period == TimeInterval.MONTHLY else '%Y-%m-%d'
+        filename = f"{self.symbol.value}-{interval.value}-{date.strftime(date_format)}.zip"
+        return f"{self.BASE_URL}/{period.value}/{data_type.value}/{self.symbol.value}/{interval.value}/{filename}"
 
     def _get_local_path(self, data_type: DataType, interval: KlineInterval, date: datetime) -> Path:
-        path = self.data_dir / data_type.value / interval.value
-        path.mkdir(parents=True, exist_ok=True)
-        return path / f"{date.strftime('%Y-%m-%d')}.parquet.gz"
-
-    def _process_kline_content(self, content: bytes, data_type: DataType, interval: KlineInterval) -> pd.DataFrame:
-        """İndirilen KLINE verisini işleme"""
-        with zipfile.ZipFile(io.BytesIO(content)) as z:
-            csv_file = [f for f in z.namelist() if f.endswith('.csv')][0]
-            with z.open(csv_file) as f:
-                df = pd.read_csv(f)
-
-        df.columns = ['open_time', 'open', 'high', 'low', 'close', 'volume',
-                      'close_time', 'quote_volume', 'count', 'taker_buy_volume',
-                      'taker_buy_quote_volume', 'ignore']
+        return self.data_dir / data_type.value / interval.value / f"{date.strftime('%Y-%m-%d')}{PARTITION_SUFFIX}"
+
+    def _get_monthly_path(self, data_type: DataType, interval: KlineInterval, month: datetime) -> Path:
+        """Kapanmış ayların sıkıştırılmış (compaction) dosya yolu"""
+        return self.data_dir / data_type.value / interval.value / f"{month.strftime('%Y-%m')}{PARTITION_SUFFIX}"
+
+    def _days_in_period(self, date: datetime, period: TimeInterval) -> List[datetime]:
+        if period == TimeInterval.DAILY:
+            return [date]
+        month = _month_start(date)
+        next_month = _month_start(month + timedelta(days=32))
+        return self._generate_date_ranges(month, next_month - timedelta(days=1))
+
+    def derive_higher_intervals(self, start_date: datetime, end_date: datetime):
+        """Yerel 1m bölümlerinden 5m, 15m, 1h, 4h, 1d ve 1w barlarını üretir"""
+        days = self._generate_date_ranges(_day_start(start_date), end_date)
+        weeks = sorted({day - timedelta(days=day.weekday()) for day in days})
+        for data_type in DataType:
+            for day in days:
+                self._derive_day(data_type, day)
+            for week in weeks:
+                self._derive_week(data_type, week)
+        logger.info(f"Üst intervaller {start_date.date()} - {end_date.date()} için türetildi.")
+
+    def _derive_day(self, data_type: DataType, day: datetime):
+        targets = [interval for interval in INTRADAY_DERIVED_INTERVALS if not self._has_partition(data_type, interval, day)]
+        if not targets or not self._has_partition(data_type, KlineInterval._1M, day):
+            return
+
+        minute_bars = self._load_partition(data_type, KlineInterval._1M, day)
+        for interval in targets:
+            bars = resample_klines(minute_bars, interval.value)
+            self._save_to_parquet(pa.Table.from_pandas(bars, preserve_index=False), data_type, interval, day)
+
+    def _derive_week(self, data_type: DataType, week: datetime):
+        if self._has_partition(data_type, KlineInterval._1W, week):
+            return
+
+        days = [week + timedelta(days=i) for i in range(7)]
+        if not all(self._has_partition(data_type, KlineInterval._1D, day) for day in days):
+            # Hafta henüz kapanmadı veya eksik gün var
+            return
+
+        daily_bars = pd.concat(
+            [self._load_partition(data_type, KlineInterval._1D, day) for day in days],
+            ignore_index=True
+        )
+        weekly_bars = resample_klines(daily_bars, KlineInterval._1W.value)
+        self._save_to_parquet(pa.Table.from_pandas(weekly_bars, preserve_index=False), data_type, KlineInterval._1W, week)
+
+    def _save_to_parquet(self, table: pa.Table, data_type: DataType, interval: KlineInterval, day: datetime):
+        """Veriyi sıkıştırılmış ve şifrelenmiş olarak kaydetme ve kataloğa işleme"""
+        local_path = self._get_local_path(data_type, interval, day)
+        self._ensure_dir(local_path.parent)
+        partition = _describe_partition(table, _encode_partition(table, self.codec))
+        digest = _write_atomic(local_path, partition.data)
+        self.catalog.upsert(self._partition_record(data_type, interval, day, partition, digest))
+
+    def _load_partition(self, data_type: DataType, interval: KlineInterval, day: datetime) -> pd.DataFrame:
+        """Bir günün barlarını okur; aylık dosyalarda yalnızca o günü içeren satır gruplarının şifresi çözülür"""
+        df = self.reader.read(self.symbol.value, data_type.value, interval.value, day, day + timedelta(days=1))
+        return df if len(df.columns) else pd.DataFrame(columns=KLINE_COLUMNS)
+
+    def load_recent_bars(self, data_type: DataType, interval: KlineInterval, bars: int,
+                         end: Optional[datetime] = None) -> pd.DataFrame:
+        """
+        Katalogdaki en yeni günlerden son `bars` barı zaman sırasıyla döndürür.
+        `end` verilirse yalnızca bu andan önce açılan barlar dikkate alınır.
+        """
+        last_day = (end - timedelta(milliseconds=1)).date() if end is not None else None
+        rows, first_day = 0, None
+        for record in reversed(self.catalog.partitions(self.symbol.value, data_type.value, interval.value,
+                                                       None, last_day)):
+            if rows >= bars:
+                break
+            rows += record.rows
+            first_day = record.day
+        if first_day is None:
+            return pd.DataFrame(columns=KLINE_COLUMNS)
+        start = datetime.combine(first_day, datetime.min.time())
+        df = self.reader.read(self.symbol.value, data_type.value, interval.value, start, end)
+        return df.tail(bars).reset_index(drop=True)
+
+    @handle_errors
+    async def fetch_recent_klines(self, interval: KlineInterval, start_ms: int, end_ms: int) -> pd.DataFrame:
+        """
+        [start_ms, end_ms) aralığında açılıp kapanmış klineları REST'ten çeker; günlük
+        arşivlerde henüz yayımlanmamış son saatleri kapatmak için kullanılır. Sütunlar ve
+        zaman türleri katalogdan okunan barlarla aynıdır.
+        """
+        rows = []
+        while start_ms < end_ms:
+            params = {"symbol": self.symbol.value, "interval": interval.value, "startTime": start_ms,
+                      "endTime": end_ms - 1, "limit": REST_KLINES_LIMIT}
+            page = await retry(lambda: self._get_json("/fapi/v1/klines", params), retries=self.MAX_RETRIES)
+            rows.extend(row for row in page if row[6] < end_ms)
+            if len(page) < REST_KLINES_LIMIT:
+                break
+            start_ms = page[-1][0] + 1
+        df = pd.DataFrame(rows, columns=KLINE_COLUMNS)
+        df = df.astype({column: pa_type.to_pandas_dtype() for column, pa_type in KLINE_CSV_TYPES.items()})
         df['open_time'] = pd.to_datetime(df['open_time'], unit='ms')
         df['close_time'] = pd.to_datetime(df['close_time'], unit='ms')
-        df['hlc3'] = (df['high'] + df['low'] + df['close']) / 3
-        df['variance'] = df['high'] - df['low']
-
+        logger.info(f"{self.symbol.value} {interval.value}: REST'ten {len(df)} kline alındı")
         return df
 
-    def _save_to_parquet(self, df: pd.DataFrame, local_path: Path):
-        """Veriyi sıkıştırılmış ve şifrelenmiş olarak kaydetme"""
-        encrypted_data = self._encrypt_data(df.to_parquet(index=False))
-        compressed_data = gzip.compress(encrypted_data)
-        with open(local_path, 'wb') as f:
-            f.write(compressed_data)
-
-    def _encrypt_data(self, data: bytes) -> bytes:
-        nonce = os.urandom(12)
-        return nonce + self.cipher.encrypt(nonce, data, None)
+    async def _get_json(self, path: str, params: dict):
+        async with self.limiter:
+            async with self.session.get(f"{BINANCE_FUTURES_API}{path}", params=params) as response:
+                response.raise_for_status()
+                return await response.json()
 
     def _generate_date_ranges(self, start: datetime, end: datetime) -> List[datetime]:
         """Veri için tarih aralıklarını oluştur"""
@@ -176,16 +500,204 @@ class HistoricalDataFetcher:
         return dates
 
     async def close(self):
+        self.reader.close()
+        if self._owns_hash_pool:
+            self.hash_pool.shutdown(wait=True)
+        if self._owns_session:
+            await self.session.close()
+
+# ================================
+# 🌐 Çoklu Sembol İndirmesi
+# ================================
+
+class HistoricalBackfill:
+    """
+    Birden çok sembolü tek bağlantı havuzu, tek global hız limiti, tek katalog
+    ve tek indirme boru hattıyla indirir. İşler semboller arasında sırayla
+    dağıtılır; hiçbir sembol havuzu tek başına tüketmez.
+    """
+    def __init__(self, symbols: List[Symbol], data_dir: str = HISTORICAL_DATA_PATH,
+                 workers: int = DOWNLOAD_WORKERS):
+        self.workers = workers
+        # Tüm istekler aynı sunucuya gider; havuz işçi sayısı kadar bağlantı tutar
+        self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=workers, limit_per_host=workers))
+        self.limiter = AsyncLimiter(API_RATE_LIMIT, 1)
+        self.catalog = PartitionCatalog()
+        self.hash_pool = ThreadPoolExecutor(max_workers=HASH_WORKERS)
+        self.fetchers = [
+            HistoricalDataFetcher(symbol, data_dir, self.catalog, self.session, self.limiter, self.hash_pool)
+            for symbol in symbols
+        ]
+
+    @handle_errors
+    async def fetch_all_data(self, start_date: datetime, end_date: Optional[datetime] = None,
+                             derive_intervals: bool = DERIVE_HIGHER_INTERVALS, verify: bool = VERIFY_PARTITIONS):
+        """Tüm semboller için tüm veri türlerini ve intervalleri indir"""
+        return await _run_backfill(self.fetchers, start_date, end_date, self.workers, derive_intervals, verify)
+
+    async def close(self):
+        for fetcher in self.fetchers:
+            fetcher.reader.close()
+        self.hash_pool.shutdown(wait=True)
         await self.session.close()
+        self.catalog.close()
+
+async def _run_backfill(fetchers: List[HistoricalDataFetcher], start_date: datetime, end_date: Optional[datetime],
+                        workers: int, derive_intervals: bool, verify: bool):
+    """Bir veya daha fazla sembolün işlerini tek boru hattında yürütür"""
+    end_date = end_date or datetime.utcnow()
+    by_symbol = {fetcher.symbol: fetcher for fetcher in fetchers}
+    manifest = JobManifest(fetchers[0].root_dir / ".download_manifest.jsonl")
+
+    for fetcher in fetchers:
+        if fetcher.symbol.value not in fetcher.catalog.symbols():
+            await asyncio.to_thread(fetcher.rebuild_catalog)
+        if verify:
+            await asyncio.to_thread(fetcher.verify_partitions, manifest)
+
+    async def download(job: DownloadJob):
+        return await by_symbol[job.symbol]._download_job(job)
+
+    async def write(job: DownloadJob, partitions: Dict[date, "EncodedPartition"]):
+        return await by_symbol[job.symbol]._write_partitions(job, partitions)
+
+    # spawn: olay döngüsü iş parçacıkları varken fork güvenli değil
+    executor = ProcessPoolExecutor(
+        max_workers=TRANSFORM_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_transform_worker,
+        initargs=(ENCRYPTION_KEY,)
+    )
+    scheduler = DownloadScheduler(
+        download, manifest, transform=_transform_archives, write=write,
+        workers=workers, executor=executor
+    )
+    jobs = _round_robin([fetcher._generate_jobs(start_date, end_date, derive_intervals) for fetcher in fetchers])
+    try:
+        stats = await scheduler.run(jobs)
+    finally:
+        manifest.close()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if derive_intervals:
+        await asyncio.gather(*(
+            asyncio.to_thread(fetcher.derive_higher_intervals, start_date, end_date) for fetcher in fetchers
+        ))
+    return stats
+
+def _round_robin(generators: List[Iterator[DownloadJob]]) -> Iterator[DownloadJob]:
+    """Sembollerin iş üreteçlerinden sırayla birer iş alır"""
+    active = list(generators)
+    while active:
+        for generator in list(active):
+            try:
+                yield next(generator)
+            except StopIteration:
+                active.remove(generator)
+
+# ================================
+# 🧮 Süreç Havuzunda Çalışan Dönüşümler
+# ================================
+
+_worker_codec: Optional[StorageCodec] = None
+
+def _init_transform_worker(encryption_key: str):
+    global _worker_codec
+    _worker_codec = StorageCodec(encryption_key)
+
+class EncodedPartition(NamedTuple):
+    data: bytes
+    rows: int
+    start_ms: int
+    end_ms: int
+
+def _transform_archives(payload: Tuple[List[bytes], List[date]],
+                        codec: Optional[StorageCodec] = None) -> Dict[date, EncodedPartition]:
+    """CPU aşaması: zip → Arrow → günlük parquet → zstd → AES-GCM"""
+    archives, days = payload
+    codec = codec or _worker_codec
+    wanted = set(days)
+    partitions = {}
+    for content in archives:
+        for day, table in _split_by_day(_decode_kline_archive(content)):
+            if day.date() in wanted:
+                partitions[day.date()] = _describe_partition(table, _encode_partition(table, codec))
+    return partitions
+
+def _describe_partition(table: pa.Table, data: bytes) -> EncodedPartition:
+    """Katalog için satır sayısı ve zaman sınırlarını çıkarır"""
+    if table.num_rows == 0:
+        return EncodedPartition(data, 0, 0, 0)
+    bounds = pc.min_max(table['open_time'].cast(pa.int64()))
+    return EncodedPartition(data, table.num_rows, bounds['min'].as_py(), bounds['max'].as_py())
+
+def _decode_kline_archive(content: bytes) -> pa.Table:
+    """İndirilen KLINE CSV'sini zip içinden doğrudan sabit şemalı bir Arrow tablosuna çözer"""
+    with zipfile.ZipFile(io.BytesIO(content)) as z:
+        csv_file = [f for f in z.namelist() if f.endswith('.csv')][0]
+        with z.open(csv_file) as f:
+            # Yeni arşivlerde başlık satırı var, eskilerde yok
+            has_header = not f.peek(1)[:1].isdigit()
+            table = pv.read_csv(
+                f,
+                read_options=pv.ReadOptions(column_names=KLINE_COLUMNS, skip_rows=int(has_header)),
+                convert_options=pv.ConvertOptions(column_types=KLINE_CSV_TYPES)
+            )
+
+    table = table.set_column(0, 'open_time', table['open_time'].cast(pa.timestamp('ms')))
+    table = table.set_column(6, 'close_time', table['close_time'].cast(pa.timestamp('ms')))
+    hlc3 = pc.divide(pc.add(pc.add(table['high'], table['low']), table['close']), 3.0)
+    variance = pc.subtract(table['high'], table['low'])
+    return table.append_column('hlc3', hlc3).append_column('variance', variance)
+
+def _encode_partition(table: pa.Table, codec: StorageCodec, **parquet_options) -> bytes:
+    # Sayfalar şifrelemeden önce parquet içinde zstd ile sıkıştırılır; parçalı kap
+    # düz metin ofsetlerini koruduğu için okuyucu yalnızca gereken parçaları çözer
+    buffer = pa.BufferOutputStream()
+    pq.write_table(table, buffer, compression='zstd', compression_level=COMPRESSION_LEVEL, **parquet_options)
+    return codec.encode_chunked(buffer.getvalue().to_pybytes())
+
+def _write_atomic(local_path: Path, data: bytes) -> str:
+    """Yarım yazılmış dosya bırakmamak için önce geçici dosyaya yazar; içeriğin SHA-256'sını döndürür"""
+    tmp_path = local_path.with_name(local_path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, local_path)
+    return hashlib.sha256(data).hexdigest()
+
+def _file_sha256(path: Path) -> Optional[str]:
+    if not path.exists():
+        return None
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+def _split_by_day(table: pa.Table) -> Iterator[Tuple[datetime, pa.Table]]:
+    """Zamana göre sıralı tabloyu kopyalamadan günlük dilimlere ayırır"""
+    if table.num_rows == 0:
+        return
+    day_index = table['open_time'].cast(pa.int64()).to_numpy() // MS_PER_DAY
+    boundaries = np.concatenate(([0], np.flatnonzero(np.diff(day_index)) + 1, [table.num_rows]))
+    for start, stop in zip(boundaries[:-1], boundaries[1:]):
+        day = datetime.utcfromtimestamp(int(day_index[start]) * MS_PER_DAY / 1000)
+        yield day, table.slice(start, stop - start)
+
+def _day_start(date: datetime) -> datetime:
+    return date.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def _month_start(date: datetime) -> datetime:
+    return date.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
 
 # Ana Çalıştırma Fonksiyonu
 async def main():
-    fetcher = HistoricalDataFetcher(Symbol.BTCUSDT)
+    backfill = HistoricalBackfill(list(Symbol))
     try:
         start_date = datetime(2020, 1, 1)
-        await fetcher.fetch_all_data(start_date)
+        await backfill.fetch_all_data(start_date)
     finally:
-        await fetcher.close()
+        await backfill.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
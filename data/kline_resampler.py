@@ -0,0 +1,62 @@
+# datafetch/kline_resampler.py
+
+import logging
+import pandas as pd
+
+# Log yapılandırması
+logger = logging.getLogger("KlineResampler")
+
+# Binance interval süreleri; haftalık barlar Pazartesi 00:00 UTC'de açılır
+INTERVAL_DURATIONS = {
+    "1m": pd.Timedelta(minutes=1),
+    "5m": pd.Timedelta(minutes=5),
+    "15m": pd.Timedelta(minutes=15),
+    "1h": pd.Timedelta(hours=1),
+    "4h": pd.Timedelta(hours=4),
+    "1d": pd.Timedelta(days=1),
+    "1w": pd.Timedelta(weeks=1),
+}
+
+OHLCV_AGGREGATIONS = {
+    "open": "first",
+    "high": "max",
+    "low": "min",
+    "close": "last",
+    "volume": "sum",
+    "quote_volume": "sum",
+    "count": "sum",
+    "taker_buy_volume": "sum",
+    "taker_buy_quote_volume": "sum",
+}
+
+def bucket_start(open_time: pd.Series, interval: str) -> pd.Series:
+    """Her satırın ait olduğu barın açılış zamanını hesaplar"""
+    if interval == "1w":
+        day = open_time.dt.floor("1D")
+        return day - pd.to_timedelta(day.dt.weekday, unit="D")
+    return open_time.dt.floor(INTERVAL_DURATIONS[interval])
+
+def resample_klines(df: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """
+    Daha küçük intervalli kline verisinden `interval` barlarını vektörel olarak üretir.
+    Girdi 1m veya hedefi tam bölen herhangi bir interval olabilir.
+    """
+    if df.empty:
+        return df.copy()
+
+    buckets = bucket_start(df["open_time"], interval)
+    columns = [column for column in OHLCV_AGGREGATIONS if column in df.columns]
+    bars = (
+        df[columns]
+        .groupby(buckets.rename("open_time"), sort=True)
+        .agg({column: OHLCV_AGGREGATIONS[column] for column in columns})
+        .reset_index()
+    )
+
+    # Binance close_time değeri bir sonraki barın açılışından 1 ms öncesidir
+    bars["close_time"] = bars["open_time"] + INTERVAL_DURATIONS[interval] - pd.Timedelta(milliseconds=1)
+    bars["ignore"] = 0
+    bars["hlc3"] = (bars["high"] + bars["low"] + bars["close"]) / 3
+    bars["variance"] = bars["high"] - bars["low"]
+
+    return bars[[column for column in df.columns if column in bars.columns]]
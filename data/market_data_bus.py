@@ -0,0 +1,176 @@
+# datafetch/market_data_bus.py
+
+import os
+import time
+import asyncio
+import logging
+from enum import Enum
+from collections import OrderedDict, deque
+from typing import Any, Callable, Hashable, List, Optional
+from dotenv import load_dotenv
+
+# Ortam Değişkenlerini Yükleme
+load_dotenv()
+
+# Ortam Değişkenleri
+BUS_QUEUE_SIZE = int(os.getenv("BUS_QUEUE_SIZE", 1024))
+
+# Log yapılandırması
+logger = logging.getLogger("MarketDataBus")
+
+class OverflowPolicy(Enum):
+    BLOCK = "block"              # Yayıncı yer açılana kadar bekler; hiçbir mesaj kaybolmaz
+    DROP_OLDEST = "drop_oldest"  # Kuyruk doluysa en eski mesaj atılır
+    CONFLATE = "conflate"        # Her (borsa, veri türü, sembol) için yalnızca en son mesaj tutulur
+
+class MarketEvent:
+    """
+    Bus üzerinde taşınan mesaj: kaynak akış, tipli kayıt ve gecikme damgaları
+    (borsa olay zamanı ms, alınma ve çözülme zamanı time_ns)
+    """
+    __slots__ = ("exchange", "data_type", "symbol", "record", "received_ns", "event_ms", "decoded_ns")
+
+    def __init__(self, exchange: str, data_type: str, symbol: str, record: Any, received_ns: Optional[int] = None,
+                 event_ms: Optional[int] = None, decoded_ns: Optional[int] = None):
+        self.exchange = exchange
+        self.data_type = data_type
+        self.symbol = symbol
+        self.record = record
+        self.received_ns = received_ns if received_ns is not None else time.time_ns()
+        self.event_ms = event_ms
+        self.decoded_ns = decoded_ns
+
+    @property
+    def stream(self) -> str:
+        return f"{self.exchange}:{self.data_type}:{self.symbol}"
+
+    @property
+    def key(self) -> tuple:
+        return self.exchange, self.data_type, self.symbol
+
+# ================================
+# 📬 Abone Kuyruğu
+# ================================
+
+class Subscription:
+    """
+    Tek bir tüketicinin sınırlı kuyruğu; `async for event in subscription` ile okunur.
+    Taşma politikası yalnızca bu aboneyi etkiler: yavaş bir strateji diğer abonelere
+    ve (BLOCK dışında) veri alımına hiçbir zaman beklemez.
+    """
+    def __init__(self, maxsize: int = BUS_QUEUE_SIZE, policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+                 predicate: Optional[Callable[[MarketEvent], bool]] = None, name: str = "subscriber"):
+        self.maxsize = maxsize
+        self.policy = policy
+        self.predicate = predicate
+        self.name = name
+        self.dropped = 0
+        self.delivered = 0
+        self.closed = False
+        self._items: deque = deque()
+        self._latest: "OrderedDict[Hashable, MarketEvent]" = OrderedDict()
+        self._readable = asyncio.Event()
+        self._writable = asyncio.Event()
+        self._writable.set()
+
+    def __len__(self) -> int:
+        return len(self._latest) if self.policy == OverflowPolicy.CONFLATE else len(self._items)
+
+    def matches(self, event: MarketEvent) -> bool:
+        return self.predicate is None or self.predicate(event)
+
+    async def put(self, event: MarketEvent):
+        if self.closed:
+            return
+        if self.policy == OverflowPolicy.CONFLATE:
+            if event.key in self._latest:
+                # Yerini koruyarak en son değerle değiştirilir
+                self._latest[event.key] = event
+                self.dropped += 1
+            else:
+                if len(self._latest) >= self.maxsize:
+                    self._latest.popitem(last=False)
+                    self.dropped += 1
+                self._latest[event.key] = event
+        elif self.policy == OverflowPolicy.DROP_OLDEST:
+            if len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(event)
+        else:
+            while len(self._items) >= self.maxsize and not self.closed:
+                self._writable.clear()
+                await self._writable.wait()
+            if self.closed:
+                return
+            self._items.append(event)
+        self._readable.set()
+
+    def get_nowait(self) -> Optional[MarketEvent]:
+        if self.policy == OverflowPolicy.CONFLATE:
+            if not self._latest:
+                return None
+            _, event = self._latest.popitem(last=False)
+        else:
+            if not self._items:
+                return None
+            event = self._items.popleft()
+            self._writable.set()
+        self.delivered += 1
+        return event
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> MarketEvent:
+        while True:
+            event = self.get_nowait()
+            if event is not None:
+                return event
+            if self.closed:
+                raise StopAsyncIteration
+            self._readable.clear()
+            await self._readable.wait()
+
+    def close(self):
+        self.closed = True
+        self._readable.set()
+        self._writable.set()
+
+# ================================
+# 🚌 Yayın/Abone Veri Yolu
+# ================================
+
+class MarketDataBus:
+    """Veri alımını tüketicilerden ayıran yayın/abone veri yolu; her abone kendi kuyruğuna sahiptir"""
+    def __init__(self):
+        self.subscriptions: List[Subscription] = []
+
+    def subscribe(self, maxsize: int = BUS_QUEUE_SIZE, policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+                  predicate: Optional[Callable[[MarketEvent], bool]] = None, name: str = "subscriber") -> Subscription:
+        subscription = Subscription(maxsize, policy, predicate, name)
+        self.subscriptions.append(subscription)
+        logger.info(f"{name} veri yoluna abone oldu ({policy.value}, kuyruk={maxsize})")
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscription.close()
+        if subscription in self.subscriptions:
+            self.subscriptions.remove(subscription)
+
+    async def publish(self, event: MarketEvent):
+        for subscription in self.subscriptions:
+            if subscription.matches(event):
+                await subscription.put(event)
+
+    def stats(self) -> dict:
+        return {
+            subscription.name: {"queued": len(subscription), "delivered": subscription.delivered,
+                                "dropped": subscription.dropped}
+            for subscription in self.subscriptions
+        }
+
+    def close(self):
+        for subscription in self.subscriptions:
+            subscription.close()
+        self.subscriptions.clear()
@@ -0,0 +1,54 @@
+# datafetch/market_pipeline.py
+
+import logging
+from typing import Any, Optional
+from data.message_decoder import decode_binance, AggTrade, DepthUpdate
+from data.market_data_bus import MarketEvent
+
+# Log yapılandırması
+logger = logging.getLogger("MarketPipeline")
+
+# Tick deposuna işlem olarak yazılan veri türü
+TRADES_DATA_TYPE = "TRADES"
+
+# ================================
+# 🧩 Ortak Mesaj İşleme Hattı
+# ================================
+
+class MarketDataPipeline:
+    """
+    Çözülmüş mesajın canlı akışta ve tekrar oynatmada aynı yoldan işlenmesi: gecikme
+    damgaları, tick deposu, L2 defter, veri yolu ve işlem çubukları. Kullanan sınıf
+    `ticks`, `order_books`, `bus`, `bars` ve `latency` özniteliklerini sağlar; zaman
+    damgalarının kaynağı ve anlık görüntülerin yüklenmesi kullanan sınıfa aittir.
+    """
+    def _decode(self, exchange: str, payload: Any) -> Optional[Any]:
+        """Binance mesajları sayısal alanlı kayıtlara çözülür, diğer borsalarınki sözlük olarak kalır"""
+        return decode_binance(payload) if exchange == "BINANCE" else payload
+
+    async def _handle_record(self, exchange: str, data_type: str, symbol: str, record: Any,
+                             received_ns: Optional[int], event_ms: Optional[int], decoded_ns: int):
+        # REST ile doldurulan mesajların alınma zamanı yoktur ve gecikme histogramlarına girmez
+        if received_ns is not None:
+            self.latency.record_stamps(f"{exchange}:{data_type}:{symbol}", event_ms,
+                                       {"receive": received_ns, "decode": decoded_ns})
+        if data_type == TRADES_DATA_TYPE:
+            self.ticks.write_trades(exchange, symbol, record)
+        if isinstance(record, DepthUpdate):
+            await self.order_books.on_depth(record)
+            book = self.order_books.book(record.symbol)
+            if book is not None:
+                self.ticks.write_quote(exchange, symbol, record.event_time, book.best_bid(), book.best_ask())
+        await self.bus.publish(MarketEvent(exchange, data_type, symbol, record, received_ns, event_ms, decoded_ns))
+        if isinstance(record, AggTrade):
+            for bar in self.bars.update(exchange, record):
+                await self._publish_bar(bar)
+
+    async def _close_expired_bars(self, now_ms: int):
+        """Süresi dolan zaman çubuklarını kapatıp yayınlar"""
+        for bar in self.bars.close_expired(now_ms):
+            await self._publish_bar(bar)
+
+    async def _publish_bar(self, bar):
+        # Her çubuk tanımı ayrı veri türü olarak yayınlanır; birleştiren aboneler tanımları karıştırmaz
+        await self.bus.publish(MarketEvent(bar.exchange, f"BAR:{bar.spec}", bar.symbol, bar))
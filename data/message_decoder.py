@@ -0,0 +1,128 @@
+# datafetch/message_decoder.py
+
+import json
+import time
+import logging
+import orjson
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Log yapılandırması
+logger = logging.getLogger("MessageDecoder")
+
+PriceLevel = Tuple[float, float]
+
+# ================================
+# 🧾 Tipli Mesaj Kayıtları
+# ================================
+
+class DepthUpdate:
+    """Binance @depth fark mesajı; fiyat seviyeleri (fiyat, miktar) float çiftleridir"""
+    __slots__ = ("symbol", "event_time", "transaction_time", "first_update_id", "final_update_id",
+                 "prev_final_update_id", "bids", "asks")
+
+    def __init__(self, symbol: str, event_time: int, transaction_time: int, first_update_id: int,
+                 final_update_id: int, prev_final_update_id: int, bids: List[PriceLevel], asks: List[PriceLevel]):
+        self.symbol = symbol
+        self.event_time = event_time
+        self.transaction_time = transaction_time
+        self.first_update_id = first_update_id
+        self.final_update_id = final_update_id
+        self.prev_final_update_id = prev_final_update_id
+        self.bids = bids
+        self.asks = asks
+
+class AggTrade:
+    """Binance @aggTrade mesajı"""
+    __slots__ = ("symbol", "event_time", "trade_id", "price", "quantity", "first_trade_id",
+                 "last_trade_id", "trade_time", "is_buyer_maker")
+
+    def __init__(self, symbol: str, event_time: int, trade_id: int, price: float, quantity: float,
+                 first_trade_id: int, last_trade_id: int, trade_time: int, is_buyer_maker: bool):
+        self.symbol = symbol
+        self.event_time = event_time
+        self.trade_id = trade_id
+        self.price = price
+        self.quantity = quantity
+        self.first_trade_id = first_trade_id
+        self.last_trade_id = last_trade_id
+        self.trade_time = trade_time
+        self.is_buyer_maker = is_buyer_maker
+
+class MarkPrice:
+    """Binance @markPrice mesajı; fonlama oranını ve bir sonraki fonlama zamanını taşır"""
+    __slots__ = ("symbol", "event_time", "mark_price", "index_price", "funding_rate", "next_funding_time")
+
+    def __init__(self, symbol: str, event_time: int, mark_price: float, index_price: float,
+                 funding_rate: float, next_funding_time: int):
+        self.symbol = symbol
+        self.event_time = event_time
+        self.mark_price = mark_price
+        self.index_price = index_price
+        self.funding_rate = funding_rate
+        self.next_funding_time = next_funding_time
+
+# ================================
+# ⚡ Çözücüler
+# ================================
+
+def loads(raw: Any) -> Any:
+    """orjson ile JSON çözme; bytes ve str kabul eder"""
+    return orjson.loads(raw)
+
+def _levels(levels: List[List[str]]) -> List[PriceLevel]:
+    return [(float(price), float(quantity)) for price, quantity in levels]
+
+def decode_depth(m: Dict[str, Any]) -> DepthUpdate:
+    return DepthUpdate(m["s"], m["E"], m.get("T", m["E"]), m["U"], m["u"], m.get("pu", -1), _levels(m["b"]), _levels(m["a"]))
+
+def decode_agg_trade(m: Dict[str, Any]) -> AggTrade:
+    return AggTrade(m["s"], m["E"], m["a"], float(m["p"]), float(m["q"]), m["f"], m["l"], m["T"], m["m"])
+
+def decode_mark_price(m: Dict[str, Any]) -> MarkPrice:
+    return MarkPrice(m["s"], m["E"], float(m["p"]), float(m.get("i") or 0.0), float(m.get("r") or 0.0), m.get("T", 0))
+
+BINANCE_DECODERS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "depthUpdate": decode_depth,
+    "aggTrade": decode_agg_trade,
+    "markPriceUpdate": decode_mark_price,
+}
+
+def decode_binance(payload: Dict[str, Any]) -> Optional[Any]:
+    """Olay türüne göre tipli kayıt döndürür; tanınmayan olaylar için None"""
+    decoder = BINANCE_DECODERS.get(payload.get("e"))
+    return decoder(payload) if decoder is not None else None
+
+# ================================
+# ⏱️ Kıyaslama
+# ================================
+
+SAMPLE_MESSAGES = [
+    b'{"stream":"btcusdt@depth","data":{"e":"depthUpdate","E":1700000000123,"T":1700000000120,"s":"BTCUSDT",'
+    b'"U":3400000001,"u":3400000025,"pu":3400000000,"b":[["37000.10","1.250"],["36999.90","0.004"],'
+    b'["36990.00","12.500"],["36985.50","0.000"]],"a":[["37000.20","0.750"],["37001.00","3.100"],["37010.40","0.000"]]}}',
+    b'{"stream":"ethusdt@aggTrade","data":{"e":"aggTrade","E":1700000000125,"a":1500000123,"s":"ETHUSDT",'
+    b'"p":"2050.13","q":"0.850","f":3100000001,"l":3100000003,"T":1700000000124,"m":true}}',
+    b'{"stream":"solusdt@markPrice","data":{"e":"markPriceUpdate","E":1700000001000,"s":"SOLUSDT",'
+    b'"p":"58.12340000","P":"58.10000000","i":"58.11000000","r":"0.00010000","T":1700006400000}}',
+]
+
+def _baseline(raw: bytes):
+    """Önceki yol: json.loads ile sözlüğe çözme"""
+    return json.loads(raw)["data"]
+
+def _typed(raw: bytes):
+    return decode_binance(loads(raw)["data"])
+
+def benchmark(iterations: int = 200_000) -> Dict[str, float]:
+    """Tek çekirdekte saniyedeki mesaj sayısını ölçer"""
+    results = {}
+    for name, decode in (("json.loads → dict", _baseline), ("orjson → tipli kayıt", _typed)):
+        started = time.perf_counter()
+        for i in range(iterations):
+            decode(SAMPLE_MESSAGES[i % len(SAMPLE_MESSAGES)])
+        results[name] = iterations / (time.perf_counter() - started)
+    return results
+
+if __name__ == "__main__":
+    for name, rate in benchmark().items():
+        print(f"{name:<24} {rate:>12,.0f} mesaj/s")
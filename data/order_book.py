@@ -0,0 +1,269 @@
+# datafetch/order_book.py
+
+import os
+import asyncio
+import logging
+import aiohttp
+from bisect import bisect_left
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from utils.error_handler import retry, RetryLimitExceeded
+from data.message_decoder import DepthUpdate, PriceLevel
+
+# Ortam Değişkenlerini Yükleme
+load_dotenv()
+
+# Ortam Değişkenleri
+BINANCE_FUTURES_API = os.getenv("BINANCE_FUTURES_API", "https://fapi.binance.com")
+ORDER_BOOK_SNAPSHOT_LIMIT = int(os.getenv("ORDER_BOOK_SNAPSHOT_LIMIT", 1000))
+MAX_BUFFERED_UPDATES = int(os.getenv("ORDER_BOOK_MAX_BUFFERED_UPDATES", 10000))
+
+# Log yapılandırması
+logger = logging.getLogger("OrderBook")
+
+# Akış günlüğünde REST anlık görüntülerinin kaydedildiği veri türü
+SNAPSHOT_DATA_TYPE = "BOOK_SNAPSHOT"
+SnapshotHandler = Callable[[str, dict], Awaitable[None]]
+
+# ================================
+# 📚 Dizi Tabanlı Sıralı Defter Tarafı
+# ================================
+
+class BookSide:
+    """
+    Bir defter tarafının fiyat seviyeleri, paralel iki dizide artan anahtar sırasıyla tutulur.
+    Anahtar alışta fiyat, satışta eksi fiyattır; böylece her iki tarafta da en iyi seviye
+    dizinin sonundadır. En iyi fiyat O(1), seviye arama O(log n) sürer ve güncellemelerin
+    çoğu en iyi fiyata yakın olduğundan ekleme/silme dizinin sonunda ucuza yapılır.
+    """
+    __slots__ = ("sign", "keys", "quantities")
+
+    def __init__(self, is_bid: bool):
+        self.sign = 1.0 if is_bid else -1.0
+        self.keys: List[float] = []
+        self.quantities: List[float] = []
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def load(self, levels: List[PriceLevel]):
+        levels = sorted((self.sign * price, quantity) for price, quantity in levels if quantity > 0)
+        self.keys = [key for key, _ in levels]
+        self.quantities = [quantity for _, quantity in levels]
+
+    def update(self, price: float, quantity: float):
+        key = self.sign * price
+        index = bisect_left(self.keys, key)
+        exists = index < len(self.keys) and self.keys[index] == key
+        if quantity == 0.0:
+            if exists:
+                del self.keys[index]
+                del self.quantities[index]
+        elif exists:
+            self.quantities[index] = quantity
+        else:
+            self.keys.insert(index, key)
+            self.quantities.insert(index, quantity)
+
+    def best(self) -> Optional[PriceLevel]:
+        if not self.keys:
+            return None
+        return self.sign * self.keys[-1], self.quantities[-1]
+
+    def top(self, n: int) -> List[PriceLevel]:
+        """En iyi n seviye, en iyiden başlayarak"""
+        start = max(len(self.keys) - n, 0)
+        return [(self.sign * key, quantity)
+                for key, quantity in zip(reversed(self.keys[start:]), reversed(self.quantities[start:]))]
+
+    def quantity_at(self, price: float) -> float:
+        key = self.sign * price
+        index = bisect_left(self.keys, key)
+        return self.quantities[index] if index < len(self.keys) and self.keys[index] == key else 0.0
+
+# ================================
+# 📖 L2 Emir Defteri
+# ================================
+
+class OrderBook:
+    """Tek sembolün yerel L2 defteri; Binance Futures fark akışı kurallarıyla güncellenir"""
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.bids = BookSide(is_bid=True)
+        self.asks = BookSide(is_bid=False)
+        self.last_update_id: Optional[int] = None
+        # Anlık görüntüden sonraki ilk fark henüz uygulanmadı
+        self.awaiting_first = False
+        self.event_time = 0
+
+    @property
+    def synced(self) -> bool:
+        return self.last_update_id is not None
+
+    def apply_snapshot(self, last_update_id: int, bids: List[PriceLevel], asks: List[PriceLevel]):
+        self.bids.load(bids)
+        self.asks.load(asks)
+        self.last_update_id = last_update_id
+        self.awaiting_first = True
+
+    def apply(self, update: DepthUpdate):
+        for price, quantity in update.bids:
+            self.bids.update(price, quantity)
+        for price, quantity in update.asks:
+            self.asks.update(price, quantity)
+        self.last_update_id = update.final_update_id
+        self.event_time = update.event_time
+
+    def reset(self):
+        self.bids.load([])
+        self.asks.load([])
+        self.last_update_id = None
+        self.awaiting_first = False
+
+    def best_bid(self) -> Optional[PriceLevel]:
+        return self.bids.best()
+
+    def best_ask(self) -> Optional[PriceLevel]:
+        return self.asks.best()
+
+    def mid_price(self) -> Optional[float]:
+        bid, ask = self.bids.best(), self.asks.best()
+        if bid is None or ask is None:
+            return None
+        return (bid[0] + ask[0]) / 2
+
+    def spread(self) -> Optional[float]:
+        bid, ask = self.bids.best(), self.asks.best()
+        if bid is None or ask is None:
+            return None
+        return ask[0] - bid[0]
+
+    def depth(self, n: int) -> Tuple[List[PriceLevel], List[PriceLevel]]:
+        """Her iki tarafta en iyi n seviye"""
+        return self.bids.top(n), self.asks.top(n)
+
+# ================================
+# 🔄 Anlık Görüntü Senkronizasyonu
+# ================================
+
+class OrderBookManager:
+    """
+    Sembol başına defterleri REST anlık görüntüsüyle senkronlar ve fark mesajlarını sırayla uygular.
+
+    Binance Futures kuralları: anlık görüntüden eski (u < lastUpdateId) farklar atılır, ilk
+    uygulanan fark U <= lastUpdateId <= u koşulunu sağlamalıdır, sonraki her farkın `pu`
+    değeri bir öncekinin `u` değerine eşit olmalıdır. Zincir koptuğunda defter sıfırlanır,
+    gelen farklar tamponlanır ve yeni anlık görüntü arka planda alınır.
+
+    `session` verilmezse anlık görüntü istenmez; defterler kaydedilmiş anlık görüntülerle
+    `load_snapshot` üzerinden senkronlanır (tekrar oynatma).
+    """
+    def __init__(self, session: Optional[aiohttp.ClientSession], base_url: str = BINANCE_FUTURES_API,
+                 snapshot_limit: int = ORDER_BOOK_SNAPSHOT_LIMIT, on_snapshot: Optional[SnapshotHandler] = None):
+        self.session = session
+        self.base_url = base_url
+        self.snapshot_limit = snapshot_limit
+        # Alınan her anlık görüntü, uygulanmadan önce bu kancaya verilir (akış günlüğüne kayıt)
+        self.on_snapshot = on_snapshot
+        self.books: Dict[str, OrderBook] = {}
+        self._buffers: Dict[str, List[DepthUpdate]] = {}
+        self._snapshots: Dict[str, asyncio.Task] = {}
+        self.resyncs = 0
+
+    def book(self, symbol: str) -> Optional[OrderBook]:
+        """Senkron defter; henüz senkron değilse None"""
+        book = self.books.get(symbol)
+        return book if book is not None and book.synced else None
+
+    async def on_depth(self, update: DepthUpdate):
+        book = self.books.get(update.symbol)
+        if book is None:
+            book = self.books[update.symbol] = OrderBook(update.symbol)
+
+        task = self._snapshots.get(update.symbol)
+        if (task is not None and not task.done()) or not book.synced:
+            buffer = self._buffers.setdefault(update.symbol, [])
+            buffer.append(update)
+            # REST uzun süre yanıt vermezse tampon sınırsız büyümesin; yeni anlık görüntü eski farkları zaten kapsar
+            if len(buffer) > MAX_BUFFERED_UPDATES:
+                del buffer[:len(buffer) - MAX_BUFFERED_UPDATES]
+            self._start_snapshot(update.symbol)
+            return
+
+        if not self._apply(book, update):
+            self._resync(book, [update])
+
+    def _apply(self, book: OrderBook, update: DepthUpdate) -> bool:
+        """Farkı uygular; sıra kopmuşsa False döndürür"""
+        if book.awaiting_first:
+            if update.final_update_id < book.last_update_id:
+                return True
+            if update.first_update_id > book.last_update_id:
+                return False
+            book.awaiting_first = False
+        elif update.prev_final_update_id != book.last_update_id:
+            return False
+        book.apply(update)
+        return True
+
+    def invalidate(self, symbol: str):
+        """Akış kesintisinden sonra defteri yeni anlık görüntüyle yeniden senkronlar"""
+        book = self.books.get(symbol)
+        if book is not None and book.synced:
+            self._resync(book, [])
+
+    def _resync(self, book: OrderBook, pending: List[DepthUpdate]):
+        logger.warning(f"{book.symbol} defterinde boşluk (son u={book.last_update_id}) - yeniden senkronlanıyor")
+        self.resyncs += 1
+        book.reset()
+        self._buffers[book.symbol] = pending
+        if self.session is not None:
+            self._snapshots[book.symbol] = asyncio.create_task(self._sync(book.symbol))
+
+    def _start_snapshot(self, symbol: str):
+        if self.session is None:
+            return
+        task = self._snapshots.get(symbol)
+        if task is None or task.done():
+            self._snapshots[symbol] = asyncio.create_task(self._sync(symbol))
+
+    async def _sync(self, symbol: str):
+        try:
+            snapshot = await retry(lambda: self._fetch_snapshot(symbol))
+        except RetryLimitExceeded:
+            logger.error(f"{symbol} anlık görüntüsü alınamadı; bir sonraki farkta tekrar denenecek")
+            return
+        if self.on_snapshot is not None:
+            try:
+                await self.on_snapshot(symbol, snapshot)
+            except Exception as e:
+                logger.error(f"{symbol} anlık görüntüsü kaydedilemedi: {str(e)}")
+        self.load_snapshot(symbol, snapshot)
+
+    def load_snapshot(self, symbol: str, snapshot: dict):
+        """REST anlık görüntüsünü uygular ve tamponlanan farkları sırayla işler"""
+        # Senkron çalışır: tampon boşaltılırken yeni fark araya giremez
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.books[symbol] = OrderBook(symbol)
+        book.apply_snapshot(
+            snapshot["lastUpdateId"],
+            [(float(p), float(q)) for p, q in snapshot["bids"]],
+            [(float(p), float(q)) for p, q in snapshot["asks"]],
+        )
+        buffered = self._buffers.pop(symbol, [])
+        for index, update in enumerate(buffered):
+            if not self._apply(book, update):
+                self._resync(book, buffered[index:])
+                return
+        logger.info(f"{symbol} defteri senkronlandı (lastUpdateId={book.last_update_id})")
+
+    async def _fetch_snapshot(self, symbol: str) -> dict:
+        url = f"{self.base_url}/fapi/v1/depth"
+        async with self.session.get(url, params={"symbol": symbol, "limit": self.snapshot_limit}) as response:
+            response.raise_for_status()
+            return await response.json()
+
+    async def close(self):
+        for task in self._snapshots.values():
+            task.cancel()
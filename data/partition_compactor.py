@@ -0,0 +1,115 @@
+# datafetch/partition_compactor.py
+
+import os
+import asyncio
+import logging
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from pathlib import Path
+from datetime import date, datetime
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from data.historicaldatafetch import (
+    HistoricalBackfill, HistoricalDataFetcher, DataType, KlineInterval, Symbol,
+    _describe_partition, _encode_partition, _split_by_day, _write_atomic, _month_start
+)
+from storage.database_handler import PartitionRecord
+
+# Ortam Değişkenlerini Yükleme
+load_dotenv()
+
+# Ortam Değişkenleri
+# Bir haftalık 1m bar; zaman aralığı sorgularında satır grubu istatistikleriyle budama yapılabilir
+COMPACTION_ROW_GROUP_SIZE = int(os.getenv("COMPACTION_ROW_GROUP_SIZE", 10080))
+
+# Log yapılandırması
+logger = logging.getLogger("PartitionCompactor")
+
+# ================================
+# 🗜️ Aylık Bölüm Birleştirme
+# ================================
+
+class PartitionCompactor:
+    """
+    Kapanmış ayların günlük bölümlerini zamana göre sıralı tek bir aylık parquet
+    dosyasında birleştirir. İçinde bulunulan ay günlük dosyalarda kalır.
+
+    Sıra çökmeye karşı güvenlidir: aylık dosya atomik yazılır, ardından ayın tüm
+    günleri tek bir katalog işleminde yeni dosyaya yönlendirilir ve en son
+    günlük dosyalar silinir. Katalog güncellenmeden önce kesilen bir çalıştırma
+    mevcut günlük bölümleri bozmaz.
+    """
+    def __init__(self, fetcher: HistoricalDataFetcher, row_group_size: int = COMPACTION_ROW_GROUP_SIZE):
+        self.fetcher = fetcher
+        self.catalog = fetcher.catalog
+        self.row_group_size = row_group_size
+
+    def compact(self, before: Optional[datetime] = None) -> int:
+        """`before` ayından (varsayılan: içinde bulunulan ay) önceki ayları birleştirir; birleştirilen ay sayısını döndürür"""
+        cutoff = _month_start(before or datetime.utcnow()).date()
+        months: Dict[Tuple[str, str, date], List[PartitionRecord]] = defaultdict(list)
+        for record in self.catalog.all_partitions():
+            if record.symbol != self.fetcher.symbol.value or record.day >= cutoff:
+                continue
+            months[(record.data_type, record.interval, record.day.replace(day=1))].append(record)
+
+        compacted = 0
+        for (data_type, interval, month), records in sorted(months.items()):
+            month = datetime.combine(month, datetime.min.time())
+            monthly_path = self.fetcher._get_monthly_path(DataType(data_type), KlineInterval(interval), month)
+            if all(record.path == str(monthly_path) for record in records):
+                continue
+            self._compact_month(DataType(data_type), KlineInterval(interval), month, records, monthly_path)
+            compacted += 1
+        logger.info(f"{self.fetcher.symbol.value}: {compacted} ay birleştirildi.")
+        return compacted
+
+    def _compact_month(self, data_type: DataType, interval: KlineInterval, month: datetime,
+                       records: List[PartitionRecord], monthly_path: Path):
+        # Önceden birleştirilmiş aylık dosya önce okunur; aynı bar iki kaynakta varsa günlük dosya kazanır
+        sources = sorted({record.path for record in records}, key=lambda path: path != str(monthly_path))
+        tables = [self.fetcher.reader.read_file(Path(path)) for path in sources]
+        schema = tables[0].schema.remove_metadata()
+        table = pa.concat_tables([t.replace_schema_metadata(None).cast(schema) for t in tables])
+        table = _sort_unique(table)
+
+        data = _encode_partition(table, self.fetcher.codec, row_group_size=self.row_group_size, write_statistics=True)
+        digest = _write_atomic(monthly_path, data)
+        day_tables = {day.date(): day_table for day, day_table in _split_by_day(table)}
+        # Kaynakta boş olan günler de katalogda kalır ve aylık dosyaya yönlendirilir
+        empty = table.slice(0, 0)
+        self.catalog.upsert_many(
+            self.fetcher._partition_record(
+                data_type, interval, datetime.combine(day, datetime.min.time()),
+                _describe_partition(day_tables.get(day, empty), data), digest, monthly_path
+            )
+            for day in sorted(set(day_tables) | {record.day for record in records})
+        )
+
+        for path in sources:
+            if path != str(monthly_path):
+                Path(path).unlink(missing_ok=True)
+        logger.info(
+            f"{monthly_path} yazıldı: {len(sources)} dosya → 1 dosya, {table.num_rows} satır, {len(data) / 1e6:.2f} MB"
+        )
+
+def _sort_unique(table: pa.Table) -> pa.Table:
+    """open_time'a göre kararlı sıralar ve yinelenen barlardan sonuncusunu bırakır"""
+    table = table.take(pc.sort_indices(table, sort_keys=[("open_time", "ascending")]))
+    open_ms = table['open_time'].cast(pa.int64()).to_numpy()
+    keep = np.append(open_ms[1:] != open_ms[:-1], True)
+    return table if keep.all() else table.filter(pa.array(keep))
+
+# Ana Çalıştırma Fonksiyonu
+async def main():
+    backfill = HistoricalBackfill(list(Symbol))
+    try:
+        for fetcher in backfill.fetchers:
+            await asyncio.to_thread(PartitionCompactor(fetcher).compact)
+    finally:
+        await backfill.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
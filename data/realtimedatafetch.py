@@ -10,13 +10,22 @@ from enum import Enum, auto
 from aiolimiter import AsyncLimiter
 import logging
 from pathlib import Path
-import json
-import gzip
-from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from typing import Optional
+import time
+import orjson
 from dotenv import load_dotenv
 from utils.error_handler import handle_errors, retry, DataFetchError, NetworkError, RetryLimitExceeded
-from websockets.client import connect
-from websockets.exceptions import ConnectionClosed, PayloadTooBig
+from storage.file_manager import StorageCodec, ZSTD_DICT_SAMPLES
+from storage.tick_log import TickLog
+from data.stream_connections import ExchangeConnection, PROTOCOLS
+from data.message_decoder import AggTrade
+from data.gap_backfill import BinanceGapFiller
+from data.bar_aggregator import BarAggregator
+from data.tick_store import TickStore
+from utils.latency_monitor import LatencyMonitor
+from data.order_book import OrderBookManager, SNAPSHOT_DATA_TYPE
+from data.market_data_bus import MarketDataBus
+from data.market_pipeline import MarketDataPipeline
 
 # Ortam Değişkenlerini Yükleme
 load_dotenv()
@@ -27,6 +36,7 @@ API_RATE_LIMIT = int(os.getenv("API_RATE_LIMIT", 100))
 REALTIME_DATA_PATH = os.getenv("REALTIME_DATA_PATH", "data/realtime")
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 ENV_MODE = os.getenv("ENV_MODE", "development")
+BAR_TIMER_SECONDS = float(os.getenv("BAR_TIMER_SECONDS", 0.1))
 NODE_ID = os.getenv("NODE_ID", "default-node")
 
 # Log Yapılandırması
@@ -59,92 +69,193 @@ class Symbol(Enum):
     SOLUSDT = auto()
 
 # Ana Veri Çekici Sınıf
-class RealTimeDataFetcher:
+class RealTimeDataFetcher(MarketDataPipeline):
     def __init__(self):
-        self.sessions = self._init_sessions()
+        # Akışlar stream_connections üzerinden çoklanır; oturum yalnızca REST içindir
+        # (defter anlık görüntüleri ve boşluk doldurma) ve sertifikayı doğrular
+        self.rest_session = self._init_rest_session()
         self.limiter = AsyncLimiter(API_RATE_LIMIT, 1)
-        self.cipher = AESGCM(ENCRYPTION_KEY.encode())
         self.realtime_data_path = Path(REALTIME_DATA_PATH)
         self.realtime_data_path.mkdir(parents=True, exist_ok=True)
+        # Küçük JSON mesajları akış başına eğitilmiş zstd sözlükleriyle sıkıştırılır
+        self.codec = StorageCodec(ENCRYPTION_KEY, dictionary_dir=self.realtime_data_path / "dictionaries")
+        self._dict_samples = {}
+        self._training = set()
+        # Mesajlar akış başına yalnızca sona eklenen segmentlere toplu yazılır
+        self.tick_log = TickLog(self.realtime_data_path, self.codec)
+        # @depth farklarından sembol başına yerel L2 defter
+        # REST anlık görüntüleri de kaydedilir; tekrar oynatmada defterler ağsız kurulur
+        self.order_books = OrderBookManager(self.rest_session, on_snapshot=self._record_snapshot)
+        # Çözülmüş kayıtlar tüketicilere sınırlı abone kuyruklarıyla dağıtılır
+        self.bus = MarketDataBus()
+        # aggTrade akışından artımlı zaman/işlem/hacim/dolar çubukları (tipli işlemler yalnızca Binance)
+        self.bars = BarAggregator()
+        self._bar_timer = None
+        # Tüm borsaların işlemleri ortak sütunlu halkalarda
+        self.ticks = TickStore()
+        # Borsa olay zamanından emir yönlendirmeye kadar aşama gecikmeleri
+        self.latency = LatencyMonitor()
+        # Borsa başına tek websocket; akış adı → (veri türü, sembol) yönlendirme tablosu
+        self.connections = {}
+        self._routes = {}
+        self._tasks = {}
+        # Akış başına son görülen (olay kimliği, olay zamanı ms); yeniden bağlanınca boşluk buradan doldurulur
+        self.positions = {}
+        self.gap_filler = BinanceGapFiller(self.rest_session, self.limiter)
 
-    def _init_sessions(self):
-        return {
-            exchange: aiohttp.ClientSession(
-                connector=aiohttp.TCPConnector(limit=100, ssl=False),
-                headers={'User-Agent': 'RealTimeFetcher'},
-                timeout=aiohttp.ClientTimeout(total=10)
-            ) for exchange in Exchange
-        }
+    def _init_rest_session(self):
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=100),
+            headers={'User-Agent': 'RealTimeFetcher'},
+            timeout=aiohttp.ClientTimeout(total=10)
+        )
 
     @handle_errors
     async def fetch_data(self, exchange: Exchange, data_type: DataType, symbol: Symbol):
-        """Gerçek zamanlı veri akışı başlatma"""
-        ws_url = self._get_ws_endpoint(exchange)
-        stream_name = self._get_stream_name(data_type, symbol)
+        """Akışa abone olur ve borsanın ortak bağlantısı kapanana kadar bekler"""
+        await self.subscribe(exchange, data_type, symbol)
+        logger.info(f"{exchange.name} üzerinde {symbol.name} için {data_type.name} verisi dinleniyor...")
+        await self._tasks[exchange]
+
+    async def subscribe(self, exchange: Exchange, data_type: DataType, symbol: Symbol):
+        """Akışı borsanın ortak bağlantısına ekler; bağlantı yoksa başlatır"""
+        connection = self._connection(exchange)
+        stream = connection.protocol.stream_name(data_type.name, symbol.name)
+        self._routes[(exchange, stream)] = (data_type, symbol)
+        await connection.subscribe([stream])
+        if exchange not in self._tasks:
+            self._tasks[exchange] = asyncio.create_task(connection.run())
+        if self._bar_timer is None:
+            self._bar_timer = asyncio.create_task(self._close_time_bars())
+        self.latency.start()
+
+    async def wait_closed(self):
+        """Tüm borsa bağlantıları kapanana kadar bekler"""
+        await asyncio.gather(*self._tasks.values())
+
+    async def unsubscribe(self, exchange: Exchange, data_type: DataType, symbol: Symbol):
+        """Akışı yeniden bağlanmadan bırakır"""
+        connection = self.connections.get(exchange)
+        if connection is None:
+            return
+        stream = connection.protocol.stream_name(data_type.name, symbol.name)
+        await connection.unsubscribe([stream])
+        self._routes.pop((exchange, stream), None)
+
+    def _connection(self, exchange: Exchange) -> ExchangeConnection:
+        if exchange not in self.connections:
+            async def on_message(stream: str, payload: dict, raw: bytes, received_ns: int):
+                data_type, symbol = self._routes[(exchange, stream)]
+                await self._process_data(payload, exchange, data_type, symbol, raw, received_ns)
+            async def on_connect():
+                await self._fill_gaps(exchange)
+            self.connections[exchange] = ExchangeConnection(exchange.name, PROTOCOLS[exchange.name](), on_message, on_connect)
+        return self.connections[exchange]
+
+    async def _process_data(self, data: dict, exchange: Exchange, data_type: DataType, symbol: Symbol,
+                            raw: Optional[bytes] = None, received_ns: Optional[int] = None):
+        """
+        Verileri kaydeder, tipli kayda çözer ve ortak hattan veri yoluna yayınlar. Ham çerçeve
+        olduğu gibi saklanır; tekrar serileştirme yapılmaz. Binance mesajları sayısal alanlı
+        kayıtlara, diğer borsalarınki sözlük olarak döner.
+        """
+        record = self._decode(exchange.name, data)
+        event_ms = None
+        if exchange == Exchange.BINANCE:
+            event_ms = getattr(record, "event_time", None)
+            if isinstance(record, AggTrade):
+                last = self.positions.get((exchange, data_type, symbol))
+                if last is not None and record.trade_id <= last[0]:
+                    # REST ile doldurulmuş boşluğun canlı akıştaki tekrarı
+                    return None
+                self.positions[(exchange, data_type, symbol)] = (record.trade_id, record.trade_time)
+            elif record is not None:
+                self.positions[(exchange, data_type, symbol)] = (None, record.event_time)
+        else:
+            self.positions[(exchange, data_type, symbol)] = (None, time.time_ns() // 1_000_000)
+        decoded_ns = time.time_ns()
+
+        payload = raw if raw is not None else orjson.dumps(data)
+        stream = f"{exchange.name}-{data_type.name}"
+        self._collect_dictionary_sample(stream, payload)
+        await self.tick_log.append(exchange.name, symbol.name, data_type.name, payload, dictionary=stream)
+        if record is not None:
+            await self._handle_record(exchange.name, data_type.name, symbol.name, record,
+                                      received_ns, event_ms, decoded_ns)
+        return record
+
+    async def _close_time_bars(self):
+        """Zaman çubuklarını sınırda, bir sonraki işlemi beklemeden kapatır"""
+        while True:
+            await asyncio.sleep(BAR_TIMER_SECONDS)
+            await self._close_expired_bars(time.time_ns() // 1_000_000)
+
+    async def _fill_gaps(self, exchange: Exchange):
+        """
+        Yeniden bağlantıdan sonra, canlı mesajlar bırakılmadan önce çalışır. Binance işlemleri
+        son görülen aggTrade kimliğinden REST ile tamamlanır, defterler yeni anlık görüntüyle
+        yeniden senkronlanır. Fonlama akışı son durumu taşıdığından doldurulmaz; diğer
+        borsalar için kesinti süresi kaydedilir.
+        """
+        now_ms = time.time_ns() // 1_000_000
+        for (route_exchange, stream), (data_type, symbol) in list(self._routes.items()):
+            position = self.positions.get((exchange, data_type, symbol))
+            if route_exchange != exchange or position is None:
+                continue
+            last_id, last_ms = position
+            if exchange == Exchange.BINANCE and data_type == DataType.TRADES:
+                filled = 0
+                try:
+                    async for payload in self.gap_filler.agg_trades(symbol.name, last_id + 1):
+                        envelope = orjson.dumps({"stream": stream, "data": payload})
+                        await self._process_data(payload, exchange, data_type, symbol, envelope)
+                        filled += 1
+                except RetryLimitExceeded:
+                    logger.error(f"{exchange.name} {stream}: boşluk doldurulamadı, {filled} işlem alındı")
+                    continue
+                logger.info(f"{exchange.name} {stream}: {(now_ms - last_ms) / 1000:.1f} sn boşluk {filled} işlemle dolduruldu")
+            elif exchange == Exchange.BINANCE and data_type == DataType.BOOK_DEPTH:
+                self.order_books.invalidate(symbol.name)
+            elif exchange != Exchange.BINANCE:
+                logger.warning(f"{exchange.name} {stream}: {(now_ms - last_ms) / 1000:.1f} sn boşluk REST ile doldurulamıyor")
+
+    async def _record_snapshot(self, symbol: str, snapshot: dict):
+        await self.tick_log.append(Exchange.BINANCE.name, symbol, SNAPSHOT_DATA_TYPE, orjson.dumps(snapshot))
+
+    def _collect_dictionary_sample(self, stream: str, payload: bytes):
+        """Sözlüğü olmayan akışlar için örnek toplar; yeterli örnek birikince sözlüğü arka planda eğitir"""
+        if self.codec.dictionary(stream) is not None or stream in self._training:
+            return
+        samples = self._dict_samples.setdefault(stream, [])
+        samples.append(payload)
+        if len(samples) >= ZSTD_DICT_SAMPLES:
+            self._training.add(stream)
+            del self._dict_samples[stream]
+            asyncio.get_running_loop().run_in_executor(None, self._train_dictionary, stream, samples)
 
+    def _train_dictionary(self, stream: str, samples: list):
         try:
-            async with connect(f"{ws_url}/{stream_name}") as ws:
-                logger.info(f"{exchange.name} üzerinde {symbol.name} için {data_type.name} verisi dinleniyor...")
-                while True:
-                    try:
-                        raw = await ws.recv()
-                        decrypted_data = self._decrypt_data(raw)
-                        await self._process_data(decrypted_data, exchange, data_type, symbol)
-                    except (ConnectionClosed, PayloadTooBig) as e:
-                        logger.warning(f"Bağlantı hatası: {str(e)} - Yeniden bağlanıyor...")
-                        await asyncio.sleep(2)
-                        break
+            self.codec.train_dictionary(stream, samples)
         except Exception as e:
-            logger.error(f"{exchange.name} veri akışı başarısız: {str(e)}")
-
-    def _get_ws_endpoint(self, exchange: Exchange) -> str:
-        endpoints = {
-            Exchange.BINANCE: "wss://fstream.binance.com/ws",
-            Exchange.BYBIT: "wss://stream.bybit.com/realtime",
-            Exchange.OKX: "wss://ws.okx.com:8443/ws/v5/public",
-            Exchange.KRAKEN: "wss://ws.kraken.com",
-            Exchange.DERIBIT: "wss://www.deribit.com/ws/api/v2"
-        }
-        return endpoints[exchange]
-
-    def _get_stream_name(self, data_type: DataType, symbol: Symbol) -> str:
-        symbol_map = {
-            Symbol.BTCUSDT: "btcusdt",
-            Symbol.ETHUSDT: "ethusdt",
-            Symbol.SOLUSDT: "solusdt"
-        }
-        stream_map = {
-            DataType.BOOK_DEPTH: f"{symbol_map[symbol]}@depth",
-            DataType.TRADES: f"{symbol_map[symbol]}@aggTrade",
-            DataType.FUNDING_RATE: f"{symbol_map[symbol]}@fundingRate"
-        }
-        return stream_map[data_type]
-
-    async def _process_data(self, data: dict, exchange: Exchange, data_type: DataType, symbol: Symbol):
-        """Verileri işleme ve kaydetme"""
-        timestamp = datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S')
-        file_path = self.realtime_data_path / f"{exchange.name}/{symbol.name}/{timestamp}.json.gz"
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-
-        encrypted_data = self._encrypt_data(json.dumps(data).encode())
-        compressed_data = gzip.compress(encrypted_data)
-
-        async with aiofiles.open(file_path, 'wb') as f:
-            await f.write(compressed_data)
-
-    def _encrypt_data(self, data: bytes) -> bytes:
-        nonce = os.urandom(12)
-        return nonce + self.cipher.encrypt(nonce, data, None)
-
-    def _decrypt_data(self, data: bytes) -> dict:
-        nonce = data[:12]
-        decrypted = self.cipher.decrypt(nonce, data[12:], None)
-        return json.loads(decrypted.decode())
+            # Örnekler birbirine çok benzer veya yetersizse eğitim başarısız olabilir; yeniden toplanır
+            logger.warning(f"{stream} için zstd sözlüğü eğitilemedi: {str(e)}")
+        finally:
+            self._training.discard(stream)
 
     async def close(self):
         """Bağlantıları düzgün bir şekilde kapatma"""
-        for session in self.sessions.values():
-            await session.close()
+        for connection in self.connections.values():
+            await connection.close()
+        for task in self._tasks.values():
+            task.cancel()
+        if self._bar_timer is not None:
+            self._bar_timer.cancel()
+        self.latency.close()
+        self.latency.log()
+        self.bus.close()
+        await self.tick_log.close()
+        await self.order_books.close()
+        await self.rest_session.close()
 
 # Ana Çalıştırma Fonksiyonu
 async def main():
@@ -0,0 +1,154 @@
+# datafetch/replay_source.py
+
+import os
+import time
+import heapq
+import asyncio
+import logging
+from pathlib import Path
+from typing import Iterator, Optional, Set, Tuple
+from dotenv import load_dotenv
+from storage.file_manager import StorageCodec
+from storage.tick_log import TickLogReader
+from data.stream_connections import PROTOCOLS, ExchangeProtocol
+from data.message_decoder import loads
+from data.order_book import OrderBookManager, SNAPSHOT_DATA_TYPE
+from data.market_data_bus import MarketDataBus
+from data.market_pipeline import MarketDataPipeline
+from data.bar_aggregator import BarAggregator
+from data.tick_store import TickStore
+from data.realtimedatafetch import Exchange, DataType, Symbol, BAR_TIMER_SECONDS
+from utils.latency_monitor import LatencyMonitor
+
+# Ortam Değişkenlerini Yükleme
+load_dotenv()
+
+# Ortam Değişkenleri
+ENCRYPTION_KEY = os.getenv("ENCRYPTION_KEY")
+REALTIME_DATA_PATH = os.getenv("REALTIME_DATA_PATH", "data/realtime")
+# 1 = kayıttaki zamanlama, N = N kat hızlı, 0 = bekleme olmadan olabildiğince hızlı
+REPLAY_SPEED = float(os.getenv("REPLAY_SPEED", 1.0))
+# En hızlı modda olay döngüsünün bu kadar mesajda bir diğer görevlere bırakılması
+REPLAY_YIELD_EVERY = int(os.getenv("REPLAY_YIELD_EVERY", 1000))
+
+# Log yapılandırması
+logger = logging.getLogger("ReplaySource")
+
+# (alınma zamanı ms, borsa, sembol, veri türü, ham çerçeve)
+ReplayItem = Tuple[int, str, str, str, bytes]
+
+# ================================
+# ⏪ Kayıttan Tekrar Oynatma
+# ================================
+
+class ReplayDataFetcher(MarketDataPipeline):
+    """
+    Akış günlüğüne kaydedilmiş oturumu RealTimeDataFetcher ile aynı arayüzle yeniden oynatır:
+    `subscribe` ile akışlar seçilir, tüketiciler `bus` üzerinden abone olur ve `wait_closed`
+    oynatma bitene kadar bekler. Akışlar alınma zamanına göre birleştirilir; eşit zamanlar
+    akış sırasıyla çözülür, böylece aynı kayıt her seferinde aynı olay sırasını üretir.
+
+    Defterler kaydedilmiş REST anlık görüntüleriyle ağsız senkronlanır. Borsa olay zamanı
+    geçmişte kaldığından gecikme histogramlarına yalnızca yerel aşamalar yazılır.
+    """
+    def __init__(self, root: Path = Path(REALTIME_DATA_PATH), speed: float = REPLAY_SPEED,
+                 start_ms: Optional[int] = None, end_ms: Optional[int] = None):
+        self.root = Path(root)
+        self.speed = speed
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self.codec = StorageCodec(ENCRYPTION_KEY, dictionary_dir=self.root / "dictionaries")
+        self.reader = TickLogReader(self.root, self.codec)
+        self.order_books = OrderBookManager(None)
+        self.bus = MarketDataBus()
+        self.bars = BarAggregator()
+        self.ticks = TickStore()
+        self.latency = LatencyMonitor()
+        self.replayed = 0
+        self._streams: Set[Tuple[str, str, str]] = set()
+        self._protocols = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def subscribe(self, exchange: Exchange, data_type: DataType, symbol: Symbol):
+        """Akışı oynatmaya ekler; defter akışları kayıtlı anlık görüntüleriyle birlikte oynatılır"""
+        self._streams.add((exchange.name, symbol.name, data_type.name))
+        if exchange == Exchange.BINANCE and data_type == DataType.BOOK_DEPTH:
+            self._streams.add((exchange.name, symbol.name, SNAPSHOT_DATA_TYPE))
+
+    async def unsubscribe(self, exchange: Exchange, data_type: DataType, symbol: Symbol):
+        self._streams.discard((exchange.name, symbol.name, data_type.name))
+        self._streams.discard((exchange.name, symbol.name, SNAPSHOT_DATA_TYPE))
+
+    def first_timestamp_ms(self, exchange: Exchange, data_type: DataType, symbol: Symbol) -> Optional[int]:
+        """Akışta oynatılacak ilk mesajın alınma zamanı; kayıt yoksa None"""
+        for timestamp_ms, _ in self.reader.read(exchange.name, symbol.name, data_type.name, self.start_ms, self.end_ms):
+            return timestamp_ms
+        return None
+
+    async def wait_closed(self):
+        """Oynatmayı başlatır ve bitene kadar bekler"""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+        await self._task
+
+    def _iter_stream(self, exchange: str, symbol: str, data_type: str) -> Iterator[ReplayItem]:
+        for timestamp_ms, raw in self.reader.read(exchange, symbol, data_type, self.start_ms, self.end_ms):
+            yield timestamp_ms, exchange, symbol, data_type, raw
+
+    async def run(self):
+        streams = sorted(self._streams)
+        logger.info(f"{len(streams)} akış oynatılıyor (hız: {self.speed or 'en hızlı'})")
+        merged = heapq.merge(*(self._iter_stream(*stream) for stream in streams), key=lambda item: item[0])
+        self.latency.start()
+        started = time.monotonic()
+        first_ms = None
+        next_bar_check = 0
+        try:
+            for timestamp_ms, exchange, symbol, data_type, raw in merged:
+                if self.speed > 0:
+                    if first_ms is None:
+                        first_ms = timestamp_ms
+                    delay = (timestamp_ms - first_ms) / 1000 / self.speed - (time.monotonic() - started)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                elif self.replayed % REPLAY_YIELD_EVERY == 0:
+                    await asyncio.sleep(0)
+
+                await self._replay(exchange, symbol, data_type, raw)
+                self.replayed += 1
+                # Zaman çubukları duvar saati yerine kayıt saatine göre kapanır
+                if timestamp_ms >= next_bar_check:
+                    await self._close_expired_bars(timestamp_ms)
+                    next_bar_check = timestamp_ms + int(BAR_TIMER_SECONDS * 1000)
+        finally:
+            elapsed = time.monotonic() - started
+            logger.info(f"Oynatma bitti: {self.replayed} mesaj, {elapsed:.1f} sn, "
+                        f"{self.replayed / max(elapsed, 1e-9):,.0f} mesaj/s")
+            # Aboneler kuyruklarını boşaltıp sonlanır
+            self.bus.close()
+
+    async def _replay(self, exchange: str, symbol: str, data_type: str, raw: bytes):
+        """Kayıtlı çerçeveyi canlı akışla aynı hattan işler; borsa olay zamanı gecikmeye yazılmaz"""
+        received_ns = time.time_ns()
+        if data_type == SNAPSHOT_DATA_TYPE:
+            self.order_books.load_snapshot(symbol, loads(raw))
+            return
+        routed = self._protocol(exchange).route(loads(raw))
+        if routed is None:
+            return
+        record = self._decode(exchange, routed[1])
+        if record is None:
+            return
+        await self._handle_record(exchange, data_type, symbol, record, received_ns, None, time.time_ns())
+
+    def _protocol(self, exchange: str) -> ExchangeProtocol:
+        if exchange not in self._protocols:
+            self._protocols[exchange] = PROTOCOLS[exchange]()
+        return self._protocols[exchange]
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+        self.bus.close()
+        self.latency.close()
+        self.latency.log()
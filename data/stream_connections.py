@@ -0,0 +1,359 @@
+# datafetch/stream_connections.py
+
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from dotenv import load_dotenv
+from websockets.client import connect
+from websockets.exceptions import ConnectionClosed, PayloadTooBig
+from data.message_decoder import loads
+
+# Ortam Değişkenlerini Yükleme
+load_dotenv()
+
+# Ortam Değişkenleri
+BINANCE_STREAM_API = os.getenv("BINANCE_STREAM_API", "wss://fstream.binance.com/stream")
+RECONNECT_DELAY = float(os.getenv("RECONNECT_DELAY", 2))
+RECONNECT_MAX_DELAY = float(os.getenv("RECONNECT_MAX_DELAY", 60))
+# Bu kadar açık kalan bağlantıdan sonra geri çekilme sıfırlanır
+RECONNECT_RESET_SECONDS = float(os.getenv("RECONNECT_RESET_SECONDS", 60))
+# Boşluk doldurulurken tamponlanan en fazla canlı mesaj; aşılırsa tampon atılır ve boşluk yeniden doldurulur
+STREAM_MAX_PENDING_MESSAGES = int(os.getenv("STREAM_MAX_PENDING_MESSAGES", 50000))
+
+# Log yapılandırması
+logger = logging.getLogger("StreamConnections")
+
+# (akış adı, çözülmüş yük, ham çerçeve, alınma zamanı time_ns)
+MessageHandler = Callable[[str, Any, bytes, int], Awaitable[None]]
+# Her bağlantıdan sonra, canlı mesajlar bırakılmadan önce çağrılır (boşluk doldurma)
+ConnectHandler = Callable[[], Awaitable[None]]
+
+# ================================
+# 🔌 Borsa Protokolleri
+# ================================
+
+class ExchangeProtocol:
+    """
+    Bir borsanın websocket protokolü: akış adları, abonelik mesajları ve gelen
+    mesajdan akış adının çıkarılması. Akış adları borsanın kendi adlandırmasıdır
+    ve yönlendirme anahtarı olarak kullanılır.
+    """
+    url: str
+    # Sunucunun bağlantıyı canlı saymak için beklediği uygulama seviyesi ping
+    heartbeat: Optional[str] = None
+    heartbeat_interval: float = 20.0
+
+    def __init__(self):
+        self._request_id = 0
+
+    def stream_name(self, data_type: str, symbol: str) -> str:
+        raise NotImplementedError
+
+    def subscribe_message(self, streams: List[str]) -> str:
+        raise NotImplementedError
+
+    def unsubscribe_message(self, streams: List[str]) -> str:
+        raise NotImplementedError
+
+    def route(self, message: Any) -> Optional[Tuple[str, Any]]:
+        """Veri mesajı için (akış adı, yük), kontrol mesajları için None döndürür"""
+        raise NotImplementedError
+
+    def _next_id(self) -> int:
+        self._request_id += 1
+        return self._request_id
+
+class BinanceProtocol(ExchangeProtocol):
+    """Binance Futures combined streams: {"stream": ..., "data": ...}"""
+    url = BINANCE_STREAM_API
+    STREAMS = {"BOOK_DEPTH": "{symbol}@depth", "TRADES": "{symbol}@aggTrade", "FUNDING_RATE": "{symbol}@markPrice"}
+
+    def stream_name(self, data_type: str, symbol: str) -> str:
+        return self.STREAMS[data_type].format(symbol=symbol.lower())
+
+    def subscribe_message(self, streams: List[str]) -> str:
+        return json.dumps({"method": "SUBSCRIBE", "params": streams, "id": self._next_id()})
+
+    def unsubscribe_message(self, streams: List[str]) -> str:
+        return json.dumps({"method": "UNSUBSCRIBE", "params": streams, "id": self._next_id()})
+
+    def route(self, message: Any) -> Optional[Tuple[str, Any]]:
+        if isinstance(message, dict) and "stream" in message:
+            return message["stream"], message["data"]
+        return None
+
+class BybitProtocol(ExchangeProtocol):
+    """Bybit v5 public linear: {"topic": ..., "data": ...}"""
+    url = "wss://stream.bybit.com/v5/public/linear"
+    heartbeat = json.dumps({"op": "ping"})
+    STREAMS = {"BOOK_DEPTH": "orderbook.200.{symbol}", "TRADES": "publicTrade.{symbol}", "FUNDING_RATE": "tickers.{symbol}"}
+
+    def stream_name(self, data_type: str, symbol: str) -> str:
+        return self.STREAMS[data_type].format(symbol=symbol)
+
+    def subscribe_message(self, streams: List[str]) -> str:
+        return json.dumps({"op": "subscribe", "args": streams, "req_id": str(self._next_id())})
+
+    def unsubscribe_message(self, streams: List[str]) -> str:
+        return json.dumps({"op": "unsubscribe", "args": streams, "req_id": str(self._next_id())})
+
+    def route(self, message: Any) -> Optional[Tuple[str, Any]]:
+        if isinstance(message, dict) and "topic" in message:
+            return message["topic"], message
+        return None
+
+class OkxProtocol(ExchangeProtocol):
+    """OKX v5 public: {"arg": {"channel": ..., "instId": ...}, "data": [...]}"""
+    url = "wss://ws.okx.com:8443/ws/v5/public"
+    heartbeat = "ping"
+    CHANNELS = {"BOOK_DEPTH": "books", "TRADES": "trades", "FUNDING_RATE": "funding-rate"}
+
+    def stream_name(self, data_type: str, symbol: str) -> str:
+        return f"{self.CHANNELS[data_type]}:{symbol[:-4]}-{symbol[-4:]}-SWAP"
+
+    def subscribe_message(self, streams: List[str]) -> str:
+        return json.dumps({"op": "subscribe", "args": [self._arg(stream) for stream in streams]})
+
+    def unsubscribe_message(self, streams: List[str]) -> str:
+        return json.dumps({"op": "unsubscribe", "args": [self._arg(stream) for stream in streams]})
+
+    def route(self, message: Any) -> Optional[Tuple[str, Any]]:
+        if isinstance(message, dict) and "data" in message and "arg" in message:
+            return f"{message['arg']['channel']}:{message['arg']['instId']}", message
+        return None
+
+    def _arg(self, stream: str) -> dict:
+        channel, inst_id = stream.split(":")
+        return {"channel": channel, "instId": inst_id}
+
+class KrakenProtocol(ExchangeProtocol):
+    """Kraken v2 spot: {"channel": ..., "data": [{"symbol": ...}]}; fonlama oranı yoktur"""
+    url = "wss://ws.kraken.com/v2"
+    CHANNELS = {"BOOK_DEPTH": "book", "TRADES": "trade"}
+
+    def stream_name(self, data_type: str, symbol: str) -> str:
+        if data_type not in self.CHANNELS:
+            raise ValueError(f"Kraken {data_type} akışını desteklemiyor")
+        return f"{self.CHANNELS[data_type]}:{symbol[:-4]}/{symbol[-4:]}"
+
+    def subscribe_message(self, streams: List[str]) -> str:
+        return self._request("subscribe", streams)
+
+    def unsubscribe_message(self, streams: List[str]) -> str:
+        return self._request("unsubscribe", streams)
+
+    def route(self, message: Any) -> Optional[Tuple[str, Any]]:
+        if isinstance(message, dict) and message.get("channel") in self.CHANNELS.values() and message.get("data"):
+            return f"{message['channel']}:{message['data'][0]['symbol']}", message
+        return None
+
+    def _request(self, method: str, streams: List[str]) -> str:
+        # Kraken her istekte tek kanal kabul eder; aynı kanaldaki semboller birleştirilir
+        by_channel: Dict[str, List[str]] = {}
+        for stream in streams:
+            channel, symbol = stream.split(":")
+            by_channel.setdefault(channel, []).append(symbol)
+        return "\n".join(
+            json.dumps({"method": method, "params": {"channel": channel, "symbol": symbols}, "req_id": self._next_id()})
+            for channel, symbols in by_channel.items()
+        )
+
+class DeribitProtocol(ExchangeProtocol):
+    """Deribit JSON-RPC: {"method": "subscription", "params": {"channel": ..., "data": ...}}"""
+    url = "wss://www.deribit.com/ws/api/v2"
+    STREAMS = {"BOOK_DEPTH": "book.{instrument}.100ms", "TRADES": "trades.{instrument}.100ms",
+               "FUNDING_RATE": "ticker.{instrument}.100ms"}
+
+    def stream_name(self, data_type: str, symbol: str) -> str:
+        base = symbol[:-4]
+        instrument = f"{base}-PERPETUAL" if base in ("BTC", "ETH") else f"{base}_USDC-PERPETUAL"
+        return self.STREAMS[data_type].format(instrument=instrument)
+
+    def subscribe_message(self, streams: List[str]) -> str:
+        return self._rpc("public/subscribe", streams)
+
+    def unsubscribe_message(self, streams: List[str]) -> str:
+        return self._rpc("public/unsubscribe", streams)
+
+    def route(self, message: Any) -> Optional[Tuple[str, Any]]:
+        if isinstance(message, dict) and message.get("method") == "subscription":
+            return message["params"]["channel"], message["params"]["data"]
+        return None
+
+    def _rpc(self, method: str, streams: List[str]) -> str:
+        return json.dumps({"jsonrpc": "2.0", "method": method, "params": {"channels": streams}, "id": self._next_id()})
+
+PROTOCOLS = {
+    "BINANCE": BinanceProtocol,
+    "BYBIT": BybitProtocol,
+    "OKX": OkxProtocol,
+    "KRAKEN": KrakenProtocol,
+    "DERIBIT": DeribitProtocol,
+}
+
+# ================================
+# 🔀 Çoklanmış Borsa Bağlantısı
+# ================================
+
+class ExchangeConnection:
+    """
+    Bir borsadaki tüm akışları tek websocket üzerinden taşır ve gelen mesajları
+    akış adına göre yönlendirir. Abonelikler çalışma sırasında eklenip çıkarılabilir;
+    bağlantı yeniden kurulduğunda mevcut abonelikler tek istekte yenilenir.
+
+    Bağlantı koptuğunda rastgele sapmalı üstel geri çekilmeyle yeniden bağlanılır. Her
+    bağlantıdan sonra `on_connect` çalışırken gelen canlı mesajlar tamponlanır ve kanca
+    bittikten sonra sırayla iletilir; böylece REST ile doldurulan boşluk canlı akıştan önce gelir.
+    Tampon STREAM_MAX_PENDING_MESSAGES ile sınırlıdır; taşarsa atılır ve kanca yeniden çalıştırılır.
+    """
+    def __init__(self, name: str, protocol: ExchangeProtocol, on_message: MessageHandler,
+                 on_connect: Optional[ConnectHandler] = None):
+        self.name = name
+        self.protocol = protocol
+        self.on_message = on_message
+        self.on_connect = on_connect
+        self.streams: Set[str] = set()
+        self.reconnects = 0
+        self._ws = None
+        self._closed = False
+        self._pending: Optional[List[Any]] = None
+        self._pending_overflowed = False
+        self.pending_overflows = 0
+
+    async def subscribe(self, streams: Iterable[str]):
+        new_streams = [stream for stream in streams if stream not in self.streams]
+        if not new_streams:
+            return
+        self.streams.update(new_streams)
+        await self._send(self.protocol.subscribe_message(new_streams))
+        logger.info(f"{self.name}: {len(new_streams)} akışa abone olundu ({len(self.streams)} toplam)")
+
+    async def unsubscribe(self, streams: Iterable[str]):
+        removed = [stream for stream in streams if stream in self.streams]
+        if not removed:
+            return
+        self.streams.difference_update(removed)
+        await self._send(self.protocol.unsubscribe_message(removed))
+        logger.info(f"{self.name}: {len(removed)} akış aboneliği kaldırıldı ({len(self.streams)} toplam)")
+
+    async def _send(self, request: str):
+        # Bağlantı yoksa istek bir sonraki bağlantıda toplu abonelikle karşılanır
+        if self._ws is None:
+            return
+        for line in request.split("\n"):
+            await self._ws.send(line)
+
+    async def run(self):
+        """Bağlantıyı `close` çağrılana kadar açık tutar"""
+        attempt = 0
+        while not self._closed:
+            connected_at = None
+            try:
+                async with connect(self.protocol.url, max_size=None) as ws:
+                    self._ws = ws
+                    connected_at = time.monotonic()
+                    logger.info(f"{self.name} bağlantısı kuruldu: {self.protocol.url}")
+                    await self._serve(ws)
+            except asyncio.CancelledError:
+                raise
+            except (ConnectionClosed, PayloadTooBig, OSError) as e:
+                logger.warning(f"{self.name} bağlantı hatası: {str(e)} - Yeniden bağlanıyor...")
+            except Exception as e:
+                # Denetimli döngü: beklenmeyen hata da akışı sessizce öldürmez
+                logger.error(f"{self.name} beklenmeyen hata: {type(e).__name__}: {str(e)} - Yeniden bağlanıyor...")
+            finally:
+                self._ws = None
+                self._pending = None
+            if self._closed:
+                break
+            if connected_at is not None and time.monotonic() - connected_at >= RECONNECT_RESET_SECONDS:
+                attempt = 0
+            delay = self._backoff(attempt)
+            attempt += 1
+            self.reconnects += 1
+            logger.info(f"{self.name} {delay:.1f} sn sonra yeniden bağlanacak (deneme {attempt})")
+            await asyncio.sleep(delay)
+
+    async def _serve(self, ws):
+        self._pending = [] if self.on_connect is not None else None
+        if self.streams:
+            await self._send(self.protocol.subscribe_message(sorted(self.streams)))
+        tasks = [asyncio.create_task(self._heartbeat(ws))] if self.protocol.heartbeat else []
+        if self.on_connect is not None:
+            tasks.append(asyncio.create_task(self._recover()))
+        try:
+            async for raw in ws:
+                if self._pending is not None:
+                    if len(self._pending) >= STREAM_MAX_PENDING_MESSAGES:
+                        self._drop_pending()
+                    self._pending.append((raw, time.time_ns()))
+                else:
+                    await self._dispatch(raw, time.time_ns())
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _recover(self):
+        """
+        Boşluk doldurma kancasını çalıştırır, ardından bu sırada tamponlanan canlı mesajları iletir.
+        Tampon taşarsa atılan mesajlar da boşluğa katılır: kanca yeniden çalışır, kaldığı konumdan
+        REST ile doldurur ve defterleri yeniden senkronlar.
+        """
+        while True:
+            self._pending_overflowed = False
+            try:
+                await self.on_connect()
+            except Exception as e:
+                logger.error(f"{self.name} boşluk doldurma başarısız: {str(e)}")
+            pending, index = self._pending, 0
+            while pending is not None and index < len(pending) and not self._pending_overflowed:
+                await self._dispatch(*pending[index])
+                index += 1
+            if not self._pending_overflowed:
+                break
+        # Tampon boşaldıktan sonra araya await girmeden canlı iletime geçilir
+        self._pending = None
+
+    def _drop_pending(self):
+        if not self._pending_overflowed:
+            logger.warning(f"{self.name}: boşluk doldurulurken {len(self._pending)} canlı mesaj birikti, "
+                           f"tampon atıldı; boşluk yeniden doldurulacak")
+        self._pending.clear()
+        self._pending_overflowed = True
+        self.pending_overflows += 1
+
+    def _backoff(self, attempt: int) -> float:
+        """Tam sapmalı üstel geri çekilme: [0, min(üst sınır, taban * 2^deneme)]"""
+        return random.uniform(0, min(RECONNECT_MAX_DELAY, RECONNECT_DELAY * 2 ** attempt))
+
+    async def _dispatch(self, raw, received_ns: int):
+        try:
+            message = loads(raw)
+        except ValueError:
+            # OKX kalp atışı yanıtı düz metin "pong" gelir
+            return
+        routed = self.protocol.route(message)
+        if routed is None:
+            return
+        stream, payload = routed
+        if stream not in self.streams:
+            # Abonelikten çıkıldıktan sonra yolda olan mesajlar
+            return
+        try:
+            await self.on_message(stream, payload, raw.encode() if isinstance(raw, str) else raw, received_ns)
+        except Exception as e:
+            logger.error(f"{self.name} {stream} mesajı işlenemedi: {str(e)}")
+
+    async def _heartbeat(self, ws):
+        while True:
+            await asyncio.sleep(self.protocol.heartbeat_interval)
+            await ws.send(self.protocol.heartbeat)
+
+    async def close(self):
+        self._closed = True
+        if self._ws is not None:
+            await self._ws.close()
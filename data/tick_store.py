@@ -0,0 +1,175 @@
+# datafetch/tick_store.py
+
+import os
+import logging
+import numpy as np
+from datetime import datetime
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+from dotenv import load_dotenv
+from data.message_decoder import AggTrade
+
+# Ortam Değişkenlerini Yükleme
+load_dotenv()
+
+# Ortam Değişkenleri
+TICK_STORE_CAPACITY = int(os.getenv("TICK_STORE_CAPACITY", 100000))
+
+# Log yapılandırması
+logger = logging.getLogger("TickStore")
+
+# Yön: işlemlerde alıcı taraf agresifse +1, satıcı taraf agresifse -1; kotasyonlarda alış +1, satış -1
+BUY, SELL = 1, -1
+
+class TickWindow(NamedTuple):
+    """
+    Halkanın ardışık bölümüne kopyasız görünümler; eskiden yeniye. Görünümler canlıdır,
+    halka üzerine yazdıkça değişir; saklanacaksa kopyalanmalıdır.
+    """
+    timestamp: np.ndarray
+    price: np.ndarray
+    size: np.ndarray
+    side: np.ndarray
+
+# ================================
+# 🔁 Sütunlu Halka Tampon
+# ================================
+
+class TickRing:
+    """
+    Zaman, fiyat, miktar ve yön için önceden ayrılmış paralel diziler (struct-of-arrays).
+    Her değer hem `i` hem `i + capacity` konumuna yazılır; böylece son `capacity` kaydın
+    herhangi bir penceresi, halka sarılmış olsa bile tek parça bir dilimdir ve kopyalanmadan
+    döndürülür. Ekleme O(1)'dir ve Python nesnesi ayırmaz.
+    """
+    __slots__ = ("capacity", "timestamp", "price", "size", "side", "count")
+
+    def __init__(self, capacity: int = TICK_STORE_CAPACITY):
+        self.capacity = capacity
+        self.timestamp = np.zeros(2 * capacity, dtype=np.int64)
+        self.price = np.zeros(2 * capacity, dtype=np.float64)
+        self.size = np.zeros(2 * capacity, dtype=np.float64)
+        self.side = np.zeros(2 * capacity, dtype=np.int8)
+        self.count = 0
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def append(self, timestamp_ms: int, price: float, size: float, side: int):
+        i = self.count % self.capacity
+        j = i + self.capacity
+        self.timestamp[i] = self.timestamp[j] = timestamp_ms
+        self.price[i] = self.price[j] = price
+        self.size[i] = self.size[j] = size
+        self.side[i] = self.side[j] = side
+        self.count += 1
+
+    def window(self, n: Optional[int] = None) -> TickWindow:
+        """Son n kayıt"""
+        size = len(self)
+        n = size if n is None else min(n, size)
+        end = self.count % self.capacity + self.capacity if self.count >= self.capacity else self.count
+        start = end - n
+        return TickWindow(self.timestamp[start:end], self.price[start:end], self.size[start:end], self.side[start:end])
+
+    def since(self, start_ms: int) -> TickWindow:
+        """Zamanı `start_ms` ve sonrası olan kayıtlar; zaman damgaları akış sırasıyla artan kabul edilir"""
+        full = self.window()
+        offset = int(np.searchsorted(full.timestamp, start_ms, side="left"))
+        return TickWindow(full.timestamp[offset:], full.price[offset:], full.size[offset:], full.side[offset:])
+
+    def last_price(self) -> Optional[float]:
+        if not self.count:
+            return None
+        return float(self.price[(self.count - 1) % self.capacity])
+
+# ================================
+# 🔌 Borsa Uyarlayıcıları
+# ================================
+
+def _iso_ms(value: str) -> int:
+    return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp() * 1000)
+
+def _binance_trades(ring: TickRing, record: AggTrade):
+    ring.append(record.trade_time, record.price, record.quantity, SELL if record.is_buyer_maker else BUY)
+
+def _bybit_trades(ring: TickRing, message: dict):
+    for trade in message["data"]:
+        ring.append(int(trade["T"]), float(trade["p"]), float(trade["v"]), BUY if trade["S"] == "Buy" else SELL)
+
+def _okx_trades(ring: TickRing, message: dict):
+    for trade in message["data"]:
+        ring.append(int(trade["ts"]), float(trade["px"]), float(trade["sz"]), BUY if trade["side"] == "buy" else SELL)
+
+def _kraken_trades(ring: TickRing, message: dict):
+    for trade in message["data"]:
+        ring.append(_iso_ms(trade["timestamp"]), float(trade["price"]), float(trade["qty"]),
+                    BUY if trade["side"] == "buy" else SELL)
+
+def _deribit_trades(ring: TickRing, trades: list):
+    for trade in trades:
+        ring.append(int(trade["timestamp"]), float(trade["price"]), float(trade["amount"]),
+                    BUY if trade["direction"] == "buy" else SELL)
+
+# Borsa adı → (halka, çözülmüş yük/kayıt) yazıcısı; yükler stream_connections yönlendirmesinin çıktısıdır
+TRADE_ADAPTERS: Dict[str, Callable[[TickRing, Any], None]] = {
+    "BINANCE": _binance_trades,
+    "BYBIT": _bybit_trades,
+    "OKX": _okx_trades,
+    "KRAKEN": _kraken_trades,
+    "DERIBIT": _deribit_trades,
+}
+
+# ================================
+# 🗄️ Normalleştirilmiş Tick Deposu
+# ================================
+
+class TickStore:
+    """
+    Tüm borsaların işlemlerini (borsa, sembol, akış) başına ortak sütunlu halkalarda tutar.
+    Sembol adları veri çekicinin ortak adlarıdır (ör. BTCUSDT); böylece borsalar arası
+    pencereler aynı anahtarla okunup vektörel olarak karşılaştırılabilir.
+    """
+    def __init__(self, capacity: int = TICK_STORE_CAPACITY):
+        self.capacity = capacity
+        self.rings: Dict[Tuple[str, str, str], TickRing] = {}
+
+    def ring(self, exchange: str, symbol: str, stream: str) -> TickRing:
+        key = (exchange, symbol, stream)
+        ring = self.rings.get(key)
+        if ring is None:
+            ring = self.rings[key] = TickRing(self.capacity)
+        return ring
+
+    def write_trades(self, exchange: str, symbol: str, message: Any):
+        """Borsaya özgü işlem mesajını normalleştirip halkaya yazar"""
+        try:
+            TRADE_ADAPTERS[exchange](self.ring(exchange, symbol, "TRADES"), message)
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"{exchange} {symbol} işlem mesajı normalleştirilemedi: {str(e)}")
+
+    def write_quote(self, exchange: str, symbol: str, timestamp_ms: int,
+                    bid: Optional[Tuple[float, float]], ask: Optional[Tuple[float, float]]):
+        """
+        En iyi alış ve satış seviyelerini ayrı "BIDS" ve "ASKS" halkalarına yazar. Defterin
+        bir tarafı boşsa yalnızca diğer taraf yazılır; her halkada satırlar tek tarafa aittir.
+        """
+        if bid is not None:
+            self.ring(exchange, symbol, "BIDS").append(timestamp_ms, bid[0], bid[1], BUY)
+        if ask is not None:
+            self.ring(exchange, symbol, "ASKS").append(timestamp_ms, ask[0], ask[1], SELL)
+
+    def windows(self, symbol: str, stream: str = "TRADES", start_ms: Optional[int] = None) -> Dict[str, TickWindow]:
+        """Sembolün tüm borsalardaki pencereleri: {borsa: TickWindow}"""
+        return {
+            exchange: ring.window() if start_ms is None else ring.since(start_ms)
+            for (exchange, ring_symbol, ring_stream), ring in self.rings.items()
+            if ring_symbol == symbol and ring_stream == stream
+        }
+
+    def last_prices(self, symbol: str, stream: str = "TRADES") -> Dict[str, float]:
+        """Borsalar arası fiyat farkları için sembolün borsa başına son fiyatı"""
+        return {
+            exchange: ring.last_price()
+            for (exchange, ring_symbol, ring_stream), ring in self.rings.items()
+            if ring_symbol == symbol and ring_stream == stream and ring.count
+        }
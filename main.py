@@ -1,22 +1,40 @@
 # main.py
 
 import os
+import time
 import logging
 import asyncio
+import pandas as pd
+from datetime import datetime
 from dotenv import load_dotenv
-from data.historicaldatafetch import BinanceHistoricalFetcher
-from data.realtimedatafetch import QuantumRealTimeFetcher
+from data.historicaldatafetch import HistoricalBackfill, Symbol, DataType as HistoricalDataType, KlineInterval
+from data.realtimedatafetch import RealTimeDataFetcher, Exchange, DataType, Symbol as StreamSymbol
+from data.replay_source import ReplayDataFetcher
+from data.market_data_bus import MarketEvent, OverflowPolicy, Subscription
+from data.bar_aggregator import BarKind, parse_bar_specs
+from data.kline_resampler import INTERVAL_DURATIONS
+from data.message_decoder import AggTrade, DepthUpdate, MarkPrice
 from processor.data_processor import DataProcessor
-from ai_engine.swarm_intelligence import QuantumSwarm
-from ai_engine.reinforcement_core import ReinforcementCore
-from ai_engine.quantum_cognition import QuantumCognition
-from ai_engine.meta_strategy import MetaStrategy
+from ai_engine.meta_strategy import MetaStrategyOrchestrator
 from execution.execution_engine import ExecutionEngine
 from execution.execution_error_handler import handle_execution_errors
 
 # Ortam değişkenlerini yükle
 load_dotenv()
 
+BACKFILL_SYMBOLS = [Symbol(s.strip()) for s in os.getenv("BACKFILL_SYMBOLS", "BTCUSDT,ETHUSDT,SOLUSDT").split(",")]
+STREAM_SYMBOLS = [StreamSymbol[s.strip()] for s in os.getenv("STREAM_SYMBOLS", "BTCUSDT,ETHUSDT,SOLUSDT").split(",")]
+STREAM_DATA_TYPES = [DataType[t.strip()] for t in os.getenv("STREAM_DATA_TYPES", "BOOK_DEPTH,TRADES").split(",")]
+STRATEGY_QUEUE_SIZE = int(os.getenv("STRATEGY_QUEUE_SIZE", 64))
+STRATEGY_OVERFLOW_POLICY = OverflowPolicy(os.getenv("STRATEGY_OVERFLOW_POLICY", "conflate"))
+ORDER_AMOUNT = float(os.getenv("ORDER_AMOUNT", 0.01))
+# live: borsalara bağlanır, replay: kaydedilmiş oturumu REPLAY_SPEED ile yeniden oynatır
+REALTIME_SOURCE = os.getenv("REALTIME_SOURCE", "live")
+# Canlı göstergelerin beslendiği bar akışı ve ısınma için okunacak tarihsel kline aralığı; ikisi aynı süreyi göstermeli
+INDICATOR_BAR_SPEC = os.getenv("INDICATOR_BAR_SPEC", "time:60000")
+INDICATOR_WARMUP_INTERVAL = KlineInterval(os.getenv("INDICATOR_WARMUP_INTERVAL", "1m"))
+INDICATOR_WARMUP_BARS = int(os.getenv("INDICATOR_WARMUP_BARS", 500))
+
 # Log yapılandırması
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger('GodModeMain')
@@ -26,20 +44,16 @@ logger = logging.getLogger('GodModeMain')
 async def initialize_system():
     logger.info("📡 Sistemi başlatıyorum...")
     # Veri çekme modülleri
-    historical_fetcher = BinanceHistoricalFetcher(symbol="BTCUSDT")
-    realtime_fetcher = QuantumRealTimeFetcher()
+    historical_fetcher = HistoricalBackfill(BACKFILL_SYMBOLS)
+    realtime_fetcher = ReplayDataFetcher() if REALTIME_SOURCE == "replay" else RealTimeDataFetcher()
 
-    # Veri işleme modülü
+    # Veri işleme; canlı göstergeler bar başına artımlı güncellenir
     data_processor = DataProcessor()
 
-    # AI katmanları başlatılıyor
+    # Meta-strateji motoru; sürü, pekiştirmeli öğrenme ve kuantum katmanlarını kendisi kurar
     logger.info("🤖 AI Katmanları başlatılıyor...")
-    swarm_ai = QuantumSwarm()
-    reinforcement_ai = ReinforcementCore()
-    quantum_cognition = QuantumCognition()
-
-    # Meta-strateji motoru
-    meta_strategy = MetaStrategy(swarm_ai, reinforcement_ai, quantum_cognition)
+    meta_strategy = MetaStrategyOrchestrator()
+    meta_strategy.initialize()
 
     # Execution Engine
     execution_engine = ExecutionEngine()
@@ -54,26 +68,150 @@ async def initialize_system():
         'execution_engine': execution_engine
     }
 
+def market_snapshot(event: MarketEvent, fetcher: RealTimeDataFetcher, data_processor: DataProcessor) -> dict:
+    """Veri yolu olayını stratejinin beklediği sözlüğe dönüştürür; sembolün son göstergeleri eklenir"""
+    record = event.record
+    price = None
+    if isinstance(record, AggTrade):
+        price = record.price
+    elif isinstance(record, MarkPrice):
+        price = record.mark_price
+    elif isinstance(record, DepthUpdate):
+        book = fetcher.order_books.book(record.symbol)
+        price = book.mid_price() if book is not None else None
+    return {
+        'exchange': event.exchange,
+        'symbol': event.symbol,
+        'data_type': event.data_type,
+        'price': price,
+        'received_ns': event.received_ns,
+        **data_processor.indicators(event.symbol),
+    }
+
+def indicator_interval_ms(bar_specs) -> int:
+    """
+    INDICATOR_BAR_SPEC'in tek bir zaman çubuğu olduğunu, INDICATOR_WARMUP_INTERVAL ile aynı süreyi
+    gösterdiğini ve bar üreticisinde tanımlı olduğunu doğrular; bar süresini ms olarak döndürür
+    """
+    specs = parse_bar_specs(INDICATOR_BAR_SPEC)
+    interval_ms = int(INTERVAL_DURATIONS[INDICATOR_WARMUP_INTERVAL.value] / pd.Timedelta(milliseconds=1))
+    if len(specs) != 1 or specs[0].kind != BarKind.TIME or int(specs[0].threshold) != interval_ms:
+        raise ValueError(f"INDICATOR_BAR_SPEC={INDICATOR_BAR_SPEC} ile INDICATOR_WARMUP_INTERVAL="
+                         f"{INDICATOR_WARMUP_INTERVAL.value} ({interval_ms} ms) aynı zaman çubuğunu göstermiyor")
+    if specs[0].name not in {spec.name for spec in bar_specs}:
+        raise ValueError(f"INDICATOR_BAR_SPEC={INDICATOR_BAR_SPEC} BAR_SPECS içinde yok; göstergeler beslenmez")
+    return interval_ms
+
+async def warm_start_indicators(system: dict):
+    """
+    Canlı göstergeleri, akışın başladığı dakikadan önceki son tarihsel barlarla ısıtır. Günlük
+    arşivler bir gün geriden geldiğinden son bölümden sonraki barlar REST'ten tamamlanır;
+    tekrar oynatmada kaydın başlangıcından önceki barlar kullanılır ve ağa çıkılmaz. Boşluk
+    kapanmazsa göstergeler ısıtılmaz, canlı barlarla sıfırdan ısınır.
+    """
+    realtime_fetcher = system['realtime_fetcher']
+    interval_ms = indicator_interval_ms(realtime_fetcher.bars.specs)
+    replay = isinstance(realtime_fetcher, ReplayDataFetcher)
+    for fetcher in system['historical_fetcher'].fetchers:
+        symbol = fetcher.symbol.value
+        if replay:
+            end_ms = realtime_fetcher.first_timestamp_ms(Exchange.BINANCE, DataType.TRADES, StreamSymbol[symbol])
+            if end_ms is None:
+                logger.warning(f"{symbol} için kayıtlı işlem yok, göstergeler ısıtılmadı.")
+                continue
+        else:
+            end_ms = time.time_ns() // 1_000_000
+        # Akış başladığında açık olan bar canlı işlemlerden üretilir
+        end_ms -= end_ms % interval_ms
+        df = await asyncio.to_thread(fetcher.load_recent_bars, HistoricalDataType.KLINES, INDICATOR_WARMUP_INTERVAL,
+                                     INDICATOR_WARMUP_BARS, datetime.utcfromtimestamp(end_ms / 1000))
+        next_open_ms = _next_open_ms(df, interval_ms)
+        if next_open_ms is not None and next_open_ms < end_ms and not replay:
+            recent = await fetcher.fetch_recent_klines(INDICATOR_WARMUP_INTERVAL, next_open_ms, end_ms)
+            if recent is not None and not recent.empty:
+                df = pd.concat([df, recent], ignore_index=True).tail(INDICATOR_WARMUP_BARS)
+                next_open_ms = _next_open_ms(df, interval_ms)
+        if next_open_ms is None or next_open_ms < end_ms:
+            missing = (end_ms - next_open_ms) // interval_ms if next_open_ms is not None else None
+            logger.warning(f"{symbol} ısınma barları akışın başlangıcına ulaşmıyor ({missing} bar eksik), "
+                           f"göstergeler ısıtılmadı.")
+            continue
+        system['data_processor'].warm_start_indicators(symbol, df)
+
+def _next_open_ms(df: pd.DataFrame, interval_ms: int):
+    """Son barın ardından açılacak barın zamanı; bar yoksa None"""
+    if df.empty:
+        return None
+    return int(pd.Timestamp(df['open_time'].iloc[-1]).value // 1_000_000) + interval_ms
+
+async def run_indicators(system: dict, subscription: Subscription):
+    """
+    Kapanan her barda göstergeleri O(1) günceller. Barlar kaybolursa göstergeler bozulacağından
+    bu abone strateji kuyruğundan ayrıdır ve birleştirme yerine beklemeli kuyruk kullanır.
+    """
+    async for event in subscription:
+        system['data_processor'].update_indicators(event.symbol, event.record)
+
+async def run_strategy(system: dict, subscription: Subscription):
+    """
+    Veri yolundan en güncel olayları okuyup karar verir. Strateji ve emir iletimi
+    senkron olduğundan iş parçacığında çalışır; bu sırada gelen mesajlar yalnızca
+    bu abonenin kuyruğunda birleştirilir, veri alımı beklemez.
+    """
+    latency = system['realtime_fetcher'].latency
+    async for event in subscription:
+        market_data = market_snapshot(event, system['realtime_fetcher'], system['data_processor'])
+        stamps = {"receive": event.received_ns, "decode": event.decoded_ns, "processor": time.time_ns()}
+        if market_data['price'] is None:
+            continue
+        decision = await asyncio.to_thread(system['meta_strategy'].process, market_data)
+        stamps["strategy"] = time.time_ns()
+        if decision in ("buy", "sell"):
+            order = {
+                "id": f"{event.symbol}-{event.received_ns}",
+                "type": decision,
+                "amount": ORDER_AMOUNT,
+                "price": market_data['price'],
+            }
+            execution_result = await asyncio.to_thread(system['execution_engine'].run, order)
+            stamps["router"] = time.time_ns()
+            logger.info(f"🎯 İşlem sonucu: {execution_result}")
+        # Alım ve çözme aşamaları veri çekicide kaydedildi; burada kararın bayatlığı ölçülür
+        latency.record_stamps(event.stream, event.event_ms, stamps, first_stage="processor")
+
 # Ana döngü
 @handle_execution_errors
 async def main():
     system = await initialize_system()
+    realtime_fetcher = system['realtime_fetcher']
+
+    # Tarihsel verileri işleme; tekrar oynatma çevrimdışı çalışır
+    if REALTIME_SOURCE != "replay":
+        logger.info("🗂️ Tarihsel veriler işleniyor...")
+        await system['historical_fetcher'].fetch_all_data(start_date=datetime(2020, 1, 1))
+    await warm_start_indicators(system)
 
-    # Tarihsel verileri işleme
-    logger.info("🗂️ Tarihsel veriler işleniyor...")
-    await system['historical_fetcher'].fetch_all_data(start_date='2020-01-01')
+    # Strateji, akışlar başlamadan abone olur ki ilk mesajlar kaçmasın
+    subscription = realtime_fetcher.bus.subscribe(STRATEGY_QUEUE_SIZE, STRATEGY_OVERFLOW_POLICY, name="meta_strategy")
+    bar_stream = f"BAR:{INDICATOR_BAR_SPEC}"
+    indicator_subscription = realtime_fetcher.bus.subscribe(
+        policy=OverflowPolicy.BLOCK, predicate=lambda event: event.data_type == bar_stream, name="indicators"
+    )
 
     # Gerçek zamanlı veri akışı başlatma
     logger.info("🚀 Gerçek zamanlı veri akışı başlatılıyor...")
-    realtime_data = await system['realtime_fetcher'].fetch()
+    for symbol in STREAM_SYMBOLS:
+        for data_type in STREAM_DATA_TYPES:
+            await realtime_fetcher.subscribe(Exchange.BINANCE, data_type, symbol)
 
     # Sürekli veri işleme ve karar verme döngüsü
     logger.info("🔄 Veri işleme ve strateji yürütme başlıyor...")
-    async for data in realtime_data:
-        processed_data = system['data_processor'].process(data)
-        decision = system['meta_strategy'].generate_strategy(processed_data)
-        execution_result = system['execution_engine'].run(decision)
-        logger.info(f"🎯 İşlem sonucu: {execution_result}")
+    try:
+        await asyncio.gather(realtime_fetcher.wait_closed(), run_indicators(system, indicator_subscription),
+                             run_strategy(system, subscription))
+    finally:
+        logger.info(f"📊 Veri yolu istatistikleri: {realtime_fetcher.bus.stats()}")
+        await realtime_fetcher.close()
 
 # Programı Çalıştır
 if __name__ == "__main__":
@@ -0,0 +1,419 @@
+# preprocessing/feature_engineering.py
+
+import math
+import logging
+import numpy as np
+import pandas as pd
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# Log yapılandırması
+logger = logging.getLogger("FeatureEngineering")
+
+NAN = float("nan")
+# Bar nesnesinden veya DataFrame'den doğrudan okunan ham sütunlar
+RAW_COLUMNS = ("open", "high", "low", "close", "volume")
+
+# ================================
+# 🧮 Kayan Pencere Yardımcıları
+# ================================
+
+class RollingWindow:
+    """
+    Son `window` değerin toplamı ve kareler toplamı; güncelleme O(1). Kayan toplamlarda
+    biriken yuvarlama hatası, her `window` güncellemede bir toplamlar yeniden hesaplanarak sıfırlanır.
+    Pencerede NaN varken sonuç NaN'dir (pandas rolling ile aynı).
+    """
+    __slots__ = ("window", "values", "total", "total_sq", "nans", "_since_refresh")
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values: deque = deque(maxlen=window)
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.nans = 0
+        self._since_refresh = 0
+
+    def push(self, value: float):
+        if len(self.values) == self.window:
+            old = self.values[0]
+            if old != old:
+                self.nans -= 1
+            else:
+                self.total -= old
+                self.total_sq -= old * old
+        self.values.append(value)
+        if value != value:
+            self.nans += 1
+        else:
+            self.total += value
+            self.total_sq += value * value
+        self._since_refresh += 1
+        if self._since_refresh >= self.window:
+            finite = [v for v in self.values if v == v]
+            self.total = math.fsum(finite)
+            self.total_sq = math.fsum(v * v for v in finite)
+            self._since_refresh = 0
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.window
+
+    def mean(self) -> float:
+        if not self.values or self.nans:
+            return NAN
+        return self.total / len(self.values)
+
+    def std(self) -> float:
+        """Popülasyon standart sapması (ddof=0), ta ile aynı"""
+        n = len(self.values)
+        if not n or self.nans:
+            return NAN
+        mean = self.total / n
+        return math.sqrt(max(self.total_sq / n - mean * mean, 0.0))
+
+class RollingExtreme:
+    """Monoton kuyrukla kayan maksimum/minimum; güncelleme amortize O(1)"""
+    __slots__ = ("window", "is_max", "queue", "count")
+
+    def __init__(self, window: int, is_max: bool):
+        self.window = window
+        self.is_max = is_max
+        self.queue: deque = deque()
+        self.count = 0
+
+    def push(self, value: float) -> float:
+        queue = self.queue
+        if self.is_max:
+            while queue and queue[-1][1] <= value:
+                queue.pop()
+        else:
+            while queue and queue[-1][1] >= value:
+                queue.pop()
+        queue.append((self.count, value))
+        if queue[0][0] <= self.count - self.window:
+            queue.popleft()
+        self.count += 1
+        return queue[0][1]
+
+class _Ema:
+    """pandas ewm(adjust=False) ile aynı özyineleme; ilk geçerli değerle başlar, baştaki NaN'ler atlanır"""
+    __slots__ = ("alpha", "min_periods", "value", "count")
+
+    def __init__(self, alpha: float, min_periods: int):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = NAN
+        self.count = 0
+
+    def push(self, x: float) -> float:
+        if x == x:
+            self.value = x if not self.count else self.value + self.alpha * (x - self.value)
+            self.count += 1
+        return self.value if self.count >= self.min_periods else NAN
+
+# ================================
+# 🧩 Özellik Düğümleri
+# ================================
+
+@dataclass(frozen=True)
+class Feature:
+    """
+    Özellik grafiğinin bir düğümü. `inputs` ham sütunlar veya kayıtlı diğer özelliklerdir;
+    `window` düğümün kendi geriye bakış uzunluğudur (bar). `batch` girdi dizilerinden tüm
+    seriyi hesaplar; `stream` her boru hattına kendi durumunu taşıyan, girdi değerlerinden
+    tek değer üreten bir güncelleyici döndürür. İki mod da aynı sonucu üretir.
+    """
+    name: str
+    inputs: Tuple[str, ...]
+    window: int
+    batch: Callable[..., np.ndarray]
+    stream: Callable[[], Callable[..., float]]
+
+def elementwise(name: str, inputs: Tuple[str, ...], func: Callable[..., np.ndarray]) -> Feature:
+    """
+    Durumsuz düğüm; aynı numpy ifadesi dizilere ve tek değerlere uygulanır. Akışta değerler
+    Python float olarak geçer; sıfıra bölmede numpy skalerleriyle yeniden hesaplanır (inf/NaN).
+    """
+    def stream():
+        def update(*values: float) -> float:
+            try:
+                return float(func(*values))
+            except ZeroDivisionError:
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    return float(func(*(np.float64(v) for v in values)))
+        return update
+    return Feature(name, inputs, 1, func, stream)
+
+def shift(name: str, source: str) -> Feature:
+    """Bir önceki barın değeri"""
+    def batch(values: np.ndarray) -> np.ndarray:
+        out = np.empty_like(values)
+        out[:1] = NAN
+        out[1:] = values[:-1]
+        return out
+
+    def stream():
+        previous = [NAN]
+
+        def update(value: float) -> float:
+            result, previous[0] = previous[0], value
+            return result
+        return update
+    return Feature(name, (source,), 2, batch, stream)
+
+def rolling_mean(name: str, source: str, window: int) -> Feature:
+    def stream():
+        rolling = RollingWindow(window)
+
+        def update(value: float) -> float:
+            rolling.push(value)
+            return rolling.mean() if rolling.full else NAN
+        return update
+    return Feature(name, (source,), window,
+                   lambda values: pd.Series(values).rolling(window).mean().to_numpy(), stream)
+
+def rolling_std(name: str, source: str, window: int) -> Feature:
+    def stream():
+        rolling = RollingWindow(window)
+
+        def update(value: float) -> float:
+            rolling.push(value)
+            return rolling.std() if rolling.full else NAN
+        return update
+    return Feature(name, (source,), window,
+                   lambda values: pd.Series(values).rolling(window).std(ddof=0).to_numpy(), stream)
+
+def rolling_extreme(name: str, source: str, window: int, is_max: bool) -> Feature:
+    def batch(values: np.ndarray) -> np.ndarray:
+        rolling = pd.Series(values).rolling(window)
+        return (rolling.max() if is_max else rolling.min()).to_numpy()
+
+    def stream():
+        extreme = RollingExtreme(window, is_max)
+
+        def update(value: float) -> float:
+            result = extreme.push(value)
+            return result if extreme.count >= window else NAN
+        return update
+    return Feature(name, (source,), window, batch, stream)
+
+def ema(name: str, source: str, window: int, alpha: float = None) -> Feature:
+    """Üstel ortalama; varsayılan alpha 2/(window+1), Wilder ortalaması için 1/window verilir"""
+    alpha = alpha if alpha is not None else 2.0 / (window + 1)
+
+    def stream():
+        return _Ema(alpha, window).push
+    return Feature(name, (source,), window,
+                   lambda values: pd.Series(values).ewm(alpha=alpha, min_periods=window, adjust=False).mean().to_numpy(),
+                   stream)
+
+def wilder_mean(name: str, source: str, window: int) -> Feature:
+    """İlk değeri ilk `window` girdinin ortalaması olan Wilder ortalaması (ta ATR ile aynı)"""
+    def batch(values: np.ndarray) -> np.ndarray:
+        seeded = np.full_like(values, NAN)
+        if len(values) >= window:
+            seeded[window - 1] = values[:window].mean()
+            seeded[window:] = values[window:]
+        return pd.Series(seeded).ewm(alpha=1.0 / window, adjust=False).mean().to_numpy()
+
+    def stream():
+        state = {"count": 0, "seed": 0.0, "value": NAN}
+
+        def update(value: float) -> float:
+            state["count"] += 1
+            if state["count"] < window:
+                state["seed"] += value
+            elif state["count"] == window:
+                state["value"] = (state["seed"] + value) / window
+            else:
+                state["value"] += (value - state["value"]) / window
+            return state["value"]
+        return update
+    return Feature(name, (source,), window, batch, stream)
+
+def cumulative_sum(name: str, source: str) -> Feature:
+    def stream():
+        total = [0.0]
+
+        def update(value: float) -> float:
+            total[0] += value
+            return total[0]
+        return update
+    return Feature(name, (source,), 1, np.cumsum, stream)
+
+# ================================
+# 📚 Özellik Kaydı
+# ================================
+
+FEATURE_REGISTRY: Dict[str, Feature] = {}
+# Adlandırılmış özellik setleri; çağıranlar set adı veya tek tek özellik adı isteyebilir
+FEATURE_SETS: Dict[str, Tuple[str, ...]] = {}
+
+def register_feature(feature: Feature) -> Feature:
+    """Özelliği kaydeder; girdiler önceden kayıtlı olmalıdır, böylece grafik döngüsüz kalır"""
+    if feature.name in FEATURE_REGISTRY or feature.name in RAW_COLUMNS:
+        raise ValueError(f"Özellik zaten kayıtlı: {feature.name}")
+    unknown = [name for name in feature.inputs if name not in RAW_COLUMNS and name not in FEATURE_REGISTRY]
+    if unknown:
+        raise ValueError(f"{feature.name} için bilinmeyen girdiler: {unknown}")
+    FEATURE_REGISTRY[feature.name] = feature
+    return feature
+
+def register_feature_set(name: str, features: Iterable[str]):
+    FEATURE_SETS[name] = tuple(expand_features(features))
+
+def expand_features(requested: Iterable[str]) -> List[str]:
+    """Set adlarını özellik adlarına açar; sıra korunur, tekrarlar atlanır"""
+    names: List[str] = []
+    for name in requested:
+        for feature in FEATURE_SETS.get(name, (name,)):
+            if feature not in FEATURE_REGISTRY:
+                raise ValueError(f"Bilinmeyen özellik veya set: {feature}")
+            if feature not in names:
+                names.append(feature)
+    return names
+
+def resolve_features(requested: Iterable[str]) -> List[str]:
+    """İstenen özelliklerin bağımlılık kapanışını topolojik sırayla döndürür; ortak ara düğümler bir kez yer alır"""
+    order: List[str] = []
+    seen = set()
+
+    def visit(name: str):
+        if name in seen or name in RAW_COLUMNS:
+            return
+        seen.add(name)
+        for dependency in FEATURE_REGISTRY[name].inputs:
+            visit(dependency)
+        order.append(name)
+
+    for name in expand_features(requested):
+        visit(name)
+    return order
+
+def required_columns(order: Iterable[str]) -> List[str]:
+    """Kapanışın okuduğu ham sütunlar"""
+    used = {name for feature in order for name in FEATURE_REGISTRY[feature].inputs}
+    return [column for column in RAW_COLUMNS if column in used]
+
+def lookback(requested: Iterable[str]) -> int:
+    """İstenen özelliklerin ilk geçerli değeri için gereken en uzun bar zinciri"""
+    depth: Dict[str, int] = {}
+    for name in resolve_features(requested):
+        feature = FEATURE_REGISTRY[name]
+        depth[name] = feature.window - 1 + max((depth.get(i, 1) for i in feature.inputs), default=1)
+    return max((depth[name] for name in expand_features(requested)), default=0)
+
+# `add_all_ta_features` içindeki parametre ve sütun adlarıyla temel göstergeler
+for _feature in (
+    shift("close_prev", "close"),
+    # Trend
+    rolling_mean("trend_sma_fast", "close", 12),
+    rolling_mean("trend_sma_slow", "close", 26),
+    ema("trend_ema_fast", "close", 12),
+    ema("trend_ema_slow", "close", 26),
+    elementwise("trend_macd", ("trend_ema_fast", "trend_ema_slow"), lambda fast, slow: fast - slow),
+    ema("trend_macd_signal", "trend_macd", 9),
+    elementwise("trend_macd_diff", ("trend_macd", "trend_macd_signal"), lambda macd, signal: macd - signal),
+    # Momentum
+    # İlk barda değişim NaN'dir; fmax NaN'i yok sayar, ta gibi ilk kazanç/kayıp 0 olur
+    elementwise("close_change", ("close", "close_prev"), lambda close, previous: close - previous),
+    elementwise("rsi_gain", ("close_change",), lambda change: np.fmax(change, 0.0)),
+    elementwise("rsi_loss", ("close_change",), lambda change: np.fmax(-change, 0.0)),
+    ema("rsi_gain_mean", "rsi_gain", 14, alpha=1.0 / 14),
+    ema("rsi_loss_mean", "rsi_loss", 14, alpha=1.0 / 14),
+    elementwise("momentum_rsi", ("rsi_gain_mean", "rsi_loss_mean"),
+                lambda gain, loss: np.where(loss == 0, 100.0, 100.0 - 100.0 / (1.0 + gain / loss))),
+    rolling_extreme("stoch_high", "high", 14, is_max=True),
+    rolling_extreme("stoch_low", "low", 14, is_max=False),
+    elementwise("momentum_stoch", ("close", "stoch_high", "stoch_low"),
+                lambda close, high, low: 100.0 * (close - low) / (high - low)),
+    rolling_mean("momentum_stoch_signal", "momentum_stoch", 3),
+    # Volatilite
+    elementwise("true_range", ("high", "low", "close_prev"),
+                lambda high, low, previous: np.fmax(high - low, np.fmax(np.abs(high - previous), np.abs(low - previous)))),
+    wilder_mean("volatility_atr", "true_range", 10),
+    rolling_mean("volatility_bbm", "close", 20),
+    rolling_std("bollinger_std", "close", 20),
+    elementwise("volatility_bbh", ("volatility_bbm", "bollinger_std"), lambda middle, std: middle + 2 * std),
+    elementwise("volatility_bbl", ("volatility_bbm", "bollinger_std"), lambda middle, std: middle - 2 * std),
+    elementwise("volatility_bbw", ("volatility_bbh", "volatility_bbl", "volatility_bbm"),
+                lambda high, low, middle: (high - low) / middle * 100),
+    elementwise("volatility_bbp", ("close", "volatility_bbh", "volatility_bbl"),
+                lambda close, high, low: (close - low) / (high - low)),
+    # Hacim
+    elementwise("obv_flow", ("close", "close_prev", "volume"),
+                lambda close, previous, volume: np.where(close < previous, -volume, volume)),
+    cumulative_sum("volume_obv", "obv_flow"),
+):
+    register_feature(_feature)
+
+register_feature_set("trend", ("trend_sma_fast", "trend_sma_slow", "trend_ema_fast", "trend_ema_slow",
+                               "trend_macd", "trend_macd_signal", "trend_macd_diff"))
+register_feature_set("momentum", ("momentum_rsi", "momentum_stoch", "momentum_stoch_signal"))
+register_feature_set("volatility", ("volatility_atr", "volatility_bbm", "volatility_bbh", "volatility_bbl",
+                                    "volatility_bbw", "volatility_bbp"))
+register_feature_set("volume", ("volume_obv",))
+register_feature_set("ta_core", ("trend", "momentum", "volatility", "volume"))
+
+# ================================
+# 📦 Toplu Hesaplama
+# ================================
+
+def compute_features(df: pd.DataFrame, features: Iterable[str] = ("ta_core",)) -> pd.DataFrame:
+    """
+    İstenen özellikleri tüm DataFrame için vektörel hesaplar. Yalnızca bağımlılık kapanışı
+    hesaplanır; ara sonuçlar bir kez üretilip paylaşılır ve döndürülen tabloya eklenmez.
+    """
+    outputs = expand_features(features)
+    order = resolve_features(outputs)
+    arrays: Dict[str, np.ndarray] = {
+        column: df[column].to_numpy(dtype=np.float64) for column in required_columns(order)
+    }
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for name in order:
+            feature = FEATURE_REGISTRY[name]
+            arrays[name] = np.asarray(feature.batch(*(arrays[i] for i in feature.inputs)), dtype=np.float64)
+    return pd.DataFrame({name: arrays[name] for name in outputs}, index=df.index)
+
+# ================================
+# ⚙️ Akış Modu Gösterge Motoru
+# ================================
+
+class IndicatorEngine:
+    """
+    İstenen özellikleri bar bar O(1) günceller; toplu `compute_features` ile aynı değerleri
+    üretir. Tarihsel barlarla ısıtıldıktan sonra canlı barlar kaldığı yerden devam eder.
+    """
+    def __init__(self, features: Iterable[str] = ("ta_core",)):
+        self.outputs = expand_features(features)
+        self.order = resolve_features(self.outputs)
+        self.columns = required_columns(self.order)
+        self.lookback = lookback(self.outputs)
+        self._nodes = [
+            (name, FEATURE_REGISTRY[name].inputs, FEATURE_REGISTRY[name].stream()) for name in self.order
+        ]
+        self.values: Dict[str, float] = {}
+        self.bars = 0
+
+    def update(self, bar) -> Dict[str, float]:
+        """`bar` ham sütunları öznitelik olarak taşıyan herhangi bir nesnedir (Bar, itertuples satırı)"""
+        state = {column: float(getattr(bar, column)) for column in self.columns}
+        for name, inputs, update in self._nodes:
+            if len(inputs) == 1:
+                state[name] = update(state[inputs[0]])
+            else:
+                state[name] = update(*[state[i] for i in inputs])
+        self.values = {name: state[name] for name in self.outputs}
+        self.bars += 1
+        return self.values
+
+    def warm_start(self, df: pd.DataFrame) -> Dict[str, float]:
+        """Tarihsel barları sırayla işler"""
+        for bar in df[self.columns].itertuples(index=False):
+            self.update(bar)
+        if len(df) < self.lookback:
+            logger.warning(f"Isınma için {len(df)} bar var, göstergeler {self.lookback} bar gerektiriyor.")
+        logger.info(f"Göstergeler {len(df)} tarihsel barla ısıtıldı.")
+        return self.values
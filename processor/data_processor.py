@@ -1,6 +1,9 @@
 # tradingai-bot/processor/data_processor.py
 
 import os
+import time
+import hashlib
+import multiprocessing
 import pandas as pd
 import numpy as np
 from pathlib import Path
@@ -10,6 +13,15 @@ from ta import add_all_ta_features
 from sklearn.preprocessing import MinMaxScaler, StandardScaler
 import logging
 import json
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Hashable, Iterator, List, Optional, Tuple
+from preprocessing.feature_engineering import IndicatorEngine, compute_features
+from storage.dataset_reader import DatasetReader, ENCRYPTED_SUFFIXES
+from storage.file_manager import StorageCodec
+from storage.tick_log import TickLogReader, SEGMENT_SUFFIX
+from data.stream_connections import BinanceProtocol
+from data.message_decoder import loads, decode_binance, AggTrade
+from data.bar_aggregator import BarAggregator, BarKind, BarSpec
 from utils.processor_error_handler import handle_errors, ProcessorDataError, MissingDataError, InvalidDataError
 
 # Ortam Değişkenlerini Yükleme
@@ -19,7 +31,21 @@ load_dotenv()
 PROCESSED_DATA_PATH = os.getenv("PROCESSED_DATA_PATH", "data/processed")
 HISTORICAL_DATA_PATH = os.getenv("HISTORICAL_DATA_PATH", "data/historical")
 REALTIME_DATA_PATH = os.getenv("REALTIME_DATA_PATH", "data/realtime")
+ENCRYPTION_KEY = os.getenv("ENCRYPTION_KEY")
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+# Virgülle ayrılmış özellik setleri/adları; "all" tüm ta özelliklerini hesaplar
+PROCESSOR_FEATURES = [f.strip() for f in os.getenv("PROCESSOR_FEATURES", "all").split(",")]
+LIVE_FEATURES = [f.strip() for f in os.getenv("LIVE_FEATURES", "ta_core").split(",")]
+# Aynı anda işlenen dosya sayısı; bellekte en fazla bu kadar dosya tutulur
+PROCESS_WORKERS = int(os.getenv("PROCESS_WORKERS", os.cpu_count() or 4))
+# Manifest bu kadar dosya kaydedildikçe diske yazılır; kesilen çalışma en fazla bu kadar dosyayı yeniden işler
+MANIFEST_SAVE_EVERY = int(os.getenv("MANIFEST_SAVE_EVERY", 20))
+# İşleme mantığı çıktıyı değiştirecek şekilde güncellendiğinde artırılır; tüm dosyalar yeniden işlenir
+PROCESSING_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+HASH_CHUNK_SIZE = 1 << 20
+# Kaydedilmiş işlem akışları bu genişlikte zaman çubuklarına dönüştürülerek işlenir
+REALTIME_BAR_MS = 60_000
 
 # Log Yapılandırması
 logging.basicConfig(
@@ -42,24 +68,73 @@ class DataProcessor:
         self.realtime_data_path = Path(REALTIME_DATA_PATH)
         self.processed_data_path = Path(PROCESSED_DATA_PATH)
         self.processed_data_path.mkdir(parents=True, exist_ok=True)
+        self.reader = DatasetReader(self.historical_data_path)
+        # Canlı göstergeler: seri anahtarı (ör. sembol) → artımlı gösterge motoru
+        self.indicator_engines: Dict[Hashable, IndicatorEngine] = {}
 
     @handle_errors
     def load_data(self, file_path: Path) -> pd.DataFrame:
-        """Verileri okur ve temizlenmiş bir DataFrame döndürür"""
+        """Verileri okur ve temizlenmiş bir DataFrame döndürür; şifreli bölümler kodekle çözülür"""
         if not file_path.exists():
             raise MissingDataError(f"{file_path} bulunamadı.")
         
         logger.info(f"{file_path} yükleniyor...")
-        df = pd.read_parquet(file_path)
+        df = self.reader.read_file(file_path).to_pandas()
         df = self._clean_data(df)
         return df
 
+    @handle_errors
+    def load_tick_stream(self, stream_dir: Path) -> pd.DataFrame:
+        """
+        Tick log'a kaydedilmiş bir Binance işlem akışını (BORSA/SEMBOL/TRADES) 1 dakikalık
+        barlara dönüştürür. Kaydın sonundaki henüz kapanmamış bar dahil edilmez.
+        """
+        exchange, symbol, data_type = stream_dir.relative_to(self.realtime_data_path).parts
+        logger.info(f"{stream_dir} akışı yükleniyor...")
+        # Sözlükler kayıt sırasında eğitildiğinden kodek her okumada yeniden yüklenir
+        reader = TickLogReader(self.realtime_data_path,
+                               StorageCodec(ENCRYPTION_KEY, dictionary_dir=self.realtime_data_path / "dictionaries"))
+        protocol = BinanceProtocol()
+        aggregator = BarAggregator([BarSpec(BarKind.TIME, REALTIME_BAR_MS)])
+        bars = []
+        for _, raw in reader.read(exchange, symbol, data_type):
+            routed = protocol.route(loads(raw))
+            record = decode_binance(routed[1]) if routed is not None else None
+            if isinstance(record, AggTrade):
+                bars.extend(aggregator.update(exchange, record))
+        if not bars:
+            raise MissingDataError(f"{stream_dir} içinde kapanmış bar bulunamadı.")
+        df = pd.DataFrame({
+            'open_time': [bar.open_time for bar in bars],
+            'open': [bar.open for bar in bars],
+            'high': [bar.high for bar in bars],
+            'low': [bar.low for bar in bars],
+            'close': [bar.close for bar in bars],
+            'volume': [bar.volume for bar in bars],
+            'close_time': [bar.close_time for bar in bars],
+            'quote_volume': [bar.quote_volume for bar in bars],
+            'count': [bar.trades for bar in bars],
+            'taker_buy_volume': [bar.buy_volume for bar in bars],
+        })
+        return self._clean_data(df)
+
+    @handle_errors
+    def load_dataset(self, symbol: str, data_type: str, interval: str, start: Optional[datetime] = None,
+                     end: Optional[datetime] = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Katalogdaki bölümlerden [start, end) aralığını, yalnızca istenen sütunlarla okur ve temizler"""
+        if columns is not None and 'open_time' not in columns:
+            columns = ['open_time'] + list(columns)
+        df = self.reader.read(symbol, data_type, interval, start, end, columns)
+        if df.empty:
+            raise MissingDataError(f"{symbol} {data_type} {interval} için veri bulunamadı.")
+        return self._clean_data(df)
+
     def _clean_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """Veri temizleme işlemleri"""
         if df.isnull().sum().sum() > 0:
             logger.warning("Eksik veriler tespit edildi, dolduruluyor...")
-            df.fillna(method='ffill', inplace=True)
-            df.fillna(method='bfill', inplace=True)
+            df.ffill(inplace=True)
+            df.bfill(inplace=True)
         
         if df.duplicated().any():
             logger.warning("Yinelenen veriler tespit edildi ve kaldırıldı.")
@@ -76,15 +151,45 @@ class DataProcessor:
     # ================================
 
     @handle_errors
-    def compute_technical_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Tüm teknik göstergeleri hesaplar"""
+    def compute_technical_indicators(self, df: pd.DataFrame, features: List[str] = PROCESSOR_FEATURES) -> pd.DataFrame:
+        """
+        İstenen özellik setlerini hesaplar. Set kayıttan çözülür ve yalnızca bağımlılık
+        kapanışı hesaplanır; "all" tüm ta özelliklerini üretir.
+        """
         logger.info("Teknik göstergeler hesaplanıyor...")
-        df = add_all_ta_features(
-            df, open="open", high="high", low="low", close="close", volume="volume", fillna=True
-        )
+        if features == ["all"]:
+            df = add_all_ta_features(
+                df, open="open", high="high", low="low", close="close", volume="volume", fillna=True
+            )
+        else:
+            df = df.join(compute_features(df, features))
         logger.info("Teknik göstergeler hesaplandı.")
         return df
 
+    def indicator_engine(self, key: Hashable) -> IndicatorEngine:
+        engine = self.indicator_engines.get(key)
+        if engine is None:
+            engine = self.indicator_engines[key] = IndicatorEngine(LIVE_FEATURES)
+        return engine
+
+    @handle_errors
+    def warm_start_indicators(self, key: Hashable, df: pd.DataFrame) -> Dict[str, float]:
+        """Canlı göstergeleri tarihsel barlarla ısıtır; canlı barlar bu durumdan devam eder"""
+        self.indicator_engines[key] = IndicatorEngine(LIVE_FEATURES)
+        return self.indicator_engines[key].warm_start(df)
+
+    def update_indicators(self, key: Hashable, bar) -> Dict[str, float]:
+        """
+        Kapanan tek bar için göstergeleri O(1) günceller. Canlı döngüde tüm geçmiş üzerinde
+        `compute_technical_indicators` çağırmak yerine bu kullanılır; değerler `ta` ile aynıdır.
+        """
+        return self.indicator_engine(key).update(bar)
+
+    def indicators(self, key: Hashable) -> Dict[str, float]:
+        """Serinin son gösterge değerleri; henüz bar yoksa boş"""
+        engine = self.indicator_engines.get(key)
+        return engine.values if engine is not None else {}
+
     # ================================
     # 🔍 Veri Dönüşümü ve Ölçekleme
     # ================================
@@ -104,35 +209,201 @@ class DataProcessor:
     # ================================
 
     @handle_errors
-    def save_processed_data(self, df: pd.DataFrame, filename: str):
-        """İşlenmiş verileri kaydeder"""
+    def save_processed_data(self, df: pd.DataFrame, filename: str) -> Path:
+        """İşlenmiş verileri kaydeder; `filename` alt dizin içerebilir"""
         file_path = self.processed_data_path / f"{filename}.parquet"
+        file_path.parent.mkdir(parents=True, exist_ok=True)
         df.to_parquet(file_path, compression="zstd")
         logger.info(f"İşlenmiş veri kaydedildi: {file_path}")
+        return file_path
 
     # ================================
     # 🚀 İşleme Akışı
     # ================================
 
-    def process_all_data(self):
-        """Tüm veri işleme akışı"""
+    def process_file(self, source: Path, output: str, features: List[str] = PROCESSOR_FEATURES) -> Optional[int]:
+        """
+        Tek dosyayı veya kaydedilmiş akış dizinini yükler, göstergeleri hesaplar, normalize
+        edip kaydeder; başarıda satır sayısı
+        """
+        df = self.load_tick_stream(source) if source.is_dir() else self.load_data(source)
+        if df is None:
+            return None
+        df = self.compute_technical_indicators(df, features)
+        if df is None:
+            return None
+        df = self.normalize_data(df)
+        if df is None or self.save_processed_data(df, output) is None:
+            return None
+        return len(df)
+
+    def _input_files(self) -> Iterator[Tuple[Path, str]]:
+        """
+        (kaynak, çıktı adı); çıktı adı kaynağın göreli yoludur, farklı sembollerin aynı günleri
+        çakışmaz. Gerçek zamanlı veride kaynak, tick log'daki işlem akışının dizinidir.
+        """
+        root = self.historical_data_path
+        for suffix in ENCRYPTED_SUFFIXES:
+            for file in sorted(root.glob(f"**/*{suffix}")):
+                relative = file.relative_to(root)
+                yield file, f"{root.name}/{relative.parent / relative.name[:-len(''.join(relative.suffixes))]}"
+        # Diğer borsaların mesaj biçimleri için çözücü yok; yalnızca Binance işlem akışları işlenir
+        for stream_dir in sorted(self.realtime_data_path.glob("BINANCE/*/TRADES")):
+            if any(stream_dir.glob(f"*{SEGMENT_SUFFIX}")):
+                yield stream_dir, f"{self.realtime_data_path.name}/{stream_dir.relative_to(self.realtime_data_path)}"
+
+    def process_all_data(self, workers: int = PROCESS_WORKERS, features: List[str] = PROCESSOR_FEATURES) -> dict:
+        """
+        Tüm veri işleme akışı. Dosyalar süreç havuzunda paralel işlenir; kuyruğa en fazla
+        işçi sayısı kadar dosya verildiğinden bellek kullanımı sınırlıdır. Kaynak içeriği ve
+        işleme ayarları manifestteki kayıtla aynı olan dosyalar atlanır.
+        """
         logger.info("Veri işleme süreci başlatıldı...")
+        started = time.perf_counter()
+        manifest = ProcessingManifest(self.processed_data_path / MANIFEST_FILE)
+        config = processing_config_hash(features)
+        stats = {"processed": 0, "unchanged": 0, "failed": 0}
+        timings: List[Tuple[float, str]] = []
+
+        submitted: Dict[object, Path] = {}
+
+        def collect(future):
+            source = submitted.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                # Çöken işçi (BrokenProcessPool) veya kaynağın kaybolması tek dosyayı düşürür, akış sürer
+                stats["failed"] += 1
+                logger.error(f"{source} işlenemedi: {type(e).__name__}: {str(e)}")
+                return
+            stats[result["status"]] += 1
+            if result["status"] == "processed":
+                timings.append((result["seconds"], result["output"]))
+                logger.info(f"⏱️ {result['output']}: {result['rows']} satır, {result['seconds']:.2f} sn")
+            elif result["status"] == "failed":
+                logger.error(f"{result['source']} işlenemedi.")
+            if result["status"] != "failed":
+                manifest.record(result["output"], {key: result[key] for key in ("source", "sha256", "size", "mtime_ns")},
+                                config)
+                if manifest.unsaved >= MANIFEST_SAVE_EVERY:
+                    manifest.save()
+
+        # spawn: işçiler üst sürecin iş parçacıklarını ve açık dosyalarını devralmaz
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        pending = set()
+        try:
+            for source, output in self._input_files():
+                # Boyut ve değişme zamanı aynıysa içerik okunmadan atlanır
+                if manifest.is_current(output, source, config):
+                    stats["unchanged"] += 1
+                    continue
+                if len(pending) >= workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future)
+                future = executor.submit(_process_file, str(source), output, features, config,
+                                         manifest.entry(output))
+                submitted[future] = source
+                pending.add(future)
+            for future in pending:
+                collect(future)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            manifest.save()
+
+        elapsed = time.perf_counter() - started
+        slowest = ", ".join(f"{name} {seconds:.1f} sn" for seconds, name in sorted(timings, reverse=True)[:5])
+        logger.info(f"Veri işleme tamamlandı: {stats['processed']} işlendi, {stats['unchanged']} değişmemiş, "
+                    f"{stats['failed']} hatalı, {elapsed:.1f} sn" + (f" | en yavaş: {slowest}" if slowest else ""))
+        return stats
+
+# ================================
+# 🧾 İşleme Manifesti
+# ================================
+
+def processing_config_hash(features: List[str]) -> str:
+    """Çıktıyı etkileyen işleme ayarlarının özeti"""
+    config = {"version": PROCESSING_VERSION, "features": list(features), "scaler": "minmax"}
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()
+
+def _source_files(path: Path) -> List[Path]:
+    """Kaynağı oluşturan dosyalar; akış dizinleri için segmentler, sırasıyla"""
+    return sorted(path.glob(f"*{SEGMENT_SUFFIX}")) if path.is_dir() else [path]
+
+def _source_stat(path: Path) -> Tuple[int, int]:
+    """Toplam boyut ve en son değişme zamanı (ns)"""
+    stats = [file.stat() for file in _source_files(path)]
+    return sum(stat.st_size for stat in stats), max((stat.st_mtime_ns for stat in stats), default=0)
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    for file in _source_files(path):
+        if path.is_dir():
+            digest.update(file.name.encode())
+        with open(file, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+class ProcessingManifest:
+    """
+    Çıktı adı → kaynak özeti (sha256, boyut, değişme zamanı) ve işleme ayarı özeti.
+    PROCESSED_DATA_PATH içinde JSON olarak tutulur ve atomik yazılır.
+    """
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: Dict[str, dict] = {}
+        # Son kayıttan bu yana eklenen/güncellenen girdi sayısı
+        self.unsaved = 0
+        if path.exists():
+            try:
+                self.entries = json.loads(path.read_text())
+            except (OSError, ValueError) as e:
+                logger.warning(f"İşleme manifesti okunamadı, tüm dosyalar yeniden işlenecek: {str(e)}")
+
+    def entry(self, output: str) -> Optional[dict]:
+        return self.entries.get(output)
+
+    def is_current(self, output: str, source: Path, config: str) -> bool:
+        entry = self.entries.get(output)
+        if entry is None or entry["config"] != config or not (self.path.parent / f"{output}.parquet").exists():
+            return False
+        size, mtime_ns = _source_stat(source)
+        return entry["size"] == size and entry["mtime_ns"] == mtime_ns
+
+    def record(self, output: str, source: dict, config: str):
+        self.entries[output] = dict(source, config=config)
+        self.unsaved += 1
+
+    def save(self):
+        temp_path = self.path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps(self.entries, indent=1, sort_keys=True))
+        os.replace(temp_path, self.path)
+        self.unsaved = 0
+
+_worker_processor: Optional[DataProcessor] = None
 
-        # Tüm tarihsel verileri işleme
-        for file in self.historical_data_path.glob("**/*.parquet"):
-            df = self.load_data(file)
-            df = self.compute_technical_indicators(df)
-            df = self.normalize_data(df)
-            self.save_processed_data(df, file.stem)
-
-        # Tüm gerçek zamanlı verileri işleme
-        for file in self.realtime_data_path.glob("**/*.json.gz"):
-            df = self.load_data(file)
-            df = self.compute_technical_indicators(df)
-            df = self.normalize_data(df)
-            self.save_processed_data(df, file.stem)
-
-        logger.info("Veri işleme tamamlandı.")
+def _process_file(source: str, output: str, features: List[str], config: str, previous: Optional[dict]) -> dict:
+    """
+    Süreç havuzunda çalışır. Boyutu veya zamanı değişmiş dosyanın içeriği yine aynıysa
+    (ör. yeniden indirilmiş) işlenmeden "unchanged" döner.
+    """
+    global _worker_processor
+    if _worker_processor is None:
+        _worker_processor = DataProcessor()
+    started = time.perf_counter()
+    path = Path(source)
+    size, mtime_ns = _source_stat(path)
+    result = {"source": source, "output": output, "sha256": _file_sha256(path),
+              "size": size, "mtime_ns": mtime_ns, "rows": None}
+    if (previous is not None and previous["sha256"] == result["sha256"] and previous["config"] == config
+            and (_worker_processor.processed_data_path / f"{output}.parquet").exists()):
+        result["status"] = "unchanged"
+    else:
+        result["rows"] = _worker_processor.process_file(path, output, features)
+        result["status"] = "failed" if result["rows"] is None else "processed"
+    result["seconds"] = time.perf_counter() - started
+    return result
 
 
 # =======================================
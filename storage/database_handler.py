@@ -0,0 +1,189 @@
+# storage/database_handler.py
+
+import os
+import time
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from datetime import date, timedelta
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+from dotenv import load_dotenv
+
+# Ortam Değişkenlerini Yükleme
+load_dotenv()
+
+# Ortam Değişkenleri
+HISTORICAL_DATA_PATH = os.getenv("HISTORICAL_DATA_PATH", "data/historical")
+CATALOG_PATH = os.getenv("CATALOG_PATH", f"{HISTORICAL_DATA_PATH}/catalog.sqlite")
+
+# Log yapılandırması
+logger = logging.getLogger("PartitionCatalog")
+
+# Tam bir günlük bölümde beklenen bar sayısı; 1w bölümleri yalnızca Pazartesi günleri bulunur
+EXPECTED_ROWS_PER_DAY = {
+    "1m": 1440,
+    "5m": 288,
+    "15m": 96,
+    "1h": 24,
+    "4h": 6,
+    "1d": 1,
+    "1w": 1,
+}
+
+@dataclass(frozen=True)
+class PartitionRecord:
+    symbol: str
+    data_type: str
+    interval: str
+    day: date
+    path: str
+    rows: int
+    start_ms: int
+    end_ms: int
+    sha256: str
+    bytes: int
+
+# ================================
+# 🗂️ Yerel Bölüm Kataloğu
+# ================================
+
+class PartitionCatalog:
+    """
+    Diskteki günlük parquet bölümlerinin SQLite (WAL) kataloğu.
+    Açılışta tamamı belleğe yüklenir; varlık kontrolleri dosya sistemine
+    dokunmadan yapılır, yazmalar hem belleğe hem veritabanına işlenir.
+    """
+    def __init__(self, path: str = CATALOG_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS partitions (
+                symbol TEXT NOT NULL,
+                data_type TEXT NOT NULL,
+                interval TEXT NOT NULL,
+                day TEXT NOT NULL,
+                path TEXT NOT NULL,
+                rows INTEGER NOT NULL,
+                start_ms INTEGER NOT NULL,
+                end_ms INTEGER NOT NULL,
+                sha256 TEXT NOT NULL,
+                bytes INTEGER NOT NULL,
+                updated REAL NOT NULL,
+                PRIMARY KEY (symbol, data_type, interval, day)
+            )
+        """)
+        self._conn.commit()
+        self._index: Dict[Tuple[str, str, str], Dict[date, PartitionRecord]] = {}
+        self._load()
+
+    def _load(self):
+        rows = self._conn.execute(
+            "SELECT symbol, data_type, interval, day, path, rows, start_ms, end_ms, sha256, bytes FROM partitions"
+        ).fetchall()
+        for row in rows:
+            record = PartitionRecord(row[0], row[1], row[2], date.fromisoformat(row[3]), *row[4:])
+            self._index.setdefault((record.symbol, record.data_type, record.interval), {})[record.day] = record
+        logger.info(f"Katalog yüklendi: {len(rows)} bölüm ({self.path})")
+
+    def symbols(self) -> set:
+        return {symbol for symbol, _, _ in self._index}
+
+    def __len__(self) -> int:
+        return sum(len(days) for days in self._index.values())
+
+    # ================================
+    # ✍️ Kayıt İşlemleri
+    # ================================
+
+    def upsert(self, record: PartitionRecord):
+        self.upsert_many([record])
+
+    def upsert_many(self, records: Iterable[PartitionRecord]):
+        records = list(records)
+        if not records:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO partitions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(r.symbol, r.data_type, r.interval, r.day.isoformat(), r.path, r.rows,
+                  r.start_ms, r.end_ms, r.sha256, r.bytes, now) for r in records]
+            )
+            self._conn.commit()
+            for r in records:
+                self._index.setdefault((r.symbol, r.data_type, r.interval), {})[r.day] = r
+
+    def remove(self, symbol: str, data_type: str, interval: str, day: date):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM partitions WHERE symbol = ? AND data_type = ? AND interval = ? AND day = ?",
+                (symbol, data_type, interval, day.isoformat())
+            )
+            self._conn.commit()
+            self._index.get((symbol, data_type, interval), {}).pop(day, None)
+
+    # ================================
+    # 🔍 Sorgular
+    # ================================
+
+    def has(self, symbol: str, data_type: str, interval: str, day: date) -> bool:
+        return day in self._index.get((symbol, data_type, interval), {})
+
+    def get(self, symbol: str, data_type: str, interval: str, day: date) -> Optional[PartitionRecord]:
+        return self._index.get((symbol, data_type, interval), {}).get(day)
+
+    def partitions(self, symbol: str, data_type: str, interval: str,
+                   start: Optional[date] = None, end: Optional[date] = None) -> List[PartitionRecord]:
+        """Verilen aralıktaki bölümleri gün sırasıyla döndürür"""
+        days = self._index.get((symbol, data_type, interval), {})
+        return [
+            days[day] for day in sorted(days)
+            if (start is None or day >= start) and (end is None or day <= end)
+        ]
+
+    def all_partitions(self) -> List[PartitionRecord]:
+        return [record for days in self._index.values() for record in days.values()]
+
+    def coverage(self, symbol: str, data_type: str, interval: str) -> Optional[Tuple[date, date, int]]:
+        """(ilk gün, son gün, bölüm sayısı) döndürür; hiç bölüm yoksa None"""
+        days = self._index.get((symbol, data_type, interval))
+        if not days:
+            return None
+        return min(days), max(days), len(days)
+
+    def find_gaps(self, symbol: str, data_type: str, interval: str,
+                  start: date, end: date) -> List[Tuple[date, date]]:
+        """Aralıktaki eksik günleri birleştirilmiş [başlangıç, bitiş] aralıkları olarak döndürür"""
+        days = self._index.get((symbol, data_type, interval), {})
+        step = timedelta(days=7 if interval == "1w" else 1)
+        if interval == "1w":
+            start = start - timedelta(days=start.weekday())
+
+        gaps: List[Tuple[date, date]] = []
+        current = start
+        while current <= end:
+            if current not in days:
+                if gaps and gaps[-1][1] + step == current:
+                    gaps[-1] = (gaps[-1][0], current)
+                else:
+                    gaps.append((current, current))
+            current += step
+        return gaps
+
+    def incomplete_partitions(self, symbol: str, data_type: str, interval: str,
+                              start: Optional[date] = None, end: Optional[date] = None) -> List[PartitionRecord]:
+        """Beklenenden az satır içeren (kısmi yazılmış veya kaynakta eksik) bölümler"""
+        expected = EXPECTED_ROWS_PER_DAY.get(interval)
+        if expected is None:
+            return []
+        return [record for record in self.partitions(symbol, data_type, interval, start, end) if record.rows < expected]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
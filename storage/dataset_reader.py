@@ -0,0 +1,145 @@
+# storage/dataset_reader.py
+
+import io
+import os
+import logging
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pathlib import Path
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from storage.database_handler import PartitionCatalog, PartitionRecord
+from storage.file_manager import StorageCodec
+
+# Ortam Değişkenlerini Yükleme
+load_dotenv()
+
+# Ortam Değişkenleri
+ENCRYPTION_KEY = os.getenv("ENCRYPTION_KEY")
+HISTORICAL_DATA_PATH = os.getenv("HISTORICAL_DATA_PATH", "data/historical")
+# Şifre çözme ve parquet okuma için iş parçacığı sayısı; zstd, AES ve parquet çözücüleri GIL'i bırakır
+READER_THREADS = int(os.getenv("READER_THREADS", 8))
+
+# Log yapılandırması
+logger = logging.getLogger("DatasetReader")
+
+# Kodekle yazılmış bölüm dosyalarının uzantıları (güncel ve eski format)
+ENCRYPTED_SUFFIXES = (".parquet.zst", ".parquet.gz")
+TIME_COLUMN = "open_time"
+
+# ================================
+# 📖 Birleşik Veri Seti Okuyucu
+# ================================
+
+class DatasetReader:
+    """
+    Şifreli tarihsel bölümleri tek arayüzle okur. Sembol, veri türü, interval ve zaman
+    aralığına uyan bölümler katalogdan bulunur; aynı dosyayı paylaşan günler (aylık
+    sıkıştırılmış dosyalar) tek okumada birleştirilir. Dosyalar iş parçacığı havuzunda
+    çözülür, yalnızca istenen sütunlar ve zaman aralığıyla kesişen satır grupları okunur.
+    """
+    def __init__(self, root: Path = Path(HISTORICAL_DATA_PATH), catalog: Optional[PartitionCatalog] = None,
+                 codec: Optional[StorageCodec] = None, threads: int = READER_THREADS):
+        self.root = Path(root)
+        self.threads = threads
+        self._catalog = catalog
+        self._owns_catalog = catalog is None
+        self.codec = codec if codec is not None else StorageCodec(ENCRYPTION_KEY)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def catalog(self) -> PartitionCatalog:
+        # Yalnızca dosya okuyan kullanıcılar (ör. işleme süreçleri) kataloğu açmaz
+        if self._catalog is None:
+            self._catalog = PartitionCatalog()
+        return self._catalog
+
+    def partitions(self, symbol: str, data_type: str, interval: str,
+                   start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[PartitionRecord]:
+        """[start, end) aralığıyla kesişen bölümler, gün sırasıyla"""
+        start_ms, end_ms = _to_ms(start), _to_ms(end)
+        last_day = (end - timedelta(milliseconds=1)).date() if end is not None else None
+        return [
+            record for record in self.catalog.partitions(symbol, data_type, interval,
+                                                         start.date() if start is not None else None, last_day)
+            if record.rows and (start_ms is None or record.end_ms >= start_ms)
+            and (end_ms is None or record.start_ms < end_ms)
+        ]
+
+    def read_table(self, symbol: str, data_type: str, interval: str,
+                   start: Optional[datetime] = None, end: Optional[datetime] = None,
+                   columns: Optional[List[str]] = None) -> pa.Table:
+        """
+        [start, end) aralığındaki barları tek Arrow tablosu olarak, zaman sırasıyla döndürür.
+        Hiç bölüm yoksa istenen sütunlarla boş tablo döner.
+        """
+        files = self._group_by_file(self.partitions(symbol, data_type, interval, start, end))
+        if not files:
+            return pa.table({column: pa.array([], pa.null()) for column in columns or []})
+        start_ms, end_ms = _to_ms(start), _to_ms(end)
+        jobs = [
+            (Path(path), columns, max(low, start_ms) if start_ms is not None else low,
+             min(high, end_ms - 1) if end_ms is not None else high)
+            for path, (low, high) in files
+        ]
+        tables = list(self._pool().map(lambda job: self._read_file_range(*job), jobs))
+        logger.debug(f"{symbol} {data_type} {interval}: {len(jobs)} dosyadan {sum(t.num_rows for t in tables)} satır okundu")
+        # Farklı zamanlarda yazılmış dosyaların meta verisi ve sütun tipleri ayrışabilir;
+        # birleştirmeden önce ilk dosyanın şemasına çevrilir (PartitionCompactor ile aynı)
+        schema = tables[0].schema.remove_metadata()
+        return pa.concat_tables([t.replace_schema_metadata(None).cast(schema) for t in tables])
+
+    def read(self, symbol: str, data_type: str, interval: str,
+             start: Optional[datetime] = None, end: Optional[datetime] = None,
+             columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """`read_table` sonucunun DataFrame hali"""
+        return self.read_table(symbol, data_type, interval, start, end, columns).to_pandas()
+
+    def read_file(self, path: Path, columns: Optional[List[str]] = None,
+                  filters: Optional[list] = None) -> pa.Table:
+        """Tek bir bölüm dosyasını okur; kodekle yazılmamış düz parquet dosyaları da desteklenir"""
+        path = Path(path)
+        if not path.name.endswith(ENCRYPTED_SUFFIXES):
+            return pq.read_table(path, columns=columns, filters=filters)
+        with self.codec.open(path) as f:
+            return pq.read_table(f, columns=columns, filters=filters)
+
+    def read_blob(self, data: bytes, columns: Optional[List[str]] = None) -> pa.Table:
+        """Bellekteki şifreli bölüm içeriğini okur (ör. özeti de alınacak dosyalar)"""
+        return pq.read_table(io.BytesIO(self.codec.decode(data)), columns=columns)
+
+    def _read_file_range(self, path: Path, columns: Optional[List[str]], start_ms: int, end_ms: int) -> pa.Table:
+        # Filtre satır grubu istatistikleriyle eşleşir; aralık dışındaki grupların şifresi çözülmez
+        filters = [
+            (TIME_COLUMN, '>=', pd.Timestamp(start_ms, unit='ms')),
+            (TIME_COLUMN, '<=', pd.Timestamp(end_ms, unit='ms')),
+        ]
+        return self.read_file(path, columns, filters)
+
+    @staticmethod
+    def _group_by_file(records: List[PartitionRecord]) -> List[Tuple[str, Tuple[int, int]]]:
+        """Dosya yolu → kapsadığı günlerin zaman sınırları; dosyalar ilk güne göre sıralı"""
+        bounds: Dict[str, Tuple[int, int]] = {}
+        for record in records:
+            low, high = bounds.get(record.path, (record.start_ms, record.end_ms))
+            bounds[record.path] = (min(low, record.start_ms), max(high, record.end_ms))
+        return sorted(bounds.items(), key=lambda item: item[1][0])
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="dataset-reader")
+        return self._executor
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        if self._owns_catalog and self._catalog is not None:
+            self._catalog.close()
+            self._catalog = None
+
+def _to_ms(value: Optional[datetime]) -> Optional[int]:
+    return int(pd.Timestamp(value).value // 1_000_000) if value is not None else None
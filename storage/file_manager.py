@@ -0,0 +1,284 @@
+# storage/file_manager.py
+
+import os
+import io
+import gzip
+import struct
+import logging
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from typing import BinaryIO, Dict, Iterable, Optional
+import zstandard as zstd
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from dotenv import load_dotenv
+from utils.error_handler import DecryptionError
+
+# Ortam Değişkenlerini Yükleme
+load_dotenv()
+
+# Ortam Değişkenleri
+ENCRYPTION_KEY = os.getenv("ENCRYPTION_KEY")
+COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", 6))
+ZSTD_DICT_SIZE = int(os.getenv("ZSTD_DICT_SIZE", 112_640))
+ZSTD_DICT_SAMPLES = int(os.getenv("ZSTD_DICT_SAMPLES", 5000))
+STORAGE_CHUNK_SIZE = int(os.getenv("STORAGE_CHUNK_SIZE", 1 << 16))
+
+# Log yapılandırması
+logger = logging.getLogger("StorageCodec")
+
+# Sürümlü başlık: sihirli bayt dizisi, format sürümü, zstd sözlük kimliği (0 = sözlüksüz).
+# Başlık AES-GCM'e ek veri (AAD) olarak verilir; değiştirilirse şifre çözme başarısız olur.
+CODEC_MAGIC = b"TAIC"
+CODEC_VERSION = 1
+HEADER = struct.Struct(">4sBI")
+NONCE_SIZE = 12
+GZIP_MAGIC = b"\x1f\x8b"
+
+# Parçalı format: sihirli bayt dizisi, sürüm, parça boyutu, düz metin boyutu, nonce öneki.
+# Her parçanın nonce'u önek + parça sırası; AAD başlık + parça sırasıdır, böylece parçalar
+# yer değiştirilemez, kırpılamaz ve başka bir dosyaya taşınamaz.
+CHUNKED_VERSION = 2
+CHUNKED_HEADER = struct.Struct(">4sBIQ8s")
+CHUNK_INDEX = struct.Struct(">I")
+TAG_SIZE = 16
+CHUNK_CACHE_SIZE = 8
+
+# ================================
+# 🔐 Sıkıştır-Sonra-Şifrele Kodeği
+# ================================
+
+class StorageCodec:
+    """
+    Diske yazılan tüm veriler için ortak kodek: zstd (COMPRESSION_LEVEL) → AES-GCM.
+
+    Şifreli veri sıkıştırılamadığı için sıkıştırma şifrelemeden önce yapılır.
+    Eski formattaki gzip(nonce + AES-GCM(veri)) dosyaları da okunabilir.
+    Küçük JSON mesajları için eğitilmiş zstd sözlükleri kullanılabilir; sözlük
+    kimliği başlıkta saklanır, okuma sırasında kayıtlı sözlüklerden bulunur.
+
+    Büyük dosyalar için `encode_chunked` bağımsız şifrelenmiş parçalardan oluşan
+    bir kap üretir; `open` bu dosyaları tamamını çözmeden okunabilir hale getirir.
+    """
+    def __init__(self, encryption_key: str = ENCRYPTION_KEY, level: int = COMPRESSION_LEVEL,
+                 dictionary_dir: Optional[Path] = None):
+        self.cipher = AESGCM(encryption_key.encode())
+        self.level = level
+        self.dictionary_dir = Path(dictionary_dir) if dictionary_dir is not None else None
+        self.dictionaries: Dict[int, zstd.ZstdCompressionDict] = {}
+        self._latest: Dict[str, zstd.ZstdCompressionDict] = {}
+        # zstd sıkıştırıcıları iş parçacıkları arasında paylaşılamaz
+        self._local = threading.local()
+        if self.dictionary_dir is not None:
+            self._load_dictionaries()
+
+    def encode(self, data: bytes, dictionary: Optional[zstd.ZstdCompressionDict] = None) -> bytes:
+        dict_id = dictionary.dict_id() if dictionary is not None else 0
+        header = HEADER.pack(CODEC_MAGIC, CODEC_VERSION, dict_id)
+        compressed = self._compressor(dictionary).compress(data)
+        nonce = os.urandom(NONCE_SIZE)
+        return header + nonce + self.cipher.encrypt(nonce, compressed, header)
+
+    def encode_chunked(self, data: bytes, chunk_size: int = STORAGE_CHUNK_SIZE) -> bytes:
+        """
+        Veriyi bağımsız şifrelenmiş sabit boyutlu parçalara böler. Sıkıştırma yapılmaz:
+        parça sınırlarının düz metin ofsetleriyle hizalı kalması gerekir, bu yüzden
+        parquet sayfaları kendi içinde zstd ile sıkıştırılmalıdır.
+        """
+        header = CHUNKED_HEADER.pack(CODEC_MAGIC, CHUNKED_VERSION, chunk_size, len(data), os.urandom(8))
+        prefix = header[-8:]
+        parts = [header]
+        for index, offset in enumerate(range(0, len(data), chunk_size)):
+            chunk_id = CHUNK_INDEX.pack(index)
+            parts.append(self.cipher.encrypt(prefix + chunk_id, data[offset:offset + chunk_size], header + chunk_id))
+        return b''.join(parts)
+
+    def open(self, path: Path) -> BinaryIO:
+        """
+        Şifreli dosyayı okunabilir ve konumlanabilir bir dosya nesnesi olarak açar.
+        Parçalı dosyalarda yalnızca okunan aralıklardaki parçaların şifresi çözülür;
+        diğer formatlar belleğe tamamen çözülür.
+        """
+        f = open(path, 'rb')
+        if f.read(CHUNKED_HEADER.size)[:len(CODEC_MAGIC) + 1] == CODEC_MAGIC + bytes([CHUNKED_VERSION]):
+            return ChunkedReader(f, self.cipher)
+        f.seek(0)
+        with f:
+            return io.BytesIO(self.decode(f.read()))
+
+    def decode(self, blob: bytes) -> bytes:
+        if blob[:len(CODEC_MAGIC)] == CODEC_MAGIC:
+            if len(blob) <= len(CODEC_MAGIC):
+                raise DecryptionError("Kesik veri: başlık eksik")
+            if blob[len(CODEC_MAGIC)] == CHUNKED_VERSION:
+                with ChunkedReader(io.BytesIO(blob), self.cipher) as reader:
+                    return reader.read()
+            return self._decode_v1(blob)
+        if blob[:len(GZIP_MAGIC)] == GZIP_MAGIC:
+            return self._decode_legacy(blob)
+        raise DecryptionError("Bilinmeyen depolama formatı")
+
+    def _decode_v1(self, blob: bytes) -> bytes:
+        if len(blob) < HEADER.size + NONCE_SIZE + TAG_SIZE:
+            raise DecryptionError("Kesik veri: başlık, nonce veya etiket eksik")
+        magic, version, dict_id = HEADER.unpack_from(blob)
+        if version != CODEC_VERSION:
+            raise DecryptionError(f"Desteklenmeyen kodek sürümü: {version}")
+        header_end = HEADER.size + NONCE_SIZE
+        try:
+            compressed = self.cipher.decrypt(blob[HEADER.size:header_end], blob[header_end:], blob[:HEADER.size])
+        except InvalidTag:
+            raise DecryptionError("Kimlik doğrulama etiketi geçersiz")
+        if dict_id and dict_id not in self.dictionaries:
+            raise DecryptionError(f"zstd sözlüğü bulunamadı: {dict_id}")
+        return self._decompressor(self.dictionaries.get(dict_id)).decompress(compressed)
+
+    def _decode_legacy(self, blob: bytes) -> bytes:
+        """Eski format: gzip(nonce + AES-GCM(veri))"""
+        try:
+            encrypted = gzip.decompress(blob)
+        except (OSError, EOFError) as e:
+            raise DecryptionError(f"Bozuk gzip verisi: {str(e)}")
+        if len(encrypted) < NONCE_SIZE + TAG_SIZE:
+            raise DecryptionError("Kesik veri: nonce veya etiket eksik")
+        try:
+            return self.cipher.decrypt(encrypted[:NONCE_SIZE], encrypted[NONCE_SIZE:], None)
+        except InvalidTag:
+            raise DecryptionError("Kimlik doğrulama etiketi geçersiz")
+
+    def _compressor(self, dictionary: Optional[zstd.ZstdCompressionDict]) -> zstd.ZstdCompressor:
+        return self._cached("compressors", dictionary, lambda: zstd.ZstdCompressor(
+            level=self.level, dict_data=dictionary, write_content_size=True
+        ))
+
+    def _decompressor(self, dictionary: Optional[zstd.ZstdCompressionDict]) -> zstd.ZstdDecompressor:
+        return self._cached("decompressors", dictionary, lambda: zstd.ZstdDecompressor(dict_data=dictionary))
+
+    def _cached(self, kind: str, dictionary: Optional[zstd.ZstdCompressionDict], factory):
+        cache = self._local.__dict__.setdefault(kind, {})
+        dict_id = dictionary.dict_id() if dictionary is not None else 0
+        if dict_id not in cache:
+            cache[dict_id] = factory()
+        return cache[dict_id]
+
+    # ================================
+    # 📚 zstd Sözlükleri
+    # ================================
+
+    def dictionary(self, name: str) -> Optional[zstd.ZstdCompressionDict]:
+        """`name` akışı için en son eğitilmiş sözlük"""
+        return self._latest.get(name)
+
+    def train_dictionary(self, name: str, samples: Iterable[bytes],
+                         size: int = ZSTD_DICT_SIZE) -> zstd.ZstdCompressionDict:
+        """Örnek mesajlardan sözlük eğitir, kaydeder ve `name` için etkinleştirir"""
+        samples = list(samples)
+        dictionary = zstd.train_dictionary(size, samples, level=self.level)
+        self._register(name, dictionary)
+        if self.dictionary_dir is not None:
+            self.dictionary_dir.mkdir(parents=True, exist_ok=True)
+            path = self.dictionary_dir / f"{name}.{dictionary.dict_id()}.zdict"
+            # Sözlükler örnek mesajlardan türetildiği için onlar da şifreli saklanır
+            path.write_bytes(self.encode(dictionary.as_bytes()))
+        logger.info(f"{name} için zstd sözlüğü eğitildi: {len(samples)} örnek, kimlik {dictionary.dict_id()}")
+        return dictionary
+
+    def _load_dictionaries(self):
+        paths = sorted(self.dictionary_dir.glob("*.zdict"), key=lambda path: path.stat().st_mtime)
+        for path in paths:
+            try:
+                dictionary = zstd.ZstdCompressionDict(self.decode(path.read_bytes()))
+            except Exception as e:
+                logger.warning(f"{path} sözlüğü yüklenemedi: {str(e)}")
+                continue
+            self._register(path.name.split('.')[0], dictionary)
+        if paths:
+            logger.info(f"{len(self.dictionaries)} zstd sözlüğü yüklendi ({self.dictionary_dir})")
+
+    def _register(self, name: str, dictionary: zstd.ZstdCompressionDict):
+        self.dictionaries[dictionary.dict_id()] = dictionary
+        self._latest[name] = dictionary
+
+# ================================
+# 🧩 Parçalı Şifreli Dosya Okuyucu
+# ================================
+
+class ChunkedReader(io.RawIOBase):
+    """
+    Parçalı formatta şifrelenmiş bir dosyayı düz metin üzerinde rastgele erişimli okur.
+    Parquet okuyucusu altbilgiye ve yalnızca seçilen sütun/satır grubu aralıklarına
+    konumlandığında sadece o parçaların şifresi çözülür; bellek kullanımı dosya
+    boyutundan bağımsız olarak birkaç parçayla sınırlı kalır.
+    """
+    def __init__(self, raw: BinaryIO, cipher: AESGCM):
+        super().__init__()
+        self._raw = raw
+        self._cipher = cipher
+        raw.seek(0)
+        self._header = raw.read(CHUNKED_HEADER.size)
+        if len(self._header) < CHUNKED_HEADER.size:
+            raise DecryptionError("Kesik veri: parçalı format başlığı eksik")
+        magic, version, self.chunk_size, self.size, self._prefix = CHUNKED_HEADER.unpack(self._header)
+        if magic != CODEC_MAGIC or version != CHUNKED_VERSION:
+            raise DecryptionError("Parçalı format başlığı geçersiz")
+        self._position = 0
+        self._cache: "OrderedDict[int, bytes]" = OrderedDict()
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: self.size}[whence]
+        self._position = max(base + offset, 0)
+        return self._position
+
+    def readinto(self, buffer) -> int:
+        view = memoryview(buffer).cast('B')
+        written = 0
+        while written < len(view) and self._position < self.size:
+            index, offset = divmod(self._position, self.chunk_size)
+            chunk = self._chunk(index)
+            count = min(len(chunk) - offset, len(view) - written)
+            view[written:written + count] = chunk[offset:offset + count]
+            written += count
+            self._position += count
+        return written
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = max(self.size - self._position, 0)
+        buffer = bytearray(min(size, max(self.size - self._position, 0)))
+        return bytes(buffer[:self.readinto(buffer)])
+
+    def _chunk(self, index: int) -> bytes:
+        chunk = self._cache.get(index)
+        if chunk is not None:
+            self._cache.move_to_end(index)
+            return chunk
+
+        plain_size = min(self.chunk_size, self.size - index * self.chunk_size)
+        self._raw.seek(CHUNKED_HEADER.size + index * (self.chunk_size + TAG_SIZE))
+        sealed = self._raw.read(plain_size + TAG_SIZE)
+        chunk_id = CHUNK_INDEX.pack(index)
+        try:
+            chunk = self._cipher.decrypt(self._prefix + chunk_id, sealed, self._header + chunk_id)
+        except InvalidTag:
+            raise DecryptionError(f"{index}. parçanın kimlik doğrulama etiketi geçersiz")
+
+        self._cache[index] = chunk
+        if len(self._cache) > CHUNK_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return chunk
+
+    def close(self):
+        if not self.closed:
+            self._raw.close()
+            self._cache.clear()
+        super().close()
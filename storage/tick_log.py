@@ -0,0 +1,301 @@
+# storage/tick_log.py
+
+import os
+import time
+import struct
+import bisect
+import asyncio
+import logging
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from dotenv import load_dotenv
+from storage.file_manager import StorageCodec
+
+# Ortam Değişkenlerini Yükleme
+load_dotenv()
+
+# Ortam Değişkenleri
+TICK_LOG_BATCH_BYTES = int(os.getenv("TICK_LOG_BATCH_BYTES", 256 * 1024))
+TICK_LOG_BATCH_SECONDS = float(os.getenv("TICK_LOG_BATCH_SECONDS", 0.5))
+TICK_LOG_SEGMENT_BYTES = int(os.getenv("TICK_LOG_SEGMENT_BYTES", 128 * 1024 * 1024))
+TICK_LOG_SEGMENT_SECONDS = float(os.getenv("TICK_LOG_SEGMENT_SECONDS", 3600))
+# always: her çerçeveden sonra, interval: en fazla TICK_LOG_FSYNC_SECONDS'ta bir, never: işletim sistemine bırak
+TICK_LOG_FSYNC = os.getenv("TICK_LOG_FSYNC", "interval")
+TICK_LOG_FSYNC_SECONDS = float(os.getenv("TICK_LOG_FSYNC_SECONDS", 1.0))
+TICK_LOG_INDEX_BYTES = int(os.getenv("TICK_LOG_INDEX_BYTES", 1024 * 1024))
+# Diske yazılmayı bekleyen en fazla çerçeve; dolarsa ekleyen taraf yazıcı yetişene kadar bekler
+TICK_LOG_MAX_PENDING_FRAMES = int(os.getenv("TICK_LOG_MAX_PENDING_FRAMES", 64))
+
+# Log yapılandırması
+logger = logging.getLogger("TickLog")
+
+# Çerçeve: şifreli yük uzunluğu, ilk ve son mesajın alınma zamanı (ms).
+# Yük, StorageCodec ile mühürlenmiş ardışık (zaman, uzunluk, mesaj) kayıtlarıdır.
+FRAME_HEADER = struct.Struct(">IQQ")
+MESSAGE_HEADER = struct.Struct(">QI")
+# Seyrek indeks girdisi: çerçevenin ilk mesaj zamanı, segment içindeki ofseti
+INDEX_ENTRY = struct.Struct(">QQ")
+SEGMENT_SUFFIX = ".seg"
+INDEX_SUFFIX = ".idx"
+
+# ================================
+# ✍️ Akış Başına Segment Yazıcı
+# ================================
+
+class SegmentWriter:
+    """
+    Bir akışın mesajlarını bellekte toplar ve çerçeveler halinde yalnızca sona
+    eklenen segment dosyalarına yazar. Segmentler boyut veya süre sınırında
+    döndürülür; her segmentin yanında ilk mesaj zamanına göre seyrek bir indeks tutulur.
+    """
+    def __init__(self, directory: Path, codec: StorageCodec, dictionary: Optional[str] = None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.codec = codec
+        self.dictionary = dictionary
+        self._batch: List[bytes] = []
+        self._batch_bytes = 0
+        self._batch_first_ms = 0
+        self._batch_last_ms = 0
+        self._batch_started = 0.0
+        self._segment = None
+        self._index = None
+        self._segment_started = 0.0
+        self._last_indexed = -TICK_LOG_INDEX_BYTES
+        self._last_fsync = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def append(self, timestamp_ms: int, message: bytes) -> bool:
+        """Mesajı toplu yazıma ekler; toplu yazım dolduysa True döndürür"""
+        if not self._batch:
+            self._batch_first_ms = timestamp_ms
+            self._batch_started = time.monotonic()
+        self._batch.append(MESSAGE_HEADER.pack(timestamp_ms, len(message)))
+        self._batch.append(message)
+        self._batch_bytes += MESSAGE_HEADER.size + len(message)
+        self._batch_last_ms = timestamp_ms
+        return self._batch_bytes >= TICK_LOG_BATCH_BYTES
+
+    def batch_age(self) -> float:
+        return time.monotonic() - self._batch_started if self._batch else 0.0
+
+    def take_batch(self) -> Optional[Tuple[bytes, int, int]]:
+        """Bekleyen toplu yazımı devralır ve yenisini başlatır; (çerçeve, ilk ms, son ms)"""
+        if not self._batch:
+            return None
+        batch = (b''.join(self._batch), self._batch_first_ms, self._batch_last_ms)
+        self._batch, self._batch_bytes = [], 0
+        return batch
+
+    async def write(self, batch: bytes, first_ms: int, last_ms: int):
+        """Çerçeveyi yazar; sıkıştırma, şifreleme ve disk işi iş parçacığında yapılır"""
+        async with self._lock:
+            await asyncio.to_thread(self._write_frame, batch, first_ms, last_ms)
+
+    async def flush(self):
+        """Bekleyen mesajları tek çerçeve olarak yazar"""
+        batch = self.take_batch()
+        if batch is not None:
+            await self.write(*batch)
+
+    def _write_frame(self, batch: bytes, first_ms: int, last_ms: int):
+        if self._segment is None or self._should_rotate():
+            self._rotate(first_ms)
+
+        sealed = self.codec.encode(batch, self.codec.dictionary(self.dictionary) if self.dictionary else None)
+        offset = self._segment.tell()
+        self._segment.write(FRAME_HEADER.pack(len(sealed), first_ms, last_ms) + sealed)
+        if offset - self._last_indexed >= TICK_LOG_INDEX_BYTES:
+            self._index.write(INDEX_ENTRY.pack(first_ms, offset))
+            self._last_indexed = offset
+        self._segment.flush()
+        self._index.flush()
+
+        if TICK_LOG_FSYNC == "always" or (
+            TICK_LOG_FSYNC == "interval" and time.monotonic() - self._last_fsync >= TICK_LOG_FSYNC_SECONDS
+        ):
+            self._fsync()
+
+    def _should_rotate(self) -> bool:
+        return (
+            self._segment.tell() >= TICK_LOG_SEGMENT_BYTES
+            or time.monotonic() - self._segment_started >= TICK_LOG_SEGMENT_SECONDS
+        )
+
+    def _rotate(self, first_ms: int):
+        self._close_segment()
+        # Segment adı ilk mesajın zamanıdır; aynı milisaniyede açılan segmentler çakışmaz
+        path = self.directory / f"{first_ms:013d}{SEGMENT_SUFFIX}"
+        while path.exists():
+            first_ms += 1
+            path = self.directory / f"{first_ms:013d}{SEGMENT_SUFFIX}"
+        self._segment = open(path, 'ab')
+        self._index = open(path.with_suffix(INDEX_SUFFIX), 'ab')
+        self._segment_started = time.monotonic()
+        self._last_indexed = -TICK_LOG_INDEX_BYTES
+        logger.debug(f"Yeni segment açıldı: {path}")
+
+    def _fsync(self):
+        os.fsync(self._segment.fileno())
+        os.fsync(self._index.fileno())
+        self._last_fsync = time.monotonic()
+
+    def _close_segment(self):
+        if self._segment is None:
+            return
+        if TICK_LOG_FSYNC != "never":
+            self._fsync()
+        self._segment.close()
+        self._index.close()
+        self._segment = self._index = None
+
+    async def close(self):
+        await self.flush()
+        async with self._lock:
+            await asyncio.to_thread(self._close_segment)
+
+# ================================
+# 📼 Akış Günlüğü
+# ================================
+
+class TickLog:
+    """
+    Tüm akışlar için segment yazıcılarını yönetir. Mesajlar `{kök}/{borsa}/{sembol}/{veri türü}/`
+    altına yazılır; toplu yazımlar dolduğunda veya TICK_LOG_BATCH_SECONDS dolduğunda diske aktarılır.
+    """
+    def __init__(self, root: Path, codec: StorageCodec):
+        self.root = Path(root)
+        self.codec = codec
+        self.writers: Dict[Tuple[str, str, str], SegmentWriter] = {}
+        # Dolan toplu yazımlar sırayla tek arka plan görevinde diske aktarılır
+        self._frames: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self.stalls = 0
+
+    async def append(self, exchange: str, symbol: str, data_type: str, message: bytes,
+                     timestamp_ms: Optional[int] = None, dictionary: Optional[str] = None):
+        """
+        Mesajı toplu yazıma ekler. Dolan toplu yazım yalnızca kuyruğa devredilir; çağıran
+        (websocket okuyucusu) disk yazımını beklemez. Disk TICK_LOG_MAX_PENDING_FRAMES
+        çerçeve geride kalırsa kuyrukta yer açılana kadar beklenir (geri basınç).
+        """
+        key = (exchange, symbol, data_type)
+        writer = self.writers.get(key)
+        if writer is None:
+            writer = self.writers[key] = SegmentWriter(self.root.joinpath(*key), self.codec, dictionary)
+        if self._flusher is None:
+            self._frames = asyncio.Queue(maxsize=TICK_LOG_MAX_PENDING_FRAMES)
+            self._writer_task = asyncio.create_task(self._write_frames())
+            self._flusher = asyncio.create_task(self._flush_periodically())
+        if writer.append(timestamp_ms if timestamp_ms is not None else time.time_ns() // 1_000_000, message):
+            await self._enqueue(writer)
+
+    async def _enqueue(self, writer: SegmentWriter):
+        batch = writer.take_batch()
+        if batch is None:
+            return
+        if self._frames.full():
+            # Veri yolundaki `dropped` gibi sayılır; yalnızca ilk beklemede uyarılır, toplam kapanışta yazılır
+            self.stalls += 1
+            if self.stalls == 1:
+                logger.warning(f"Tick log yazıcısı {self._frames.qsize()} çerçeve geride; ekleme bekletiliyor")
+        await self._frames.put((writer, batch))
+
+    async def _write_frames(self):
+        while True:
+            writer, batch = await self._frames.get()
+            try:
+                await writer.write(*batch)
+            except Exception as e:
+                logger.error(f"{writer.directory} yazılamadı: {str(e)}")
+            finally:
+                self._frames.task_done()
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(TICK_LOG_BATCH_SECONDS / 2)
+            for writer in list(self.writers.values()):
+                if writer.batch_age() >= TICK_LOG_BATCH_SECONDS:
+                    await self._enqueue(writer)
+
+    async def close(self):
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+            for writer in self.writers.values():
+                await self._enqueue(writer)
+            await self._frames.join()
+            self._writer_task.cancel()
+            self._writer_task = None
+            if self.stalls:
+                logger.warning(f"Tick log yazıcısı geride kaldığı için ekleme {self.stalls} kez bekledi")
+        for writer in self.writers.values():
+            await writer.close()
+
+# ================================
+# 🔎 Segment Okuyucu
+# ================================
+
+class TickLogReader:
+    """Kaydedilmiş akışları zaman sırasıyla okur; başlangıç zamanına seyrek indeksle atlar"""
+    def __init__(self, root: Path, codec: StorageCodec):
+        self.root = Path(root)
+        self.codec = codec
+
+    def streams(self) -> List[Tuple[str, str, str]]:
+        return sorted(
+            tuple(path.relative_to(self.root).parts)
+            for path in self.root.glob("*/*/*") if path.is_dir() and any(path.glob(f"*{SEGMENT_SUFFIX}"))
+        )
+
+    def read(self, exchange: str, symbol: str, data_type: str,
+             start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> Iterator[Tuple[int, bytes]]:
+        """(alınma zamanı ms, mesaj) çiftlerini döndürür"""
+        segments = sorted(self.root.joinpath(exchange, symbol, data_type).glob(f"*{SEGMENT_SUFFIX}"))
+        starts = [int(path.stem) for path in segments]
+        # Başlangıç zamanını içerebilecek ilk segmentten başlanır
+        first = max(bisect.bisect_right(starts, start_ms) - 1, 0) if start_ms is not None else 0
+        for path in segments[first:]:
+            if end_ms is not None and int(path.stem) > end_ms:
+                return
+            for timestamp_ms, message in self._read_segment(path, start_ms):
+                if end_ms is not None and timestamp_ms > end_ms:
+                    return
+                if start_ms is None or timestamp_ms >= start_ms:
+                    yield timestamp_ms, message
+
+    def _read_segment(self, path: Path, start_ms: Optional[int]) -> Iterator[Tuple[int, bytes]]:
+        with open(path, 'rb') as f:
+            if start_ms is not None:
+                f.seek(self._seek_offset(path.with_suffix(INDEX_SUFFIX), start_ms))
+            while True:
+                header = f.read(FRAME_HEADER.size)
+                if len(header) < FRAME_HEADER.size:
+                    return
+                size, first_ms, last_ms = FRAME_HEADER.unpack(header)
+                sealed = f.read(size)
+                if len(sealed) < size:
+                    # Çökme sırasında yarım kalmış son çerçeve
+                    logger.warning(f"{path} sonunda yarım çerçeve atlandı")
+                    return
+                if start_ms is not None and last_ms < start_ms:
+                    continue
+                yield from _iter_messages(self.codec.decode(sealed))
+
+    def _seek_offset(self, index_path: Path, start_ms: int) -> int:
+        if not index_path.exists():
+            return 0
+        data = index_path.read_bytes()
+        entries = [INDEX_ENTRY.unpack_from(data, i) for i in range(0, len(data) - len(data) % INDEX_ENTRY.size, INDEX_ENTRY.size)]
+        position = bisect.bisect_right([timestamp for timestamp, _ in entries], start_ms) - 1
+        return entries[position][1] if position >= 0 else 0
+
+def _iter_messages(batch: bytes) -> Iterator[Tuple[int, bytes]]:
+    view = memoryview(batch)
+    offset = 0
+    while offset < len(batch):
+        timestamp_ms, length = MESSAGE_HEADER.unpack_from(batch, offset)
+        offset += MESSAGE_HEADER.size
+        yield timestamp_ms, bytes(view[offset:offset + length])
+        offset += length
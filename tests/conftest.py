@@ -0,0 +1,27 @@
+# tests/conftest.py
+
+import os
+import asyncio
+import pytest
+
+# .env'deki örnek anahtar AES için geçersiz; modüller içe aktarılmadan önce test anahtarı verilir
+os.environ.setdefault("ENCRYPTION_KEY", "0123456789abcdef0123456789abcdef")
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+@pytest.fixture
+def fetcher(tmp_path, loop):
+    """Geçici dizinde, kendi kataloğuyla çalışan BTCUSDT geçmiş veri çekicisi"""
+    from data.historicaldatafetch import HistoricalDataFetcher, Symbol
+    from storage.database_handler import PartitionCatalog
+
+    async def create():
+        return HistoricalDataFetcher(Symbol.BTCUSDT, str(tmp_path), PartitionCatalog(str(tmp_path / "catalog.sqlite")))
+    fetcher = loop.run_until_complete(create())
+    yield fetcher
+    loop.run_until_complete(fetcher.close())
+    fetcher.catalog.close()
@@ -0,0 +1,61 @@
+# tests/test_bar_aggregator.py
+
+from data.bar_aggregator import BarAggregator, BarRing, parse_bar_specs, BAR_CLOSE_GRACE_MS
+from data.message_decoder import AggTrade
+
+def trade(trade_id: int, time_ms: int, price: float, quantity: float = 1.0, buyer_maker: bool = False) -> AggTrade:
+    return AggTrade("BTCUSDT", time_ms, trade_id, price, quantity, trade_id, trade_id, time_ms, buyer_maker)
+
+def test_time_bar_closes_on_next_bucket():
+    aggregator = BarAggregator(parse_bar_specs("time:60000"))
+    assert aggregator.update("BINANCE", trade(1, 1_000, 100.0)) == []
+    assert aggregator.update("BINANCE", trade(2, 30_000, 105.0, buyer_maker=True)) == []
+    assert aggregator.update("BINANCE", trade(3, 59_999, 98.0, 2.0)) == []
+    [bar] = aggregator.update("BINANCE", trade(4, 61_000, 101.0))
+    assert (bar.exchange, bar.spec, bar.open_time, bar.close_time) == ("BINANCE", "time:60000", 0, 59_999)
+    assert (bar.open, bar.high, bar.low, bar.close) == (100.0, 105.0, 98.0, 98.0)
+    assert (bar.volume, bar.buy_volume, bar.trades) == (4.0, 3.0, 3)
+    assert (bar.first_trade_id, bar.last_trade_id) == (1, 3)
+
+def test_time_bar_closes_without_trade_after_grace():
+    aggregator = BarAggregator(parse_bar_specs("time:60000"))
+    aggregator.update("BINANCE", trade(1, 1_000, 100.0))
+    assert aggregator.close_expired(60_000 + BAR_CLOSE_GRACE_MS - 1) == []
+    [bar] = aggregator.close_expired(60_000 + BAR_CLOSE_GRACE_MS)
+    assert (bar.open_time, bar.close_time, bar.trades) == (0, 59_999, 1)
+    # Kapanmış çubuğa gecikmeyle gelen işlem açık olan sonraki çubuğa yazılır
+    aggregator.update("BINANCE", trade(2, 59_000, 99.0))
+    [late] = aggregator.close_expired(120_000 + BAR_CLOSE_GRACE_MS)
+    assert (late.open_time, late.close, late.trades) == (60_000, 99.0, 1)
+
+def test_tick_volume_and_dollar_thresholds():
+    aggregator = BarAggregator(parse_bar_specs("tick:3,volume:5,dollar:1000"))
+    closed = []
+    for i in range(6):
+        closed += aggregator.update("BINANCE", trade(i, i, 100.0, 2.0))
+    by_spec = {}
+    for bar in closed:
+        by_spec.setdefault(bar.spec, []).append((bar.first_trade_id, bar.last_trade_id))
+    assert by_spec == {
+        "tick:3": [(0, 2), (3, 5)],
+        "volume:5": [(0, 2), (3, 5)],
+        # 200 dolarlık işlemlerle 1000 dolar beşinci işlemde aşılır
+        "dollar:1000": [(0, 4)],
+    }
+
+def test_exchanges_build_separate_bars():
+    aggregator = BarAggregator(parse_bar_specs("tick:2"))
+    aggregator.update("BINANCE", trade(1, 1, 100.0))
+    assert aggregator.update("BYBIT", trade(1, 1, 200.0)) == []
+    [bar] = aggregator.update("BINANCE", trade(2, 2, 101.0))
+    assert (bar.exchange, bar.open, bar.close) == ("BINANCE", 100.0, 101.0)
+    assert len(aggregator.bars("BINANCE", "BTCUSDT", "tick:2")) == 1
+    assert len(aggregator.bars("BYBIT", "BTCUSDT", "tick:2")) == 0
+
+def test_ring_keeps_latest_bars_in_order():
+    aggregator = BarAggregator(parse_bar_specs("tick:1"), history=4)
+    for i in range(10):
+        aggregator.update("BINANCE", trade(i, i, 100.0 + i))
+    assert aggregator.bars("BINANCE", "BTCUSDT", "tick:1")["close"].tolist() == [106.0, 107.0, 108.0, 109.0]
+    assert aggregator.bars("BINANCE", "BTCUSDT", "tick:1", 2)["open_time"].tolist() == [8, 9]
+    assert len(BarRing(3)) == 0
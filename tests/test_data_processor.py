@@ -0,0 +1,69 @@
+# tests/test_data_processor.py
+
+import io
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("sklearn")
+
+from processor import data_processor
+from processor.data_processor import DataProcessor, ProcessingManifest, processing_config_hash
+from storage.file_manager import StorageCodec
+
+KEY = "0123456789abcdef0123456789abcdef"
+DAYS = 3
+
+def write_day(path, day: int, seed: int):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, 500))
+    frame = pd.DataFrame(dict(open_time=np.arange(500) * 60_000 + day * 86_400_000, open=close, high=close + 1,
+                              low=close - 1, close=close, volume=1.0))
+    buffer = io.BytesIO()
+    frame.to_parquet(buffer)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(StorageCodec(KEY).encode_chunked(buffer.getvalue()))
+
+@pytest.fixture
+def processor(tmp_path, monkeypatch):
+    # İşçi süreçleri modülü ortam değişkenleriyle yeniden içe aktarır
+    for name in ("HISTORICAL_DATA_PATH", "REALTIME_DATA_PATH", "PROCESSED_DATA_PATH"):
+        path = str(tmp_path / name.split("_")[0].lower())
+        monkeypatch.setenv(name, path)
+        monkeypatch.setattr(data_processor, name, path)
+    for day in range(DAYS):
+        write_day(tmp_path / "historical" / "BTCUSDT" / f"2024-01-0{day + 1}.parquet.zst", day, day)
+    return DataProcessor()
+
+def test_unchanged_files_are_skipped(processor, tmp_path):
+    assert processor.process_all_data(workers=2, features=["ta_core"]) == {"processed": 3, "unchanged": 0, "failed": 0}
+    assert len(list((tmp_path / "processed").rglob("*.parquet"))) == 3
+    assert processor.process_all_data(workers=2, features=["ta_core"]) == {"processed": 0, "unchanged": 3, "failed": 0}
+
+    # Yalnızca zamanı değişen dosya hash'lenir ama yeniden işlenmez; içeriği değişen işlenir
+    source = tmp_path / "historical" / "BTCUSDT" / "2024-01-02.parquet.zst"
+    os.utime(source, ns=(source.stat().st_atime_ns, source.stat().st_mtime_ns + 1_000_000))
+    write_day(tmp_path / "historical" / "BTCUSDT" / "2024-01-03.parquet.zst", 2, seed=99)
+    assert processor.process_all_data(workers=2, features=["ta_core"]) == {"processed": 1, "unchanged": 2, "failed": 0}
+
+    # Özellik ayarı değişince tüm dosyalar yeniden işlenir
+    assert processor.process_all_data(workers=2, features=["trend"])["processed"] == 3
+
+def test_manifest_saves_atomically_and_counts_unsaved(tmp_path):
+    manifest = ProcessingManifest(tmp_path / "manifest.json")
+    config = processing_config_hash(["ta_core"])
+    manifest.record("a", {"source": "a", "sha256": "x", "size": 1, "mtime_ns": 2}, config)
+    manifest.record("b", {"source": "b", "sha256": "y", "size": 3, "mtime_ns": 4}, config)
+    assert manifest.unsaved == 2
+    manifest.save()
+    assert manifest.unsaved == 0
+    assert not (tmp_path / "manifest.tmp").exists()
+    assert ProcessingManifest(tmp_path / "manifest.json").entry("b") == {
+        "source": "b", "sha256": "y", "size": 3, "mtime_ns": 4, "config": config}
+
+def test_clean_data_fills_gaps_forward_then_backward(processor):
+    frame = pd.DataFrame(dict(open_time=[0, 60_000, 120_000, 180_000], close=[np.nan, 101.0, np.nan, 103.0]))
+    cleaned = processor._clean_data(frame)
+    assert cleaned["close"].tolist() == [101.0, 101.0, 101.0, 103.0]
+    assert cleaned.index[1] == pd.Timestamp("1970-01-01 00:01")
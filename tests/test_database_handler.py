@@ -0,0 +1,42 @@
+# tests/test_database_handler.py
+
+from datetime import date, timedelta
+import pytest
+from storage.database_handler import PartitionCatalog, PartitionRecord
+
+def record(day: date, interval: str = "1m", rows: int = 1440) -> PartitionRecord:
+    return PartitionRecord("BTCUSDT", "klines", interval, day, f"{interval}/{day}.parquet.zst", rows, 0, 0, "x", 1)
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = PartitionCatalog(str(tmp_path / "catalog.sqlite"))
+    yield catalog
+    catalog.close()
+
+def test_gaps_are_merged_into_ranges(catalog):
+    start = date(2024, 1, 1)
+    catalog.upsert_many(record(start + timedelta(days=i)) for i in (0, 1, 4, 6))
+    assert catalog.find_gaps("BTCUSDT", "klines", "1m", start, date(2024, 1, 9)) == [
+        (date(2024, 1, 3), date(2024, 1, 4)), (date(2024, 1, 6), date(2024, 1, 6)),
+        (date(2024, 1, 8), date(2024, 1, 9)),
+    ]
+
+def test_weekly_gaps_step_by_monday(catalog):
+    catalog.upsert(record(date(2024, 1, 8), "1w", 1))
+    # Başlangıç haftanın Pazartesisine çekilir
+    assert catalog.find_gaps("BTCUSDT", "klines", "1w", date(2024, 1, 3), date(2024, 1, 28)) == [
+        (date(2024, 1, 1), date(2024, 1, 1)), (date(2024, 1, 15), date(2024, 1, 22)),
+    ]
+
+def test_catalog_survives_reopen(tmp_path):
+    path = str(tmp_path / "catalog.sqlite")
+    catalog = PartitionCatalog(path)
+    catalog.upsert_many([record(date(2024, 1, 1)), record(date(2024, 1, 2), rows=900)])
+    catalog.remove("BTCUSDT", "klines", "1m", date(2024, 1, 1))
+    catalog.close()
+
+    catalog = PartitionCatalog(path)
+    assert not catalog.has("BTCUSDT", "klines", "1m", date(2024, 1, 1))
+    assert catalog.coverage("BTCUSDT", "klines", "1m") == (date(2024, 1, 2), date(2024, 1, 2), 1)
+    assert catalog.incomplete_partitions("BTCUSDT", "klines", "1m") == [record(date(2024, 1, 2), rows=900)]
+    catalog.close()
@@ -0,0 +1,93 @@
+# tests/test_dataset_reader.py
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from datetime import date, datetime, timedelta
+from storage.database_handler import PartitionCatalog, PartitionRecord
+from storage.dataset_reader import DatasetReader
+from storage.file_manager import StorageCodec
+
+KEY = "0123456789abcdef0123456789abcdef"
+FIRST_DAY = date(2024, 3, 1)
+DAYS = 3
+# Saniyelik barlar: günlük dosya parquet altbilgi ön okumasından (64 KiB) çok daha büyük olur
+ROWS = 86_400
+STEP_MS = 1000
+
+def write_day(root, codec: StorageCodec, catalog: PartitionCatalog, day: date, volume_type=pa.float64()):
+    start_ms = int(pd.Timestamp(day).value // 1_000_000)
+    open_time = start_ms + np.arange(ROWS, dtype=np.int64) * STEP_MS
+    table = pa.table({
+        "open_time": pa.array(open_time).cast(pa.timestamp("ms")),
+        "close": np.arange(ROWS, dtype=np.float64) + (day - FIRST_DAY).days * ROWS,
+        "volume": pa.array(np.random.default_rng(day.toordinal()).random(ROWS)).cast(volume_type),
+    })
+    buffer = pa.BufferOutputStream()
+    # Saatlik satır grupları
+    pq.write_table(table, buffer, compression="zstd", row_group_size=3600)
+    path = root / "BTCUSDT" / f"{day.isoformat()}.parquet.zst"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(codec.encode_chunked(buffer.getvalue().to_pybytes(), chunk_size=4096))
+    catalog.upsert(PartitionRecord("BTCUSDT", "klines", "1s", day, str(path), ROWS, int(open_time[0]),
+                                   int(open_time[-1]), "", path.stat().st_size))
+
+@pytest.fixture
+def reader(tmp_path):
+    codec = StorageCodec(KEY)
+    catalog = PartitionCatalog(str(tmp_path / "catalog.sqlite"))
+    for offset in range(DAYS):
+        write_day(tmp_path, codec, catalog, FIRST_DAY + timedelta(days=offset))
+    reader = DatasetReader(tmp_path, catalog, codec, threads=2)
+    yield reader
+    reader.close()
+    catalog.close()
+
+class CountingCipher:
+    """Parça şifre çözmelerini sayar; önbellekten dönen parçalar sayılmaz"""
+    def __init__(self, cipher):
+        self.cipher = cipher
+        self.calls = 0
+
+    def decrypt(self, nonce, data, associated_data):
+        self.calls += 1
+        return self.cipher.decrypt(nonce, data, associated_data)
+
+def test_range_spanning_days_returns_exact_rows(reader):
+    start, end = datetime(2024, 3, 1, 23, 30), datetime(2024, 3, 2, 0, 45)
+    df = reader.read("BTCUSDT", "klines", "1s", start, end, columns=["open_time", "close"])
+    assert len(df) == 75 * 60
+    assert df["open_time"].iloc[0] == pd.Timestamp(start)
+    assert df["open_time"].iloc[-1] == pd.Timestamp(end) - pd.Timedelta(milliseconds=STEP_MS)
+    assert df["close"].is_monotonic_increasing
+    assert len(reader.partitions("BTCUSDT", "klines", "1s", start, end)) == 2
+
+def test_column_projection(reader):
+    table = reader.read_table("BTCUSDT", "klines", "1s", datetime(2024, 3, 2), datetime(2024, 3, 3), ["close"])
+    assert table.column_names == ["close"]
+    assert table.num_rows == ROWS
+
+def test_range_pushdown_decrypts_fewer_chunks(reader):
+    cipher = reader.codec.cipher = CountingCipher(reader.codec.cipher)
+    day = datetime(2024, 3, 2)
+    reader.read_table("BTCUSDT", "klines", "1s", day, day + timedelta(days=1))
+    full_day, cipher.calls = cipher.calls, 0
+    table = reader.read_table("BTCUSDT", "klines", "1s", day + timedelta(hours=10), day + timedelta(hours=11))
+    assert table.num_rows == 3600
+    assert 0 < cipher.calls < full_day / 4
+
+def test_empty_range(reader):
+    table = reader.read_table("BTCUSDT", "klines", "1s", datetime(2030, 1, 1), None, ["close"])
+    assert table.num_rows == 0
+    assert table.column_names == ["close"]
+
+def test_files_with_diverging_schemas_are_unified(reader, tmp_path):
+    # Eski yazıcı sürümüyle yazılmış gün: farklı sütun tipi ve parquet meta verisi
+    write_day(tmp_path, reader.codec, reader.catalog, FIRST_DAY + timedelta(days=DAYS), volume_type=pa.float32())
+    start = datetime(2024, 3, 3, 23)
+    table = reader.read_table("BTCUSDT", "klines", "1s", start, start + timedelta(hours=2))
+    assert table.num_rows == 7200
+    assert table.schema.field("volume").type == pa.float64()
+    assert table.schema.metadata is None
@@ -0,0 +1,69 @@
+# tests/test_download_scheduler.py
+
+import asyncio
+import json
+from typing import NamedTuple
+from data.download_scheduler import DownloadScheduler, JobManifest, JobStatus
+
+class Job(NamedTuple):
+    key: str
+
+def test_manifest_resumes_after_restart(tmp_path):
+    path = tmp_path / "manifest.jsonl"
+    manifest = JobManifest(path)
+    manifest.record("a", JobStatus.DONE, hashes={"2024-01-01": "x"})
+    manifest.record("b", JobStatus.FAILED)
+    manifest.close()
+    # Çökme sırasında yarım yazılmış satır okunurken atlanır
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"key": "c", "sta')
+
+    manifest = JobManifest(path)
+    assert manifest.is_done("a")
+    assert not manifest.is_done("b")
+    assert "c" not in manifest.entries
+    manifest.close()
+
+def test_done_record_merges_hashes(tmp_path):
+    manifest = JobManifest(tmp_path / "manifest.jsonl")
+    manifest.record("a", JobStatus.DONE, hashes={"d1": "x", "d2": "y"})
+    manifest.record("a", JobStatus.DONE, hashes={"d2": "z"})
+    assert manifest.entries["a"]["hashes"] == {"d1": "x", "d2": "z"}
+    manifest.record("a", JobStatus.FAILED, hashes={"d1": "x"})
+    assert manifest.entries["a"]["hashes"] == {"d1": "x"}
+    manifest.close()
+
+def test_manifest_is_compacted_on_load(tmp_path):
+    path = tmp_path / "manifest.jsonl"
+    manifest = JobManifest(path)
+    for i in range(1200):
+        manifest.record(f"job-{i % 3}", JobStatus.FAILED, attempt=i)
+    manifest.close()
+
+    manifest = JobManifest(path)
+    manifest.close()
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert len(lines) == 3
+    assert {line["key"]: line["attempt"] for line in lines} == {"job-0": 1197, "job-1": 1198, "job-2": 1199}
+
+def test_scheduler_skips_finished_jobs(tmp_path):
+    manifest = JobManifest(tmp_path / "manifest.jsonl")
+    manifest.record("done", JobStatus.DONE)
+    fetched = []
+
+    async def fetch(job):
+        fetched.append(job.key)
+        if job.key == "broken":
+            return None
+        return 10, job.key.encode(), {}
+
+    async def write(job, output):
+        return {"written": output.decode()}
+
+    scheduler = DownloadScheduler(fetch, manifest, write=write, workers=2, write_workers=1, progress_interval=60)
+    stats = asyncio.run(scheduler.run([Job("done"), Job("new"), Job("broken")]))
+    assert sorted(fetched) == ["broken", "new"]
+    assert (stats.skipped, stats.done, stats.failed) == (1, 1, 1)
+    assert manifest.entries["new"]["written"] == "new"
+    assert manifest.entries["broken"]["status"] == JobStatus.FAILED.value
+    manifest.close()
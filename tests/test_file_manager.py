@@ -0,0 +1,91 @@
+# tests/test_file_manager.py
+
+import io
+import os
+import gzip
+import pytest
+from storage.file_manager import (StorageCodec, ChunkedReader, CHUNKED_HEADER, HEADER, NONCE_SIZE, TAG_SIZE)
+from utils.error_handler import DecryptionError
+
+KEY = "0123456789abcdef0123456789abcdef"
+
+@pytest.fixture
+def codec():
+    return StorageCodec(KEY)
+
+@pytest.fixture
+def payload():
+    return os.urandom(1000) + b"tradingai" * 5000
+
+def flip(blob: bytes, position: int) -> bytes:
+    return blob[:position] + bytes([blob[position] ^ 0x01]) + blob[position + 1:]
+
+def test_v1_round_trip(codec, payload):
+    assert codec.decode(codec.encode(payload)) == payload
+
+def test_chunked_round_trip_and_random_access(codec, payload):
+    blob = codec.encode_chunked(payload, chunk_size=4096)
+    assert codec.decode(blob) == payload
+    with ChunkedReader(io.BytesIO(blob), codec.cipher) as reader:
+        assert reader.size == len(payload)
+        # Parça sınırını aşan okuma
+        reader.seek(4090)
+        assert reader.read(20) == payload[4090:4110]
+        reader.seek(-10, io.SEEK_END)
+        assert reader.read() == payload[-10:]
+        assert reader.read(5) == b""
+
+def test_chunked_open_from_file(codec, payload, tmp_path):
+    path = tmp_path / "part.parquet.zst"
+    path.write_bytes(codec.encode_chunked(payload, chunk_size=4096))
+    with codec.open(path) as f:
+        f.seek(10000)
+        assert f.read(100) == payload[10000:10100]
+
+def test_legacy_gzip_round_trip(codec, payload):
+    nonce = os.urandom(NONCE_SIZE)
+    blob = gzip.compress(nonce + codec.cipher.encrypt(nonce, payload, None))
+    assert codec.decode(blob) == payload
+
+def test_wrong_key_is_rejected(codec, payload):
+    other = StorageCodec("fedcba9876543210fedcba9876543210")
+    with pytest.raises(DecryptionError):
+        other.decode(codec.encode(payload))
+    with pytest.raises(DecryptionError):
+        other.decode(codec.encode_chunked(payload, chunk_size=4096))
+
+@pytest.mark.parametrize("position", [4, HEADER.size + 1, HEADER.size + NONCE_SIZE + 3, -1])
+def test_tampered_v1_is_rejected(codec, payload, position):
+    blob = codec.encode(payload)
+    with pytest.raises(DecryptionError):
+        codec.decode(flip(blob, position % len(blob)))
+
+@pytest.mark.parametrize("position", [CHUNKED_HEADER.size - 1, CHUNKED_HEADER.size + 5, -1])
+def test_tampered_chunk_is_rejected(codec, payload, position):
+    blob = codec.encode_chunked(payload, chunk_size=4096)
+    with pytest.raises(DecryptionError):
+        codec.decode(flip(blob, position % len(blob)))
+
+def test_swapped_chunks_are_rejected(codec, payload):
+    chunk_size = 4096
+    blob = codec.encode_chunked(payload, chunk_size=chunk_size)
+    sealed = chunk_size + TAG_SIZE
+    first = CHUNKED_HEADER.size
+    swapped = blob[:first] + blob[first + sealed:first + 2 * sealed] + blob[first:first + sealed] + blob[first + 2 * sealed:]
+    with pytest.raises(DecryptionError):
+        codec.decode(swapped)
+
+@pytest.mark.parametrize("length", [0, 3, 4, 5, HEADER.size + NONCE_SIZE, CHUNKED_HEADER.size - 1])
+def test_truncated_blobs_are_rejected(codec, payload, length):
+    for blob in (codec.encode(payload), codec.encode_chunked(payload, chunk_size=4096)):
+        with pytest.raises(DecryptionError):
+            codec.decode(blob[:length])
+
+def test_truncated_chunk_body_is_rejected(codec, payload):
+    blob = codec.encode_chunked(payload, chunk_size=4096)
+    with pytest.raises(DecryptionError):
+        codec.decode(blob[:-1])
+
+def test_corrupt_gzip_is_rejected(codec):
+    with pytest.raises(DecryptionError):
+        codec.decode(gzip.compress(b"kisa")[:-4])
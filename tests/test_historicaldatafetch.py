@@ -0,0 +1,90 @@
+# tests/test_historicaldatafetch.py
+
+import io
+import hashlib
+import zipfile
+import functools
+from datetime import date, datetime, timedelta
+import pytest
+import pyarrow as pa
+import pyarrow.parquet as pq
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from data import historicaldatafetch
+from data.historicaldatafetch import (TimeInterval, KLINE_COLUMNS, ENCRYPTION_KEY,
+                                      _decode_kline_archive, _transform_archives)
+from storage.file_manager import StorageCodec
+
+def test_closed_months_are_planned_as_monthly_archives(fetcher):
+    periods = list(fetcher._plan_periods(datetime(2023, 1, 15), datetime(2023, 3, 2)))
+    # Başlangıç ve bitiş ayın ortasında olsa da kapanmış ayın tamamı tek arşivdir
+    assert periods == [(TimeInterval.MONTHLY, datetime(2023, 1, 1)), (TimeInterval.MONTHLY, datetime(2023, 2, 1)),
+                       (TimeInterval.MONTHLY, datetime(2023, 3, 1))]
+
+def test_current_month_is_planned_as_daily_archives(fetcher):
+    month = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    previous = (month - timedelta(days=1)).replace(day=1)
+    end = month + timedelta(days=2)
+    periods = list(fetcher._plan_periods(previous + timedelta(days=3), end))
+    assert periods[0] == (TimeInterval.MONTHLY, previous)
+    assert periods[1:] == [(TimeInterval.DAILY, month + timedelta(days=i)) for i in range(3)]
+
+def kline_archive(rows, header: bool) -> bytes:
+    lines = ([",".join(KLINE_COLUMNS)] if header else []) + [",".join(map(str, row)) for row in rows]
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as z:
+        z.writestr("BTCUSDT-1m-2024-01-01.csv", "\n".join(lines) + "\n")
+    return buffer.getvalue()
+
+KLINE_ROWS = [
+    (1704067200000, 100.0, 102.0, 99.0, 101.0, 5.0, 1704067259999, 505.0, 7, 2.0, 202.0, 0),
+    (1704067260000, 101.0, 104.0, 100.0, 103.0, 3.0, 1704067319999, 309.0, 4, 1.0, 103.0, 0),
+]
+
+@pytest.mark.parametrize("header", [True, False])
+def test_kline_archive_is_decoded_with_or_without_header(header):
+    table = _decode_kline_archive(kline_archive(KLINE_ROWS, header))
+    assert table.column_names == KLINE_COLUMNS + ["hlc3", "variance"]
+    assert table.num_rows == 2
+    assert table["open_time"].type == pa.timestamp("ms")
+    assert table["open_time"][0].as_py() == datetime(2024, 1, 1)
+    assert table["close_time"][1].as_py() == datetime(2024, 1, 1, 0, 1, 59, 999000)
+    assert table["count"].to_pylist() == [7, 4]
+    assert table["hlc3"].to_pylist() == [pytest.approx(100.6666667), pytest.approx(102.3333333)]
+    assert table["variance"].to_pylist() == [3.0, 4.0]
+
+def test_transform_keeps_only_missing_days():
+    codec = StorageCodec(ENCRYPTION_KEY)
+    rows = KLINE_ROWS + [(1704153600000, 103.0, 105.0, 102.0, 104.0, 2.0, 1704153659999, 208.0, 3, 1.0, 104.0, 0)]
+    partitions = _transform_archives(([kline_archive(rows, header=True)], [date(2024, 1, 2)]), codec)
+    assert list(partitions) == [date(2024, 1, 2)]
+    partition = partitions[date(2024, 1, 2)]
+    assert (partition.rows, partition.start_ms, partition.end_ms) == (1, 1704153600000, 1704153600000)
+    table = pq.read_table(io.BytesIO(codec.decode(partition.data)))
+    assert table["close"].to_pylist() == [104.0]
+
+def test_checksum_mismatch_is_retried(fetcher, loop, monkeypatch):
+    content = kline_archive(KLINE_ROWS, header=True)
+    requests = {"archive": 0}
+
+    async def archive(request):
+        requests["archive"] += 1
+        # İlk yanıt yolda bozulmuş gibi davranır
+        return web.Response(body=content[:-1] + b"\1" if requests["archive"] == 1 else content)
+
+    async def checksum(request):
+        return web.Response(text=f"{hashlib.sha256(content).hexdigest()}  BTCUSDT-1m-2024-01.zip\n")
+
+    monkeypatch.setattr(historicaldatafetch, "retry", functools.partial(historicaldatafetch.retry, delay=0))
+    app = web.Application()
+    app.router.add_get("/archive.zip", archive)
+    app.router.add_get("/archive.zip.CHECKSUM", checksum)
+
+    async def download():
+        async with TestServer(app) as server:
+            return await fetcher._download_verified(str(server.make_url("/archive.zip")))
+
+    data, digest = loop.run_until_complete(download())
+    assert requests["archive"] == 2
+    assert data == content
+    assert digest == hashlib.sha256(content).hexdigest()
@@ -0,0 +1,29 @@
+# tests/test_kline_resampler.py
+
+import numpy as np
+import pandas as pd
+from data.kline_resampler import resample_klines
+
+def minute_bars(start: str, minutes: int) -> pd.DataFrame:
+    open_time = pd.date_range(start, periods=minutes, freq="1min")
+    close = 100 + np.arange(minutes, dtype=float)
+    return pd.DataFrame({
+        "open_time": open_time, "open": close - 0.5, "high": close + 1, "low": close - 1, "close": close,
+        "volume": np.ones(minutes), "close_time": open_time + pd.Timedelta(milliseconds=59_999),
+        "count": np.full(minutes, 2),
+    })
+
+def test_five_minute_bars_aggregate_ohlcv():
+    bars = resample_klines(minute_bars("2024-01-01", 10), "5m")
+    assert list(bars.columns) == ["open_time", "open", "high", "low", "close", "volume", "close_time", "count"]
+    assert bars["open_time"].tolist() == [pd.Timestamp("2024-01-01 00:00"), pd.Timestamp("2024-01-01 00:05")]
+    first = bars.iloc[0]
+    assert (first["open"], first["high"], first["low"], first["close"]) == (99.5, 105.0, 99.0, 104.0)
+    assert (first["volume"], first["count"]) == (5.0, 10)
+    assert first["close_time"] == pd.Timestamp("2024-01-01 00:04:59.999")
+
+def test_weekly_bars_open_on_monday():
+    # 2024-01-03 Çarşamba; hafta 2024-01-01 Pazartesi açılır
+    bars = resample_klines(minute_bars("2024-01-03", 3 * 1440), "1w")
+    assert bars["open_time"].tolist() == [pd.Timestamp("2024-01-01")]
+    assert bars["volume"].tolist() == [3.0 * 1440]
@@ -0,0 +1,37 @@
+# tests/test_latency_monitor.py
+
+import pytest
+from utils.latency_monitor import LatencyHistogram
+
+def test_small_values_have_exact_buckets():
+    histogram = LatencyHistogram(precision_bits=7, max_value=1_000_000)
+    for value in range(128):
+        assert histogram._upper_bound(histogram._index(value)) == value
+
+@pytest.mark.parametrize("value", [128, 129, 255, 256, 1000, 65_537, 999_999])
+def test_bucket_bounds_have_constant_relative_error(value):
+    histogram = LatencyHistogram(precision_bits=7, max_value=1_000_000)
+    upper = histogram._upper_bound(histogram._index(value))
+    assert value <= upper
+    assert (upper - value) / value < 2 ** -6
+
+def test_bucket_indices_are_monotonic():
+    histogram = LatencyHistogram(precision_bits=5, max_value=100_000)
+    indices = [histogram._index(value) for value in range(100_001)]
+    assert indices == sorted(indices)
+    assert indices[-1] == len(histogram.counts) - 1
+
+def test_percentiles_and_clamping():
+    histogram = LatencyHistogram(precision_bits=7, max_value=10_000)
+    for value in range(1, 1001):
+        histogram.record(value)
+    histogram.record(-5)
+    histogram.record(50_000)
+    summary = histogram.summary()
+    assert summary["count"] == 1002
+    assert summary["max"] == 10_000
+    assert 500 <= summary["p50"] <= 504
+    assert 990 <= summary["p99"] <= 1000
+    histogram.reset()
+    assert histogram.summary()["count"] == 0
+    assert histogram.percentile(0.5) == 0
@@ -0,0 +1,69 @@
+# tests/test_market_data_bus.py
+
+import asyncio
+from data.market_data_bus import MarketDataBus, MarketEvent, OverflowPolicy
+
+def event(symbol: str, value: int) -> MarketEvent:
+    return MarketEvent("BINANCE", "TRADES", symbol, value)
+
+def drain(subscription) -> list:
+    values = []
+    while (item := subscription.get_nowait()) is not None:
+        values.append((item.symbol, item.record))
+    return values
+
+def test_drop_oldest_keeps_latest_events():
+    async def scenario():
+        bus = MarketDataBus()
+        subscription = bus.subscribe(3, OverflowPolicy.DROP_OLDEST)
+        for i in range(5):
+            await bus.publish(event("BTCUSDT", i))
+        return subscription
+
+    subscription = asyncio.run(scenario())
+    assert drain(subscription) == [("BTCUSDT", 2), ("BTCUSDT", 3), ("BTCUSDT", 4)]
+    assert (subscription.dropped, subscription.delivered) == (2, 3)
+
+def test_conflate_keeps_last_value_per_stream():
+    async def scenario():
+        bus = MarketDataBus()
+        subscription = bus.subscribe(2, OverflowPolicy.CONFLATE)
+        await bus.publish(event("BTCUSDT", 1))
+        await bus.publish(event("ETHUSDT", 1))
+        await bus.publish(event("BTCUSDT", 2))
+        # Kapasite dolu: yeni akış en eski akışı çıkarır
+        await bus.publish(event("SOLUSDT", 1))
+        return subscription
+
+    subscription = asyncio.run(scenario())
+    assert drain(subscription) == [("ETHUSDT", 1), ("SOLUSDT", 1)]
+    assert subscription.dropped == 2
+
+def test_block_waits_for_slow_consumer_without_loss():
+    async def scenario():
+        bus = MarketDataBus()
+        subscription = bus.subscribe(2, OverflowPolicy.BLOCK)
+        fast = bus.subscribe(100, OverflowPolicy.DROP_OLDEST, predicate=lambda e: e.symbol == "BTCUSDT")
+        received = []
+
+        async def consume():
+            async for item in subscription:
+                received.append(item.record)
+                await asyncio.sleep(0)
+
+        async def publish():
+            for i in range(10):
+                await bus.publish(event("BTCUSDT" if i % 2 == 0 else "ETHUSDT", i))
+            bus.close()
+
+        publisher = asyncio.create_task(publish())
+        await asyncio.sleep(0)
+        # Tüketici başlamadan yayıncı kuyruk dolunca bekler
+        assert not publisher.done() and len(subscription) == 2
+        await asyncio.gather(consume(), publisher)
+        return received, drain(fast), subscription
+
+    received, fast_items, subscription = asyncio.run(scenario())
+    assert received == list(range(10))
+    assert subscription.dropped == 0
+    assert fast_items == [("BTCUSDT", i) for i in range(0, 10, 2)]
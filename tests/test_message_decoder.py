@@ -0,0 +1,22 @@
+# tests/test_message_decoder.py
+
+from data.message_decoder import (loads, decode_binance, AggTrade, DepthUpdate, MarkPrice, SAMPLE_MESSAGES)
+
+def test_sample_messages_decode_to_typed_records():
+    depth, trade, mark = (decode_binance(loads(raw)["data"]) for raw in SAMPLE_MESSAGES)
+
+    assert isinstance(depth, DepthUpdate)
+    assert (depth.symbol, depth.first_update_id, depth.final_update_id, depth.prev_final_update_id) == (
+        "BTCUSDT", 3400000001, 3400000025, 3400000000)
+    assert depth.bids[0] == (37000.10, 1.25) and depth.asks[-1] == (37010.40, 0.0)
+
+    assert isinstance(trade, AggTrade)
+    assert (trade.trade_id, trade.price, trade.quantity, trade.trade_time, trade.is_buyer_maker) == (
+        1500000123, 2050.13, 0.85, 1700000000124, True)
+
+    assert isinstance(mark, MarkPrice)
+    assert (mark.mark_price, mark.funding_rate, mark.next_funding_time) == (58.1234, 0.0001, 1700006400000)
+
+def test_unknown_events_are_ignored():
+    assert decode_binance({"e": "forceOrder", "E": 1}) is None
+    assert decode_binance({"result": None, "id": 1}) is None
@@ -0,0 +1,75 @@
+# tests/test_order_book.py
+
+import asyncio
+from data.message_decoder import DepthUpdate
+from data.order_book import OrderBookManager
+
+SYMBOL = "BTCUSDT"
+
+def depth(first_id, final_id, prev_id, bids=(), asks=()):
+    return DepthUpdate(SYMBOL, final_id, final_id, first_id, final_id, prev_id, list(bids), list(asks))
+
+def snapshot(last_update_id, bids=(("100", "1"),), asks=(("101", "1"),)):
+    return {"lastUpdateId": last_update_id, "bids": [list(level) for level in bids],
+            "asks": [list(level) for level in asks]}
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+def test_buffered_updates_are_applied_after_snapshot():
+    manager = OrderBookManager(None)
+    # Anlık görüntüden eski fark atılır, lastUpdateId'yi kapsayan fark ilk uygulanan olur
+    run(manager.on_depth(depth(90, 95, 89, bids=[(99.0, 5.0)])))
+    run(manager.on_depth(depth(96, 105, 95, bids=[(100.0, 2.0)])))
+    run(manager.on_depth(depth(106, 110, 105, asks=[(101.0, 0.0), (102.0, 3.0)])))
+    assert manager.book(SYMBOL) is None
+
+    manager.load_snapshot(SYMBOL, snapshot(100))
+    book = manager.book(SYMBOL)
+    assert book.last_update_id == 110
+    assert book.best_bid() == (100.0, 2.0)
+    assert book.best_ask() == (102.0, 3.0)
+    # u < lastUpdateId olan farkın seviyesi deftere girmez
+    assert book.depth(5)[0] == [(100.0, 2.0)]
+    assert manager.resyncs == 0
+
+def test_live_updates_follow_pu_chain():
+    manager = OrderBookManager(None)
+    manager.load_snapshot(SYMBOL, snapshot(100))
+    run(manager.on_depth(depth(98, 102, 97, bids=[(100.5, 1.0)])))
+    run(manager.on_depth(depth(103, 104, 102, asks=[(100.8, 2.0)])))
+    book = manager.book(SYMBOL)
+    assert book.last_update_id == 104
+    assert book.mid_price() == (100.5 + 100.8) / 2
+    assert manager.resyncs == 0
+
+def test_pu_gap_resets_book_and_resyncs_from_next_snapshot():
+    manager = OrderBookManager(None)
+    manager.load_snapshot(SYMBOL, snapshot(100))
+    run(manager.on_depth(depth(98, 102, 97)))
+    # pu bir önceki u ile eşleşmiyor: defter sıfırlanır, fark yeni anlık görüntü için tamponlanır
+    run(manager.on_depth(depth(110, 112, 108, bids=[(100.0, 7.0)])))
+    assert manager.book(SYMBOL) is None
+    assert manager.resyncs == 1
+
+    manager.load_snapshot(SYMBOL, snapshot(111))
+    book = manager.book(SYMBOL)
+    assert book.last_update_id == 112
+    assert book.best_bid() == (100.0, 7.0)
+
+def test_snapshot_newer_than_buffer_start_resyncs_again():
+    manager = OrderBookManager(None)
+    run(manager.on_depth(depth(120, 125, 119)))
+    # İlk fark lastUpdateId'den sonra başlıyor (U > lastUpdateId): araya giren farklar kayıp
+    manager.load_snapshot(SYMBOL, snapshot(100))
+    assert manager.book(SYMBOL) is None
+    assert manager.resyncs == 1
+
+def test_invalidate_drops_synced_book():
+    manager = OrderBookManager(None)
+    manager.load_snapshot(SYMBOL, snapshot(100))
+    manager.invalidate(SYMBOL)
+    assert manager.book(SYMBOL) is None
+    run(manager.on_depth(depth(101, 103, 100, bids=[(100.2, 1.0)])))
+    manager.load_snapshot(SYMBOL, snapshot(102))
+    assert manager.book(SYMBOL).best_bid() == (100.2, 1.0)
@@ -0,0 +1,46 @@
+# tests/test_partition_compactor.py
+
+from datetime import date, datetime
+import pyarrow as pa
+from data.historicaldatafetch import DataType, KlineInterval, _describe_partition, _encode_partition, _write_atomic
+from data.partition_compactor import PartitionCompactor
+
+MINUTE_MS = 60_000
+DAY_MS = 86_400_000
+JAN_1_MS = 1704067200000
+
+def write_day(fetcher, day: datetime, open_ms):
+    table = pa.table({
+        "open_time": pa.array(open_ms, pa.int64()).cast(pa.timestamp("ms")),
+        "close": pa.array([float(ms // MINUTE_MS % 1000) for ms in open_ms]),
+    })
+    path = fetcher._get_local_path(DataType.KLINES, KlineInterval._1M, day)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = _encode_partition(table, fetcher.codec)
+    digest = _write_atomic(path, data)
+    fetcher.catalog.upsert(fetcher._partition_record(DataType.KLINES, KlineInterval._1M, day,
+                                                     _describe_partition(table, data), digest))
+    return path
+
+def test_closed_month_is_merged_and_catalog_repointed(fetcher):
+    # Günler sırasız yazılır; Şubat günü içinde bulunulan ay sayılır ve dokunulmaz
+    daily = [
+        write_day(fetcher, datetime(2024, 1, 2), [JAN_1_MS + DAY_MS + i * MINUTE_MS for i in range(3)]),
+        write_day(fetcher, datetime(2024, 1, 1), [JAN_1_MS + i * MINUTE_MS for i in range(3)]),
+    ]
+    february = write_day(fetcher, datetime(2024, 2, 1), [JAN_1_MS + 31 * DAY_MS])
+
+    compactor = PartitionCompactor(fetcher, row_group_size=2)
+    assert compactor.compact(before=datetime(2024, 2, 1)) == 1
+    monthly = fetcher._get_monthly_path(DataType.KLINES, KlineInterval._1M, datetime(2024, 1, 1))
+    records = fetcher.catalog.partitions("BTCUSDT", "klines", "1m", date(2024, 1, 1), date(2024, 1, 31))
+    assert [record.path for record in records] == [str(monthly)] * 2
+    assert [(record.rows, record.start_ms) for record in records] == [(3, JAN_1_MS), (3, JAN_1_MS + DAY_MS)]
+    assert not any(path.exists() for path in daily)
+    assert fetcher.catalog.get("BTCUSDT", "klines", "1m", date(2024, 2, 1)).path == str(february)
+
+    table = fetcher.reader.read_table("BTCUSDT", "klines", "1m", datetime(2024, 1, 1), datetime(2024, 1, 3))
+    open_ms = table["open_time"].cast(pa.int64()).to_pylist()
+    assert open_ms == sorted(open_ms) and len(open_ms) == 6
+    # Birleştirilmiş ay yeniden birleştirilmez
+    assert compactor.compact(before=datetime(2024, 2, 1)) == 0
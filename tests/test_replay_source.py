@@ -0,0 +1,70 @@
+# tests/test_replay_source.py
+
+import asyncio
+import orjson
+from data.market_data_bus import OverflowPolicy
+from data.order_book import SNAPSHOT_DATA_TYPE
+from data.realtimedatafetch import Exchange, DataType, Symbol
+from data.replay_source import ReplayDataFetcher
+from storage.file_manager import StorageCodec
+from storage.tick_log import TickLog
+
+KEY = "0123456789abcdef0123456789abcdef"
+START_MS = 1_700_000_040_000
+
+def trade(i: int) -> bytes:
+    time_ms = START_MS + i * 100
+    return orjson.dumps({"stream": "btcusdt@aggTrade", "data": {
+        "e": "aggTrade", "E": time_ms, "s": "BTCUSDT", "a": i, "p": str(100 + i % 7), "q": "0.5",
+        "f": i, "l": i, "T": time_ms, "m": i % 2 == 0}})
+
+def depth(i: int) -> bytes:
+    update_id = 1000 + i
+    return orjson.dumps({"stream": "btcusdt@depth", "data": {
+        "e": "depthUpdate", "E": START_MS + i * 250, "T": START_MS + i * 250, "s": "BTCUSDT",
+        "U": update_id, "u": update_id, "pu": update_id - 1, "b": [[str(99 - i % 5 * 0.1), "1.5"]], "a": []}})
+
+async def record_session(root):
+    log = TickLog(root, StorageCodec(KEY))
+    snapshot = {"lastUpdateId": 1000, "bids": [["99.0", "1.0"]], "asks": [["101.0", "2.0"]]}
+    await log.append("BINANCE", "BTCUSDT", SNAPSHOT_DATA_TYPE, orjson.dumps(snapshot), timestamp_ms=START_MS)
+    for i in range(1000):
+        await log.append("BINANCE", "BTCUSDT", "TRADES", trade(i), timestamp_ms=START_MS + i * 100)
+        if i < 400:
+            # Her 250 ms'de bir; 500 ms'nin katlarında işlemle aynı zamanda kaydedilir
+            await log.append("BINANCE", "BTCUSDT", "BOOK_DEPTH", depth(i), timestamp_ms=START_MS + i * 250)
+    await log.close()
+
+async def replay(root):
+    fetcher = ReplayDataFetcher(root, speed=0)
+    subscription = fetcher.bus.subscribe(10 ** 6, OverflowPolicy.BLOCK)
+    await fetcher.subscribe(Exchange.BINANCE, DataType.TRADES, Symbol.BTCUSDT)
+    await fetcher.subscribe(Exchange.BINANCE, DataType.BOOK_DEPTH, Symbol.BTCUSDT)
+    await fetcher.wait_closed()
+    events = []
+    while (event := subscription.get_nowait()) is not None:
+        record = event.record
+        if event.data_type == "TRADES":
+            events.append(("TRADES", record.trade_id))
+        elif event.data_type == "BOOK_DEPTH":
+            events.append(("BOOK_DEPTH", record.final_update_id))
+        else:
+            events.append((event.data_type, record.open_time, record.close))
+    book = fetcher.order_books.book("BTCUSDT")
+    await fetcher.close()
+    return events, book
+
+def test_replay_is_deterministic(tmp_path):
+    asyncio.run(record_session(tmp_path))
+    first, book = asyncio.run(replay(tmp_path))
+    second, _ = asyncio.run(replay(tmp_path))
+    assert first == second
+
+    assert [trade_id for kind, trade_id, *_ in first if kind == "TRADES"] == list(range(1000))
+    assert [update_id for kind, update_id, *_ in first if kind == "BOOK_DEPTH"] == [1000 + i for i in range(400)]
+    # Eşit alınma zamanlarında akışlar ad sırasıyla çözülür: defter farkı işlemden önce gelir
+    assert first.index(("BOOK_DEPTH", 1002)) < first.index(("TRADES", 5))
+    # Zaman çubukları kayıt saatine göre kapanır; oturum 100 sn sürdüğünden dakika çubuğu kapanmıştır
+    assert ("BAR:time:60000", 1_700_000_040_000, 100 + 599 % 7) in first
+    assert book is not None and book.last_update_id == 1399
+    assert book.best_ask() == (101.0, 2.0)
@@ -0,0 +1,183 @@
+# tests/test_stream_connections.py
+
+import json
+import asyncio
+import aiohttp
+import websockets
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from aiolimiter import AsyncLimiter
+from data import gap_backfill, stream_connections
+from data.gap_backfill import BinanceGapFiller
+from data.stream_connections import ExchangeConnection, BinanceProtocol, KrakenProtocol
+
+def trade(stream: str, trade_id: int) -> str:
+    return json.dumps({"stream": stream, "data": {"e": "aggTrade", "a": trade_id}})
+
+class FakeExchange:
+    """
+    Abonelik isteklerini kaydeden ve abone olunan her akışa `count` mesaj gönderen sunucu;
+    `drop_first` açıkken ilk bağlantı mesajlardan sonra kapatılır
+    """
+    def __init__(self, count: int, drop_first: bool = False):
+        self.count = count
+        self.drop_first = drop_first
+        self.connections = 0
+        self.requests = []
+
+    async def handler(self, ws):
+        self.connections += 1
+        async for message in ws:
+            request = json.loads(message)
+            self.requests.append(request)
+            if request["method"] == "SUBSCRIBE":
+                for stream in request["params"]:
+                    for trade_id in range(self.count):
+                        await ws.send(trade(stream, trade_id))
+                if self.drop_first and self.connections == 1:
+                    # İstemci tamponladığı mesajları iletene kadar beklenir
+                    await asyncio.sleep(0.1)
+                    await ws.close()
+                    return
+
+async def run_connection(server: FakeExchange, connection: ExchangeConnection, scenario):
+    async with websockets.serve(server.handler, "127.0.0.1", 0) as ws_server:
+        connection.protocol.url = f"ws://127.0.0.1:{ws_server.sockets[0].getsockname()[1]}"
+        task = asyncio.create_task(connection.run())
+        try:
+            await scenario()
+        finally:
+            await connection.close()
+            await asyncio.wait_for(task, 5)
+
+async def wait_for(condition, timeout: float = 5):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+def test_streams_share_one_connection():
+    server = FakeExchange(count=3)
+    received = []
+
+    async def on_message(stream, payload, raw, received_ns):
+        received.append((stream, payload["a"]))
+
+    connection = ExchangeConnection("BINANCE", BinanceProtocol(), on_message)
+
+    async def scenario():
+        # Bağlantıdan önceki abonelikler bağlanınca tek istekte gönderilir
+        await connection.subscribe(["btcusdt@aggTrade", "ethusdt@aggTrade"])
+        await wait_for(lambda: len(received) == 6)
+        await connection.subscribe(["btcusdt@aggTrade", "solusdt@aggTrade"])
+        await wait_for(lambda: len(received) == 9)
+        await connection.unsubscribe(["ethusdt@aggTrade"])
+        await wait_for(lambda: len(server.requests) == 3)
+
+    asyncio.run(run_connection(server, connection, scenario))
+    assert server.connections == 1
+    assert [(r["method"], r["params"]) for r in server.requests] == [
+        ("SUBSCRIBE", ["btcusdt@aggTrade", "ethusdt@aggTrade"]),
+        ("SUBSCRIBE", ["solusdt@aggTrade"]),
+        ("UNSUBSCRIBE", ["ethusdt@aggTrade"]),
+    ]
+    for stream in ("btcusdt@aggTrade", "ethusdt@aggTrade", "solusdt@aggTrade"):
+        assert [trade_id for name, trade_id in received if name == stream] == [0, 1, 2]
+
+def test_unsubscribed_and_control_messages_are_dropped():
+    received = []
+
+    async def on_message(stream, payload, raw, received_ns):
+        received.append((stream, raw))
+
+    async def scenario():
+        connection = ExchangeConnection("BINANCE", BinanceProtocol(), on_message)
+        await connection.subscribe(["btcusdt@aggTrade"])
+        await connection._dispatch(trade("btcusdt@aggTrade", 1), 0)
+        await connection._dispatch(trade("ethusdt@aggTrade", 2), 0)
+        await connection._dispatch(json.dumps({"result": None, "id": 1}), 0)
+        await connection._dispatch("pong", 0)
+
+    asyncio.run(scenario())
+    assert received == [("btcusdt@aggTrade", trade("btcusdt@aggTrade", 1).encode())]
+
+def test_kraken_requests_are_grouped_by_channel():
+    protocol = KrakenProtocol()
+    streams = [protocol.stream_name("TRADES", "BTCUSDT"), protocol.stream_name("TRADES", "ETHUSDT"),
+               protocol.stream_name("BOOK_DEPTH", "BTCUSDT")]
+    requests = [json.loads(line) for line in protocol.subscribe_message(streams).split("\n")]
+    assert [request["params"] for request in requests] == [
+        {"channel": "trade", "symbol": ["BTC/USDT", "ETH/USDT"]}, {"channel": "book", "symbol": ["BTC/USDT"]},
+    ]
+
+def test_live_messages_wait_for_gap_fill_and_overflow_refills(monkeypatch):
+    monkeypatch.setattr(stream_connections, "STREAM_MAX_PENDING_MESSAGES", 3)
+    server = FakeExchange(count=10)
+    events = []
+
+    async def on_message(stream, payload, raw, received_ns):
+        events.append(payload["a"])
+
+    async def on_connect():
+        events.append("fill")
+        if len(events) == 1:
+            # Boşluk doldurulurken gelen 10 mesaj 3'lük tamponu üç kez taşırır
+            await wait_for(lambda: connection.pending_overflows == 3)
+
+    connection = ExchangeConnection("BINANCE", BinanceProtocol(), on_message, on_connect)
+
+    async def scenario():
+        await connection.subscribe(["btcusdt@aggTrade"])
+        await wait_for(lambda: events[-1:] == [9])
+
+    asyncio.run(run_connection(server, connection, scenario))
+    # Taşma sonrası kanca yeniden çalışır; yalnızca son taşmadan sonra tamponlanan mesaj iletilir
+    assert events == ["fill", "fill", 9]
+
+def test_reconnect_resubscribes_and_fills_before_live(monkeypatch):
+    monkeypatch.setattr(stream_connections, "RECONNECT_DELAY", 0.01)
+    server = FakeExchange(count=2, drop_first=True)
+    events = []
+
+    async def on_message(stream, payload, raw, received_ns):
+        events.append((stream, payload["a"]))
+
+    async def on_connect():
+        events.append("fill")
+
+    connection = ExchangeConnection("BINANCE", BinanceProtocol(), on_message, on_connect)
+
+    async def scenario():
+        await connection.subscribe(["btcusdt@aggTrade", "ethusdt@aggTrade"])
+        await wait_for(lambda: len(events) == 10)
+
+    asyncio.run(run_connection(server, connection, scenario))
+    assert server.connections == 2 and connection.reconnects == 1
+    assert [request["params"] for request in server.requests] == [["btcusdt@aggTrade", "ethusdt@aggTrade"]] * 2
+    assert events[0] == "fill" and events[5] == "fill"
+    assert sorted(events[6:]) == sorted(events[1:5])
+
+def test_gap_filler_pages_from_last_trade(monkeypatch):
+    monkeypatch.setattr(gap_backfill, "GAP_BACKFILL_PAGE_SIZE", 2)
+    requested = []
+
+    async def agg_trades(request):
+        from_id, limit = int(request.query["fromId"]), int(request.query["limit"])
+        requested.append(from_id)
+        ids = [i for i in range(from_id, from_id + limit) if i < 15]
+        return web.json_response([{"a": i, "p": "100", "q": "1", "f": i, "l": i, "T": 1000 + i, "m": False}
+                                  for i in ids])
+
+    app = web.Application()
+    app.router.add_get("/fapi/v1/aggTrades", agg_trades)
+
+    async def scenario():
+        async with TestServer(app) as server, aiohttp.ClientSession() as session:
+            filler = BinanceGapFiller(session, AsyncLimiter(100, 1), str(server.make_url("")).rstrip("/"))
+            return [row async for row in filler.agg_trades("BTCUSDT", 10)]
+
+    rows = asyncio.run(scenario())
+    assert requested == [10, 12, 14]
+    assert [row["a"] for row in rows] == [10, 11, 12, 13, 14]
+    # REST satırları websocket yük biçimindedir
+    assert rows[0]["e"] == "aggTrade" and rows[0]["s"] == "BTCUSDT" and rows[0]["E"] == 1010
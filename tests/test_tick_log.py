@@ -0,0 +1,65 @@
+# tests/test_tick_log.py
+
+import asyncio
+import pytest
+from storage import tick_log
+from storage.file_manager import StorageCodec
+from storage.tick_log import TickLog, TickLogReader, SEGMENT_SUFFIX, INDEX_SUFFIX, INDEX_ENTRY
+
+KEY = "0123456789abcdef0123456789abcdef"
+START_MS = 1_700_000_000_000
+
+@pytest.fixture
+def codec():
+    return StorageCodec(KEY)
+
+@pytest.fixture(autouse=True)
+def small_frames(monkeypatch):
+    # Küçük çerçeve ve indeks aralığı: birkaç bin mesaj çok sayıda çerçeve ve indeks girdisi üretir
+    monkeypatch.setattr(tick_log, "TICK_LOG_BATCH_BYTES", 2048)
+    monkeypatch.setattr(tick_log, "TICK_LOG_INDEX_BYTES", 4096)
+
+def message(i: int) -> bytes:
+    return b'{"a":%d,"p":"100.5"}' % i
+
+async def record(root, codec, count: int):
+    log = TickLog(root, codec)
+    for i in range(count):
+        await log.append("BINANCE", "BTCUSDT", "TRADES", message(i), timestamp_ms=START_MS + i)
+        if i % 2 == 0:
+            await log.append("BINANCE", "ETHUSDT", "TRADES", message(i), timestamp_ms=START_MS + i)
+    await log.close()
+    return log
+
+def test_round_trip(tmp_path, codec):
+    asyncio.run(record(tmp_path, codec, 5000))
+    reader = TickLogReader(tmp_path, codec)
+    assert reader.streams() == [("BINANCE", "BTCUSDT", "TRADES"), ("BINANCE", "ETHUSDT", "TRADES")]
+    assert list(reader.read("BINANCE", "BTCUSDT", "TRADES")) == [(START_MS + i, message(i)) for i in range(5000)]
+    assert len(list(reader.read("BINANCE", "ETHUSDT", "TRADES"))) == 2500
+
+def test_time_range_seeks_with_index(tmp_path, codec):
+    asyncio.run(record(tmp_path, codec, 5000))
+    reader = TickLogReader(tmp_path, codec)
+    segment = next(tmp_path.joinpath("BINANCE", "BTCUSDT", "TRADES").glob(f"*{SEGMENT_SUFFIX}"))
+    index = segment.with_suffix(INDEX_SUFFIX)
+    assert index.stat().st_size >= 5 * INDEX_ENTRY.size
+    # Orta noktadan okuma segmentin başından değil, indeksteki en yakın çerçeveden başlar
+    assert reader._seek_offset(index, START_MS + 2500) > 0
+    assert list(reader.read("BINANCE", "BTCUSDT", "TRADES", START_MS + 2500, START_MS + 2502)) == [
+        (START_MS + i, message(i)) for i in (2500, 2501, 2502)
+    ]
+
+def test_torn_last_frame_is_skipped(tmp_path, codec):
+    asyncio.run(record(tmp_path, codec, 1000))
+    segment = next(tmp_path.joinpath("BINANCE", "BTCUSDT", "TRADES").glob(f"*{SEGMENT_SUFFIX}"))
+    segment.write_bytes(segment.read_bytes()[:-10])
+    messages = list(TickLogReader(tmp_path, codec).read("BINANCE", "BTCUSDT", "TRADES"))
+    assert 0 < len(messages) < 1000
+    assert messages == [(START_MS + i, message(i)) for i in range(len(messages))]
+
+def test_full_queue_applies_backpressure(tmp_path, codec, monkeypatch):
+    monkeypatch.setattr(tick_log, "TICK_LOG_MAX_PENDING_FRAMES", 1)
+    log = asyncio.run(record(tmp_path, codec, 5000))
+    assert log.stalls > 0
+    assert len(list(TickLogReader(tmp_path, codec).read("BINANCE", "BTCUSDT", "TRADES"))) == 5000
@@ -0,0 +1,50 @@
+# tests/test_tick_store.py
+
+import numpy as np
+from data.tick_store import BUY, SELL, TickRing, TickStore
+
+def fill(ring: TickRing, count: int):
+    for i in range(count):
+        ring.append(i, 100.0 + i, 1.0, BUY if i % 2 else SELL)
+
+def test_window_before_wrap():
+    ring = TickRing(capacity=8)
+    fill(ring, 5)
+    window = ring.window()
+    assert len(ring) == 5
+    assert window.timestamp.tolist() == [0, 1, 2, 3, 4]
+    assert ring.window(2).price.tolist() == [103.0, 104.0]
+
+def test_window_after_wrap_is_contiguous_view():
+    ring = TickRing(capacity=8)
+    fill(ring, 21)
+    window = ring.window()
+    assert len(ring) == 8
+    assert window.timestamp.tolist() == list(range(13, 21))
+    assert window.side.tolist() == [BUY if i % 2 else SELL for i in range(13, 21)]
+    # Kopyasız dilim: halkanın kendi belleğini gösterir
+    assert np.shares_memory(window.price, ring.price)
+    assert ring.last_price() == 120.0
+
+def test_window_at_exact_capacity_multiple():
+    ring = TickRing(capacity=8)
+    fill(ring, 16)
+    assert ring.window().timestamp.tolist() == list(range(8, 16))
+    assert ring.window(3).timestamp.tolist() == [13, 14, 15]
+
+def test_since_after_wrap():
+    ring = TickRing(capacity=8)
+    fill(ring, 21)
+    assert ring.since(17).timestamp.tolist() == [17, 18, 19, 20]
+    assert ring.since(0).timestamp.tolist() == list(range(13, 21))
+    assert len(ring.since(100).timestamp) == 0
+
+def test_quotes_keep_sides_apart():
+    store = TickStore(capacity=4)
+    store.write_quote("BINANCE", "BTCUSDT", 1, (99.0, 1.0), (101.0, 2.0))
+    store.write_quote("BINANCE", "BTCUSDT", 2, None, (102.0, 1.0))
+    store.write_quote("BINANCE", "BTCUSDT", 3, (98.0, 3.0), None)
+    bids = store.windows("BTCUSDT", "BIDS")["BINANCE"]
+    asks = store.windows("BTCUSDT", "ASKS")["BINANCE"]
+    assert bids.timestamp.tolist() == [1, 3] and set(bids.side.tolist()) == {BUY}
+    assert asks.price.tolist() == [101.0, 102.0] and set(asks.side.tolist()) == {SELL}
@@ -0,0 +1,156 @@
+# utils/latency_monitor.py
+
+import os
+import asyncio
+import logging
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+# Ortam Değişkenlerini Yükleme
+load_dotenv()
+
+# Ortam Değişkenleri
+LATENCY_LOG_SECONDS = float(os.getenv("LATENCY_LOG_SECONDS", 60))
+# Alt kova biti: 7 bit ≈ %0.8 göreli hassasiyet
+LATENCY_PRECISION_BITS = int(os.getenv("LATENCY_PRECISION_BITS", 7))
+# Kaydedilebilen en büyük gecikme (mikrosaniye); üstü bu değere kırpılır
+LATENCY_MAX_US = int(os.getenv("LATENCY_MAX_US", 3_600_000_000))
+
+# Log yapılandırması
+logger = logging.getLogger("LatencyMonitor")
+
+# Mesajın boru hattındaki damgaları, sırasıyla. Her aşama adını bitirdiği damgadan alır:
+# receive = borsa olay zamanı → alınma, decode = alınma → tipli kayıt, processor = kayıt → işlenmiş
+# veri (veri yolu kuyruğu dahil), strategy = karar, router = emir yönlendirme
+STAGES = ("receive", "decode", "processor", "strategy", "router")
+PERCENTILES = (("p50", 0.50), ("p99", 0.99), ("p999", 0.999))
+
+# ================================
+# 📈 HDR Tarzı Histogram
+# ================================
+
+class LatencyHistogram:
+    """
+    Log-doğrusal kovalı gecikme histogramı (HdrHistogram düzeni). Her ikinin kuvveti
+    aralığı 2^(bit-1) alt kovaya bölünür; böylece 1 µs ile saatler arasındaki değerler
+    sabit göreli hatayla, sabit bellekte ve O(1) kayıtla tutulur.
+    """
+    def __init__(self, precision_bits: int = LATENCY_PRECISION_BITS, max_value: int = LATENCY_MAX_US):
+        self.bits = precision_bits
+        self.sub_count = 1 << precision_bits
+        self.half = self.sub_count >> 1
+        self.max_value = max_value
+        self.counts: List[int] = [0] * (self._index(max_value) + 1)
+        self.total = 0
+        self.max_seen = 0
+
+    def _index(self, value: int) -> int:
+        if value < self.sub_count:
+            return value
+        shift = value.bit_length() - self.bits
+        return self.sub_count + (shift - 1) * self.half + (value >> shift) - self.half
+
+    def _upper_bound(self, index: int) -> int:
+        """Kovadaki en büyük değer; yüzdelikler güvenli tarafta raporlanır"""
+        if index < self.sub_count:
+            return index
+        shift = (index - self.sub_count) // self.half + 1
+        sub = (index - self.sub_count) % self.half + self.half
+        return ((sub + 1) << shift) - 1
+
+    def record(self, value_us: int):
+        value = min(max(int(value_us), 0), self.max_value)
+        self.counts[self._index(value)] += 1
+        self.total += 1
+        if value > self.max_seen:
+            self.max_seen = value
+
+    def percentile(self, q: float) -> int:
+        if not self.total:
+            return 0
+        cumulative = np.cumsum(self.counts)
+        index = int(np.searchsorted(cumulative, max(1, int(np.ceil(q * self.total)))))
+        return min(self._upper_bound(index), self.max_seen)
+
+    def summary(self) -> Dict[str, int]:
+        result = {name: self.percentile(q) for name, q in PERCENTILES}
+        result.update(max=self.max_seen, count=self.total)
+        return result
+
+    def reset(self):
+        self.counts = [0] * len(self.counts)
+        self.total = 0
+        self.max_seen = 0
+
+# ================================
+# ⏱️ Aşama Gecikme İzleyicisi
+# ================================
+
+class LatencyMonitor:
+    """
+    Akış ve aşama başına histogram tutar. Damgalar `time.time_ns()` ile alınır; borsa
+    olay zamanı milisaniye olduğundan receive aşaması saat kaymasını da içerir.
+    """
+    def __init__(self, log_interval: float = LATENCY_LOG_SECONDS):
+        self.log_interval = log_interval
+        self.histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._reporter: Optional[asyncio.Task] = None
+
+    def record(self, stream: str, stage: str, value_us: int):
+        histogram = self.histograms.get((stream, stage))
+        if histogram is None:
+            histogram = self.histograms[(stream, stage)] = LatencyHistogram()
+        histogram.record(value_us)
+
+    def record_stamps(self, stream: str, event_ms: Optional[int], stamps: Dict[str, int],
+                      first_stage: str = STAGES[0]):
+        """
+        `stamps` aşama adı → time_ns damgasıdır. Her damga için bir önceki mevcut damgadan
+        geçen süre kaydedilir. `first_stage` öncesindeki damgalar başka yerde kaydedilmiştir
+        ve yalnızca başlangıç noktası olarak kullanılır; bu durumda olay zamanından son
+        damgaya kadar geçen süre "total" olarak kaydedilir.
+        """
+        previous = event_ms * 1_000_000 if event_ms is not None else None
+        recording = False
+        for stage in STAGES:
+            recording = recording or stage == first_stage
+            stamp = stamps.get(stage)
+            if stamp is None:
+                continue
+            if recording and previous is not None:
+                self.record(stream, stage, (stamp - previous) // 1000)
+            previous = stamp
+        if first_stage != STAGES[0] and event_ms is not None and previous is not None:
+            self.record(stream, "total", (previous - event_ms * 1_000_000) // 1000)
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """{akış: {aşama: {p50, p99, p999, max, count}}}; değerler mikrosaniye"""
+        result: Dict[str, Dict[str, Dict[str, int]]] = {}
+        order = {stage: index for index, stage in enumerate(STAGES + ("total",))}
+        for (stream, stage), histogram in sorted(self.histograms.items(),
+                                                 key=lambda item: (item[0][0], order.get(item[0][1], len(order)))):
+            result.setdefault(stream, {})[stage] = histogram.summary()
+        return result
+
+    def start(self):
+        if self._reporter is None:
+            self._reporter = asyncio.create_task(self._report_periodically())
+
+    async def _report_periodically(self):
+        while True:
+            await asyncio.sleep(self.log_interval)
+            self.log()
+
+    def log(self):
+        for stream, stages in self.snapshot().items():
+            parts = [
+                f"{stage} p50={s['p50'] / 1000:.2f} p99={s['p99'] / 1000:.2f} p999={s['p999'] / 1000:.2f} ms"
+                for stage, s in stages.items()
+            ]
+            logger.info(f"⏱️ {stream} (n={max(s['count'] for s in stages.values())}): " + " | ".join(parts))
+
+    def close(self):
+        if self._reporter is not None:
+            self._reporter.cancel()
+            self._reporter = None